@@ -0,0 +1,59 @@
+import os
+import shutil
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from services.chart_renderer import ChartRenderer
+from services.timeseries import TimeSeries
+
+
+def benchmark(n_symbols: int = 16, n_points: int = 1500, output_dir: str = 'bench_charts'):
+    """
+    Compare serial pyplot rendering with pooled, content-addressed rendering
+    """
+    rng = np.random.default_rng(0)
+    index = np.arange(n_points).astype('datetime64[D]').astype('datetime64[ns]')
+    future_index = index[-1] + np.arange(1, 8).astype('timedelta64[D]')
+    charts = []
+    for i in range(n_symbols):
+        close = 100 + np.cumsum(rng.normal(0, 1, n_points))
+        charts.append((f'SYM{i}',
+                       TimeSeries(index, {'Close': close}),
+                       TimeSeries(future_index, {'Predicted_Close': close[-1] + np.arange(7.0)})))
+
+    shutil.rmtree(output_dir, ignore_errors=True)
+    os.makedirs(output_dir)
+
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    started = time.perf_counter()
+    for symbol, history, predictions in charts:
+        plt.figure(figsize=(12, 6))
+        plt.plot(history.index, history['Close'])
+        plt.plot(predictions.index, predictions['Predicted_Close'], color='red')
+        plt.savefig(os.path.join(output_dir, f'{symbol}_pyplot.png'), bbox_inches='tight')
+        plt.close()
+    serial = time.perf_counter() - started
+
+    renderer = ChartRenderer(output_dir)
+    # Warm the worker processes so the timings exclude interpreter start-up
+    renderer.executor.submit(int).result()
+    timings = []
+    for _ in range(2):
+        started = time.perf_counter()
+        with ThreadPoolExecutor(n_symbols) as pool:
+            list(pool.map(lambda chart: renderer.render_forecast(*chart), charts))
+        timings.append(time.perf_counter() - started)
+    renderer.close()
+    shutil.rmtree(output_dir, ignore_errors=True)
+
+    print(f"{n_symbols} charts of {n_points} points: pyplot serial {serial:.2f}s, "
+          f"pooled cold {timings[0]:.2f}s, unchanged {timings[1] * 1000:.1f}ms; "
+          f"{renderer.stats()}")
+
+
+if __name__ == '__main__':
+    benchmark()
@@ -0,0 +1,29 @@
+from services.conversation import ConversationStore, estimate_tokens
+
+
+def benchmark(n_turns: int = 500, token_budget: int = 2000):
+    """
+    Simulate a long conversation and report history size and summarizer load
+    """
+    calls = []
+
+    def summarize(previous: str, transcript: str) -> str:
+        calls.append(estimate_tokens(previous) + estimate_tokens(transcript))
+        return (previous + ' ' + transcript)[-2000:]
+
+    store = ConversationStore(summarize, token_budget=token_budget)
+    session = store.get_or_create()
+    sizes = []
+    for turn in range(n_turns):
+        message = f"Question {turn} about the outlook for AAPL " * 3
+        context = store.history_context(session)
+        sizes.append(estimate_tokens(context))
+        store.record(session, message, f"Answer {turn}: the outlook is balanced. " * 20)
+
+    print(f"{n_turns} turns, budget {token_budget} tokens: "
+          f"history max {max(sizes)}, mean {sum(sizes) / len(sizes):.0f} tokens; "
+          f"{len(calls)} summaries of at most {max(calls)} input tokens")
+
+
+if __name__ == '__main__':
+    benchmark()
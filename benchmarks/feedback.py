@@ -0,0 +1,113 @@
+import io
+import os
+import shutil
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from services.feedback import CSV_COLUMNS, FeedbackService
+from services.models import FeedbackModel
+
+
+def benchmark(n_writes: int = 5000, n_threads: int = 32, db_dir: str = 'bench_feedback'):
+    """
+    Compare read-modify-write CSV saves with group-committed inserts
+    """
+    shutil.rmtree(db_dir, ignore_errors=True)
+    os.makedirs(db_dir)
+    feedback = [FeedbackModel(stock_symbol=f'SYM{i % 20}', rating=i % 5 + 1,
+                              comments=f'comment {i}') for i in range(n_writes)]
+
+    # The previous implementation, with concat in place of the removed DataFrame.append
+    csv_path = os.path.join(db_dir, 'feedback.csv')
+    pd.DataFrame(columns=CSV_COLUMNS).to_csv(csv_path, index=False)
+    n_csv = min(n_writes, 500)
+    started = time.perf_counter()
+    for item in feedback[:n_csv]:
+        df = pd.read_csv(csv_path)
+        df = pd.concat([df, pd.DataFrame([item.model_dump()])], ignore_index=True)
+        df.to_csv(csv_path, index=False)
+    csv_rate = n_csv / (time.perf_counter() - started)
+
+    service = FeedbackService(os.path.join(db_dir, 'none.csv'),
+                              os.path.join(db_dir, 'feedback.sqlite'))
+    started = time.perf_counter()
+    with ThreadPoolExecutor(n_threads) as pool:
+        saved = sum(pool.map(service.save_feedback, feedback))
+    elapsed = time.perf_counter() - started
+    total = service.get_feedback_summary()['total_feedback_count']
+    stats = service.stats()
+    started = time.perf_counter()
+    for i in range(1000):
+        service.get_feedback_summary(f'SYM{i % 20}')
+    summary_us = (time.perf_counter() - started) * 1000
+    started = time.perf_counter()
+    for _ in range(20):
+        pd.read_csv(csv_path)['rating'].value_counts()
+    csv_summary_us = (time.perf_counter() - started) / 20 * 1e6
+    service.close()
+    shutil.rmtree(db_dir, ignore_errors=True)
+
+    print(f"CSV read-modify-write: {csv_rate:.0f} writes/s over {n_csv} writes; "
+          f"group commit from {n_threads} threads: {saved / elapsed:.0f} writes/s, "
+          f"{saved}/{n_writes} saved, {total} stored, "
+          f"{stats['batches']} commits (average batch {stats['average_batch']:.1f}); "
+          f"summary from CSV of {n_csv} rows {csv_summary_us:.0f}us, "
+          f"from aggregates {summary_us:.1f}us")
+
+
+def ingest_benchmark(n_rows: int = 1_000_000, db_dir: str = 'bench_feedback'):
+    """
+    Time a bulk CSV ingest and paged queries over the result
+    """
+    shutil.rmtree(db_dir, ignore_errors=True)
+    os.makedirs(db_dir)
+    rng = np.random.default_rng(0)
+    start = np.datetime64('2022-01-01T00:00:00')
+    frame = pd.DataFrame({
+        'timestamp': (start + rng.integers(0, 3 * 365 * 86400, n_rows).astype('timedelta64[s]'))
+        .astype(str),
+        'stock_symbol': np.array([f'SYM{i}' for i in range(500)])[rng.integers(0, 500, n_rows)],
+        'rating': rng.integers(1, 6, n_rows),
+        'comments': np.where(rng.random(n_rows) < 0.2, 'needs work', ''),
+    })
+    frame.loc[::1000, 'rating'] = 9
+    data = io.BytesIO(frame.to_csv(index=False).encode('utf-8'))
+
+    service = FeedbackService(os.path.join(db_dir, 'none.csv'),
+                              os.path.join(db_dir, 'feedback.sqlite'))
+    started = time.perf_counter()
+    result = service.ingest(data, 'csv')
+    ingest_seconds = time.perf_counter() - started
+
+    def timed(function, repeat: int = 20):
+        started = time.perf_counter()
+        for _ in range(repeat):
+            value = function()
+        return value, (time.perf_counter() - started) / repeat * 1000
+
+    page, first_ms = timed(lambda: service.query_feedback('SYM7', limit=100))
+    cursor = page['next_cursor']
+    for _ in range(15):
+        cursor = service.query_feedback('SYM7', limit=100, cursor=cursor)['next_cursor']
+    _, deep_ms = timed(lambda: service.query_feedback('SYM7', limit=100, cursor=cursor))
+    _, window_ms = timed(lambda: service.query_feedback(
+        start=datetime(2023, 6, 1), end=datetime(2023, 6, 2), limit=100))
+    _, lowest_ms = timed(lambda: service.lowest_rated_comments(
+        since=datetime(2024, 6, 1), limit=50))
+    service.close()
+    shutil.rmtree(db_dir, ignore_errors=True)
+
+    print(f"Ingested {result['imported']} of {result['received']} rows "
+          f"({result['rejected']} rejected) in {ingest_seconds:.1f}s, "
+          f"{result['imported'] / ingest_seconds:.0f} rows/s; "
+          f"symbol page 1 {first_ms:.2f}ms, page 17 {deep_ms:.2f}ms, "
+          f"one-day window {window_ms:.2f}ms, lowest-rated comments {lowest_ms:.2f}ms")
+
+
+if __name__ == '__main__':
+    benchmark()
+    ingest_benchmark()
@@ -0,0 +1,37 @@
+import time
+
+import numpy as np
+import pandas as pd
+
+from services.forecast_cache import ForecastCache
+
+
+def benchmark(window: int = 2000, new_bars: int = 50):
+    """
+    Time sliding updates of a cached native model against full refits
+    """
+    rng = np.random.default_rng(0)
+    n = window + new_bars
+    prices = pd.Series(100 + np.cumsum(rng.normal(0, 1, n)),
+                       index=pd.date_range('2015-01-01', periods=n, freq='D'))
+
+    cache = ForecastCache()
+    cache.forecast('SYM', prices.iloc[:window])
+    started = time.perf_counter()
+    for end in range(window + 1, n + 1):
+        cache.forecast('SYM', prices.iloc[end - window:end])
+    slide_time = (time.perf_counter() - started) / new_bars
+
+    started = time.perf_counter()
+    for end in range(window + 1, n + 1):
+        ForecastCache().forecast('SYM', prices.iloc[end - window:end])
+    refit_time = (time.perf_counter() - started) / new_bars
+
+    stats = cache.stats()
+    print(f"{window}-bar window: sliding update {slide_time * 1000:.2f} ms, "
+          f"full refit {refit_time * 1000:.2f} ms, "
+          f"{stats['incremental_updates']} updates, {stats['full_refits']} refits")
+
+
+if __name__ == '__main__':
+    benchmark()
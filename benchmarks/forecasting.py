@@ -0,0 +1,39 @@
+import time
+
+import numpy as np
+
+from services.forecasting import native_forecast_matrix, statsmodels_forecast
+from tests.fixtures import synthetic_prices
+
+
+def benchmark(sizes=(1, 100, 10_000), n_obs: int = 250, reference_limit: int = 100):
+    """
+    Time both forecast backends
+
+    statsmodels is timed on at most ``reference_limit`` series and
+    extrapolated linearly beyond that. Agreement between the backends is
+    checked in tests/test_forecasting.py.
+    """
+    for n_series in sizes:
+        prices = synthetic_prices(n_series, n_obs)
+
+        started = time.perf_counter()
+        native = native_forecast_matrix(prices)
+        native_time = time.perf_counter() - started
+
+        sample = min(n_series, reference_limit)
+        started = time.perf_counter()
+        reference = np.stack([statsmodels_forecast(row) for row in prices[:sample]])
+        reference_time = (time.perf_counter() - started) * n_series / sample
+
+        # Compare forecast moves relative to the typical daily move
+        scale = np.std(np.diff(prices[:sample], axis=1), axis=1, keepdims=True)
+        deviation = np.max(np.abs(native[:sample] - reference) / scale)
+        print(f"{n_series:>6} series: native {native_time * 1000:9.2f} ms, "
+              f"statsmodels {reference_time * 1000:11.2f} ms"
+              f"{' (extrapolated)' if sample < n_series else ''}, "
+              f"max deviation {deviation:.3f} daily std")
+
+
+if __name__ == '__main__':
+    benchmark()
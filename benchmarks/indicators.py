@@ -0,0 +1,33 @@
+import time
+
+from services.indicators import INDICATORS, IndicatorEngine
+from tests.fixtures import synthetic_bars
+
+
+def benchmark(history_lengths=(1_000, 100_000, 1_000_000), updates: int = 1_000):
+    """
+    Compare full computation with per-bar incremental updates
+
+    Per-bar update cost should stay flat as the history grows.
+    """
+    names = list(INDICATORS)
+    engine = IndicatorEngine()
+    for n_bars in history_lengths:
+        data = synthetic_bars(n_bars + updates)
+        history = data.take(slice(None, n_bars))
+
+        started = time.perf_counter()
+        _, states = engine.update({}, history, names)
+        full_time = time.perf_counter() - started
+
+        started = time.perf_counter()
+        for i in range(n_bars, n_bars + updates):
+            _, states = engine.update(states, data.take(slice(i, i + 1)), names)
+        per_bar = (time.perf_counter() - started) / updates
+
+        print(f"{n_bars:>9} bars: full compute {full_time * 1000:9.2f} ms, "
+              f"incremental update {per_bar * 1e6:8.1f} us/bar")
+
+
+if __name__ == '__main__':
+    benchmark()
@@ -0,0 +1,88 @@
+import os
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+from services.artifact_store import ArtifactStore
+from services.voice_interaction import (
+    FakeTTSEngine,
+    OfflineSpeechRecognizer,
+    VoiceInteractionService,
+    split_sentences
+)
+from tests.fixtures import pause, tone, write_wav
+
+
+def benchmark(minutes: float = 10.0, sample_rate: int = 16000):
+    """
+    Transcribe a long synthetic recording serially and in concurrent segments
+
+    Uses the offline recognizer, so only segmentation, I/O and concurrency
+    are measured.
+    """
+    # Alternate 3-12 second tone bursts ("speech") with 0.5-1.5 second pauses
+    rng = np.random.default_rng(0)
+    parts = []
+    written = 0
+    while written < minutes * 60 * sample_rate:
+        parts.append(tone(rng.uniform(3, 12), sample_rate))
+        parts.append(pause(rng.uniform(0.5, 1.5), sample_rate, seed=len(parts)))
+        written += len(parts[-2]) + len(parts[-1])
+    path = tempfile.NamedTemporaryFile(suffix='.wav', delete=False).name
+    write_wav(path, np.concatenate(parts), sample_rate)
+    del parts
+
+    try:
+        for workers in (1, 8):
+            service = VoiceInteractionService(
+                audio_store=ArtifactStore(tempfile.mkdtemp()),
+                recognizer=OfflineSpeechRecognizer(delay_per_second=0.01),
+                max_workers=workers)
+            tracemalloc.start()
+            started = time.perf_counter()
+            text = service.speech_to_text(path)
+            elapsed = time.perf_counter() - started
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            print(f"{minutes:.0f} min of audio ({os.path.getsize(path) / 1e6:.0f} MB), "
+                  f"{workers} worker(s): {len(text.split('<')) - 1} segments in {elapsed:.2f}s, "
+                  f"peak Python memory {peak / 1e6:.1f} MB")
+    finally:
+        os.unlink(path)
+
+
+def tts_benchmark(n_sentences: int = 24):
+    """
+    Compare time to first audio byte for whole-text and streamed synthesis
+    """
+    text = ' '.join(
+        f"Point {i}: the stock shows a moderate trend with support near recent lows, "
+        f"while momentum indicators remain neutral." for i in range(n_sentences))
+    engine = FakeTTSEngine()
+
+    started = time.perf_counter()
+    path = tempfile.NamedTemporaryFile(suffix='.mp3', delete=False).name
+    engine.synthesize(text, path)
+    os.unlink(path)
+    whole = time.perf_counter() - started
+
+    service = VoiceInteractionService(audio_store=ArtifactStore(tempfile.mkdtemp()),
+                                      tts_engine=engine, tts_workers=4)
+    for label in ('cold', 'cached'):
+        started = time.perf_counter()
+        first_byte = None
+        size = 0
+        for chunk in service.stream_speech(text):
+            first_byte = first_byte or time.perf_counter() - started
+            size += len(chunk)
+        total = time.perf_counter() - started
+        print(f"{len(text)} chars, {len(split_sentences(text))} segments: whole-text synthesis "
+              f"{whole:.2f}s to first byte; streamed ({label}) first byte {first_byte:.2f}s, "
+              f"complete {total:.2f}s, {size / 1024:.0f} KiB")
+
+
+if __name__ == '__main__':
+    benchmark()
+    tts_benchmark()
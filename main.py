@@ -1,7 +1,15 @@
 import os
+import json
+import asyncio
+import io
+import itertools
+import shutil
+from datetime import datetime
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Literal, Optional
 from dotenv import load_dotenv
-from fastapi import FastAPI, File, UploadFile, HTTPException
-from fastapi.responses import FileResponse, HTMLResponse
+from fastapi import FastAPI, File, UploadFile, HTTPException, Query, Request, Response
+from fastapi.responses import FileResponse, HTMLResponse, JSONResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 import uvicorn
@@ -10,17 +18,29 @@ import tempfile
 # Import models
 from services.models import (
     StockAnalysisRequest,
+    BatchStockAnalysisRequest,
+    BacktestRequest,
     FeedbackRequest,
     VoiceTranscriptionRequest,
     FinancialChatRequest,
-    FeedbackModel
+    FeedbackModel,
+    Interval,
+    Period
 )
 
 # Import services
-from services.stock_analysis import StockAnalysisService
-from services.voice_interaction import VoiceInteractionService
+from services.stock_analysis import StockAnalysisService, ANALYSIS_STAGES
+from services.jobs import JobManager, QueueFullError, SqliteJobStore
+from services.backtest import Backtester
+from services.voice_interaction import (
+    VoiceInteractionService,
+    OfflineSpeechRecognizer,
+    FakeTTSEngine
+)
 from services.report_generator import ReportGeneratorService
 from services.feedback import FeedbackService
+from services.llm_cache import ResponseCache
+from services.llm_client import LLMClient
 
 
 # Load environment variables
@@ -45,14 +65,83 @@ app.add_middleware(
 )
 
 # Initialize services
+# Gemini responses are shared by reports and chat; set LLM_CACHE_DIR to persist them
+llm_cache = ResponseCache(
+    ttl=float(os.getenv('LLM_CACHE_TTL_SECONDS', str(6 * 3600))),
+    disk_dir=os.getenv('LLM_CACHE_DIR') or None
+)
+# One client bounds concurrency and request rate for every model call; LLM_BACKEND
+# selects gemini, fake (offline, simulated token latency) or http (a stub server)
+llm_client = LLMClient.from_env(cache=llm_cache)
 stock_analysis_service = StockAnalysisService(
-    gemini_api_key=os.getenv('GEMINI_API_KEY', '')
+    gemini_api_key=os.getenv('GEMINI_API_KEY', ''),
+    llm_client=llm_client
+)
+# SPEECH_BACKEND=offline and TTS_BACKEND=fake swap Google speech services for offline stand-ins
+voice_interaction_service = VoiceInteractionService(
+    recognizer=OfflineSpeechRecognizer() if os.getenv('SPEECH_BACKEND') == 'offline' else None,
+    max_workers=int(os.getenv('SPEECH_MAX_CONCURRENCY', '4')),
+    tts_engine=FakeTTSEngine() if os.getenv('TTS_BACKEND') == 'fake' else None,
+    tts_workers=int(os.getenv('TTS_MAX_CONCURRENCY', '4'))
 )
-voice_interaction_service = VoiceInteractionService()
 report_generator_service = ReportGeneratorService(
-    api_key=os.getenv('GEMINI_API_KEY', '')
+    api_key=os.getenv('GEMINI_API_KEY', ''),
+    llm_client=llm_client
+)
+feedback_service = FeedbackService(
+    db_path=os.getenv('FEEDBACK_DB_PATH', 'user_feedback.sqlite')
 )
-feedback_service = FeedbackService()
+
+
+async def _run_analysis_job(job, on_stage):
+    """
+    Run a queued analysis, publishing the state after each stage
+    """
+    params = job.params
+    state = await stock_analysis_service.comprehensive_analysis_async(
+        params['stock_symbol'],
+        backend=params['forecast_backend'],
+        period=params['period'],
+        interval=params['interval'],
+        indicators=params['indicators'],
+        on_stage=lambda stage, partial: on_stage(stage, partial.model_dump(mode='json'))
+    )
+    return state.model_dump(mode='json')
+
+
+# Set JOB_STORE_PATH to keep job results across restarts
+job_manager = JobManager(
+    _run_analysis_job,
+    workers=int(os.getenv('JOB_WORKERS', '4')),
+    max_queue=int(os.getenv('JOB_QUEUE_DEPTH', '100')),
+    store=SqliteJobStore(os.getenv('JOB_STORE_PATH')) if os.getenv('JOB_STORE_PATH') else None
+)
+
+
+def _sse(event: str, data: str) -> str:
+    """
+    Format one server-sent event
+
+    :param event: Event name
+    :param data: JSON payload
+    :return: Encoded event
+    """
+    return f"event: {event}\ndata: {data}\n\n"
+
+
+@app.on_event("startup")
+async def start_services():
+    await job_manager.start()
+
+
+@app.on_event("shutdown")
+async def shutdown_services():
+    await job_manager.stop()
+    if job_manager.store is not None:
+        await asyncio.to_thread(job_manager.store.close)
+    await stock_analysis_service.web_scraper.aclose()
+    stock_analysis_service.close()
+    feedback_service.close()
 
 
 @app.get("/", response_class=HTMLResponse)
@@ -69,12 +158,20 @@ async def analyze_stock(request: StockAnalysisRequest):
     :param request: Stock analysis request containing stock symbol
     :return: Comprehensive financial analysis results
     """
+    if request.stream:
+        return StreamingResponse(_stream_analysis(request),
+                                 media_type="text/event-stream",
+                                 headers={"Cache-Control": "no-cache"})
+
     try:
         # return request.stock_symbol
         # Perform analysis
-        analysis_result = stock_analysis_service.comprehensive_analysis(
+        analysis_result = await stock_analysis_service.comprehensive_analysis_async(
             request.stock_symbol,
-            os.getenv('GEMINI_API_KEY', '')
+            backend=request.forecast_backend,
+            period=request.period,
+            interval=request.interval,
+            indicators=request.indicators
         )
 
         return analysis_result
@@ -82,6 +179,123 @@ async def analyze_stock(request: StockAnalysisRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+async def _stream_analysis(request: StockAnalysisRequest):
+    """
+    Stream an analysis: quantitative results first, then report text as it is generated
+
+    Events are ``analysis`` (the state without the report), ``report``
+    (``{"text": chunk}``) and ``done`` (report, chart path and any error).
+    """
+    try:
+        async for event, payload in stock_analysis_service.stream_analysis(
+                request.stock_symbol,
+                backend=request.forecast_backend,
+                period=request.period,
+                interval=request.interval,
+                indicators=request.indicators):
+            if event == 'analysis':
+                yield _sse(event, payload.model_dump_json(exclude={'analysis_report'}))
+            elif event == 'report':
+                yield _sse(event, json.dumps({"text": payload}))
+            else:
+                yield _sse(event, json.dumps({
+                    "analysis_report": payload.analysis_report,
+                    "visualization_path": payload.visualization_path,
+                    "error": payload.error
+                }))
+    except Exception as e:
+        yield _sse('done', json.dumps({"error": str(e)}))
+
+
+@app.post("/jobs", status_code=202)
+async def submit_analysis_job(request: StockAnalysisRequest):
+    """
+    Queue a stock analysis and return its job id at once
+
+    :param request: Stock analysis request containing stock symbol
+    :return: Job id and the URL to poll for progress
+    """
+    key = ('analysis', request.stock_symbol.upper(), request.forecast_backend,
+           request.period, request.interval, tuple(request.indicators))
+    try:
+        job = job_manager.submit('analysis', request.model_dump(exclude={'stream'}),
+                                 stages=ANALYSIS_STAGES, key=key)
+    except QueueFullError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
+
+    return {"job_id": job.job_id, "status": job.status, "status_url": f"/jobs/{job.job_id}"}
+
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str,
+                  wait: float = Query(0, ge=0, le=60),
+                  version: int = -1):
+    """
+    Report job status, per-stage progress and the results available so far
+
+    :param job_id: Job id returned on submission
+    :param wait: Seconds to wait for the job to change past ``version`` (long-polling)
+    :param version: Last job version the client has seen
+    :return: Job status, stages and partial or final result
+    """
+    job = await job_manager.wait(job_id, since_version=version, timeout=wait)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job.to_dict()
+
+
+@app.post("/analyze-stocks")
+async def analyze_stocks(request: BatchStockAnalysisRequest):
+    """
+    Forecast many stocks in one request
+
+    :param request: Batch request containing stock symbols
+    :return: Per-symbol predictions, with failures reported individually
+    """
+    try:
+        results = await asyncio.to_thread(
+            stock_analysis_service.batch_analysis,
+            request.stock_symbols,
+            request.forecast_backend,
+            request.period,
+            request.interval)
+
+        return {
+            "results": results,
+            "failed": sum(1 for state in results if state.error)
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.post("/backtest")
+async def backtest(request: BacktestRequest):
+    """
+    Backtest the price forecasts over rolling windows of stored history
+
+    :param request: Backtest request containing stock symbols and window settings
+    :return: MAE, MAPE and directional accuracy per symbol and pooled
+    """
+    try:
+        backtester = Backtester(stock_analysis_service.price_store,
+                                stock_analysis_service.process_pool)
+        return await asyncio.to_thread(
+            backtester.run,
+            request.stock_symbols,
+            period=request.period,
+            interval=request.interval,
+            backend=request.forecast_backend,
+            window=request.window,
+            horizon=request.horizon,
+            stride=request.stride)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+# Uploads are copied to disk this many bytes at a time
+UPLOAD_CHUNK_BYTES = 1024 * 1024
+
+
 @app.post("/voice-to-text")
 async def transcribe_audio(file: UploadFile = File(...)):
     """
@@ -90,42 +304,49 @@ async def transcribe_audio(file: UploadFile = File(...)):
     :param file: Uploaded audio file
     :return: Transcribed text
     """
+    temp_file_path = None
     try:
-        # Save uploaded file temporarily
+        # Copy the upload to a temporary file in fixed-size chunks, off the event loop
         with tempfile.NamedTemporaryFile(delete=False, suffix='.wav') as temp_file:
-            temp_file.write(await file.read())
             temp_file_path = temp_file.name
+            await asyncio.to_thread(shutil.copyfileobj, file.file, temp_file,
+                                    UPLOAD_CHUNK_BYTES)
 
-        # Transcribe audio
-        transcription = voice_interaction_service.speech_to_text(
-            temp_file_path)
-
-        # Remove temporary file
-        os.unlink(temp_file_path)
+        # Transcribe audio on a worker thread
+        transcription = await asyncio.to_thread(
+            voice_interaction_service.speech_to_text, temp_file_path)
 
         return {"transcription": transcription}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        # Remove temporary file
+        if temp_file_path:
+            os.unlink(temp_file_path)
 
 
 @app.post("/text-to-speech")
 async def convert_text_to_speech(text: str):
     """
-    Convert text to speech audio file
+    Convert text to speech audio, streamed sentence by sentence
+
+    Playback can start once the first sentence is synthesized while the
+    rest are synthesized concurrently.
 
     :param text: Text to convert to speech
-    :return: Path to generated audio file
+    :return: Chunked MP3 audio stream
     """
+    chunks = voice_interaction_service.stream_speech(text)
     try:
-        audio_path = voice_interaction_service.text_to_speech(text)
-
-        if not audio_path:
-            raise HTTPException(
-                status_code=500, detail="Failed to generate audio")
-
-        return FileResponse(audio_path, media_type="audio/mp3")
+        # Wait for the first sentence so synthesis failures still return an error status
+        first = await asyncio.to_thread(next, chunks, None)
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        print(f"Error in text-to-speech conversion: {e}")
+        raise HTTPException(status_code=500, detail="Failed to generate audio")
+    if first is None:
+        raise HTTPException(status_code=400, detail="No text to convert")
+
+    return StreamingResponse(itertools.chain([first], chunks), media_type="audio/mpeg")
 
 
 @app.post("/financial-chat")
@@ -133,21 +354,54 @@ async def financial_chat(request: FinancialChatRequest):
     """
     Generate conversational financial insights
 
-    :param request: Chat request with message and optional history
-    :return: Generated response
+    :param request: Chat request with message, and a session id or history
+    :return: Generated response and the session id to send with the next turn
     """
+    # Sessions keep the history server-side; client history only seeds a new session
+    session = report_generator_service.conversations.get_or_create(
+        request.session_id, request.history)
+
+    if request.stream:
+        return StreamingResponse(_stream_chat(request, session),
+                                 media_type="text/event-stream",
+                                 headers={"Cache-Control": "no-cache"})
+
     try:
-        # Generate response
-        response = report_generator_service.generate_chat_response(
+        # Generate response off the event loop
+        response = await asyncio.to_thread(
+            report_generator_service.generate_chat_response,
             request.message,
-            history=request.history
+            session=session
         )
 
-        return {"response": response}
+        return {"response": response, "session_id": session.session_id}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+async def _stream_chat(request: FinancialChatRequest, session):
+    """
+    Stream a chat response as ``token`` events followed by a ``done`` event
+    """
+    chunks = report_generator_service.stream_chat_response(
+        request.message,
+        session=session
+    )
+    parts = []
+    try:
+        while True:
+            # The model client blocks, so pull each chunk on a worker thread
+            chunk = await asyncio.to_thread(next, chunks, None)
+            if chunk is None:
+                break
+            parts.append(chunk)
+            yield _sse('token', json.dumps({"text": chunk}))
+        yield _sse('done', json.dumps({"response": ''.join(parts),
+                                       "session_id": session.session_id}))
+    except Exception as e:
+        yield _sse('done', json.dumps({"error": f"Error generating response: {str(e)}"}))
+
+
 @app.post("/submit-feedback")
 async def submit_feedback(request: FeedbackRequest):
     """
@@ -164,14 +418,17 @@ async def submit_feedback(request: FeedbackRequest):
             comments=request.comments
         )
 
-        # Save feedback
-        success = feedback_service.save_feedback(feedback)
-
-        if not success:
+        # Save feedback, waiting for the group commit that includes it
+        try:
+            await asyncio.wrap_future(feedback_service.submit(feedback))
+        except Exception as e:
+            print(f"Error saving feedback: {e}")
             raise HTTPException(
                 status_code=500, detail="Failed to save feedback")
 
         return {"message": "Feedback submitted successfully"}
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -191,25 +448,227 @@ async def get_feedback_summary(stock_symbol: str = None):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/feedback-import")
+async def import_feedback(request: Request, format: Literal['csv', 'ndjson'] = 'csv'):
+    """
+    Bulk import feedback from a CSV or NDJSON request body
+
+    CSV needs a header row with timestamp, stock_symbol, rating and
+    optionally comments; NDJSON has one object with those keys per line.
+    Invalid rows are rejected and reported, the rest are committed in
+    chunks. A malformed file stops the import with a 400 response; chunks
+    committed before the error are kept.
+
+    :param request: Request whose body is the feedback file
+    :param format: 'csv' or 'ndjson'
+    :return: Counts of received, imported and rejected rows with the first rejections
+    """
+    # Spool the upload first so the import never waits on the client
+    with tempfile.SpooledTemporaryFile(max_size=16 * UPLOAD_CHUNK_BYTES) as body:
+        async for chunk in request.stream():
+            body.write(chunk)
+        body.seek(0)
+        try:
+            return await asyncio.to_thread(feedback_service.ingest, body, format)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=f"Invalid feedback file: {e}")
+
+
+@app.get("/feedback")
+async def list_feedback(
+    stock_symbol: str = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = None
+):
+    """
+    Page through feedback, newest first
+
+    :param stock_symbol: Optional stock symbol to filter feedback
+    :param start: Optional earliest timestamp
+    :param end: Optional latest timestamp
+    :param limit: Rows per page
+    :param cursor: next_cursor from the previous page
+    :return: Feedback rows and the cursor of the next page
+    """
+    try:
+        return await asyncio.to_thread(
+            feedback_service.query_feedback, stock_symbol, start, end, limit, cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@app.get("/feedback-lowest-rated")
+async def lowest_rated_feedback(
+    stock_symbol: str = None,
+    since: Optional[datetime] = None,
+    limit: int = Query(20, ge=1, le=200)
+):
+    """
+    Retrieve the lowest-rated recent feedback comments
+
+    :param stock_symbol: Optional stock symbol to filter feedback
+    :param since: Optional earliest timestamp
+    :param limit: Most comments returned
+    :return: Feedback with comments, lowest rating first and newest first within a rating
+    """
+    return {
+        "items": await asyncio.to_thread(
+            feedback_service.lowest_rated_comments, stock_symbol, since, limit)
+    }
+
+
+@app.get("/feedback-trends")
+async def get_feedback_trends(
+    stock_symbol: str = None,
+    granularity: Literal['hour', 'day'] = 'day',
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None
+):
+    """
+    Retrieve feedback statistics per hour or day
+
+    :param stock_symbol: Optional stock symbol to filter feedback
+    :param granularity: Bucket size, 'hour' or 'day'
+    :param start: Optional start of the window
+    :param end: Optional end of the window
+    :return: Feedback summaries per bucket in time order
+    """
+    return {
+        "stock_symbol": stock_symbol,
+        "granularity": granularity,
+        "buckets": feedback_service.get_feedback_trends(stock_symbol, granularity, start, end)
+    }
+
+
+@app.get("/feedback-export")
+async def export_feedback(stock_symbol: str = None):
+    """
+    Download feedback as CSV in the original user_feedback.csv layout
+
+    :param stock_symbol: Optional stock symbol to filter feedback
+    :return: CSV file
+    """
+    out = io.StringIO()
+    await asyncio.to_thread(feedback_service.export_csv, out, stock_symbol)
+    return Response(
+        content=out.getvalue(),
+        media_type="text/csv",
+        headers={"Content-Disposition": 'attachment; filename="user_feedback.csv"'}
+    )
+
+
+@app.get("/metrics")
+async def get_metrics():
+    """
+    Report cache statistics for the analysis pipeline
+
+    :return: Hit/miss counters per cache
+    """
+    return {
+        "price_store": stock_analysis_service.price_store.stats(),
+        "forecast_cache": stock_analysis_service.forecast_cache.stats(),
+        "indicator_engine": stock_analysis_service.indicator_engine.stats(),
+        "analysis_coalescing": stock_analysis_service.coalescer.stats(),
+        "llm_cache": llm_cache.stats(),
+        "llm_client": llm_client.stats(),
+        "http_client": stock_analysis_service.web_scraper.http_client.stats(),
+        "conversations": report_generator_service.conversations.stats(),
+        "feedback": feedback_service.stats(),
+        "chart_renderer": stock_analysis_service.chart_renderer.stats(),
+        "artifacts": {
+            "visualizations": stock_analysis_service.chart_renderer.store.stats(),
+            "audio_outputs": voice_interaction_service.audio_store.stats()
+        },
+        "text_to_speech": voice_interaction_service.tts_stats(),
+        "jobs": job_manager.stats()
+    }
+
+
+def _not_modified(request: Request, etag: str, modified: Optional[float] = None) -> bool:
+    """
+    Evaluate If-None-Match and If-Modified-Since against the current representation
+
+    :param request: Incoming request
+    :param etag: Quoted entity tag of the current representation
+    :param modified: Last modification time as a Unix timestamp
+    :return: True if the client's copy is current and a 304 can be sent
+    """
+    if_none_match = request.headers.get('if-none-match')
+    if if_none_match is not None:
+        # If-None-Match takes precedence; weak and strong tags compare equal here
+        tags = [tag.strip().removeprefix('W/') for tag in if_none_match.split(',')]
+        return '*' in tags or etag in tags
+
+    if_modified_since = request.headers.get('if-modified-since')
+    if if_modified_since and modified is not None:
+        try:
+            return int(modified) <= parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
 @app.get("/visualizations/{filename}")
-async def get_visualization(filename: str):
+async def get_visualization(filename: str, request: Request):
     """
     Serve stock visualization image
 
+    Chart file names contain a hash of the chart contents, so responses are
+    cacheable forever and revalidation is answered with 304 Not Modified.
+
     :param filename: Name of the visualization file
     :return: Visualization image file
     """
+    # Only plain file names recorded in the chart store are served
+    visualization_path = await asyncio.to_thread(
+        stock_analysis_service.chart_renderer.store.get, filename)
     try:
-        visualization_path = os.path.join('visualizations', filename)
-        # visualization_path = filename
+        stat = os.stat(visualization_path) if visualization_path else None
+    except OSError:
+        stat = None
+    if stat is None:
+        raise HTTPException(status_code=404, detail="Visualization not found")
+
+    headers = {
+        # The content hash in the name identifies the image on every server
+        "ETag": f'"{os.path.splitext(filename)[0]}"',
+        "Last-Modified": formatdate(stat.st_mtime, usegmt=True),
+        "Cache-Control": "public, max-age=31536000, immutable",
+    }
+    if _not_modified(request, headers["ETag"], stat.st_mtime):
+        return Response(status_code=304, headers=headers)
+    return FileResponse(visualization_path, media_type="image/png", headers=headers)
+
+
+@app.get("/chart-data/{stock_symbol}")
+async def get_chart_data(stock_symbol: str,
+                         request: Request,
+                         period: Period = '1mo',
+                         interval: Interval = '1d',
+                         forecast_backend: Literal['native', 'statsmodels'] = 'statsmodels'):
+    """
+    Historical closes and forecast as compact arrays for drawing the chart in the browser
 
-        if not os.path.exists(visualization_path):
-            raise HTTPException(
-                status_code=404, detail="Visualization not found")
+    Clients revalidate with the returned ETag and receive 304 Not Modified
+    while the data is unchanged.
 
-        return FileResponse(visualization_path, media_type="image/png")
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    :param stock_symbol: Stock symbol to chart
+    :param period: History period, e.g. '1mo' or '5y'
+    :param interval: Bar interval, e.g. '1d' or '5m'
+    :param forecast_backend: Forecast backend, 'native' or 'statsmodels'
+    :return: ``{"history": {"t": [...], "close": [...]}, "forecast": {...}}`` with Unix-second timestamps
+    """
+    series = await stock_analysis_service.chart_series_async(
+        stock_symbol, backend=forecast_backend, period=period, interval=interval)
+    if series.get('error'):
+        raise HTTPException(status_code=404, detail=series['error'])
+
+    headers = {"ETag": f'"{series["version"]}"', "Cache-Control": "no-cache"}
+    if _not_modified(request, headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+    return JSONResponse(series, headers=headers)
 
 # Create .env file with example configurations
 
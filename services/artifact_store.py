@@ -0,0 +1,263 @@
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Callable, Iterator, Optional
+
+
+INDEX_FILENAME = '.artifacts.sqlite'
+
+# Last-access times are only rewritten when older than this, keeping reads cheap
+TOUCH_INTERVAL = 60.0
+
+
+class ArtifactStore:
+    """
+    Directory of generated files with a byte quota and an SQLite index
+
+    Files are written to a temporary name and renamed into place, then
+    recorded in an index holding each file's size and last access time.
+    Lookups read the index instead of scanning the directory. When the
+    directory grows past ``max_bytes``, least recently used files are
+    deleted, and files unused for ``ttl`` seconds are removed by periodic
+    sweeps. The index is a WAL-mode SQLite database inside the directory,
+    so several worker processes can share one store.
+    """
+    def __init__(self,
+                 root_dir: str,
+                 max_bytes: int = 512 * 1024 ** 2,
+                 ttl: float = 7 * 24 * 3600,
+                 sweep_interval: float = 300.0):
+        """
+        Initialize the artifact store
+
+        :param root_dir: Directory holding the artifacts and the index
+        :param max_bytes: Total size kept before least recently used files are evicted
+        :param ttl: Seconds an unused file is kept; 0 keeps files until evicted by size
+        :param sweep_interval: Minimum seconds between expiry sweeps in this process
+        """
+        self.root_dir = root_dir
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.sweep_interval = sweep_interval
+        os.makedirs(root_dir, exist_ok=True)
+
+        index_path = os.path.join(root_dir, INDEX_FILENAME)
+        self._conn = sqlite3.connect(index_path, timeout=30, check_same_thread=False,
+                                     isolation_level=None)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._lock = threading.Lock()
+        with self._transaction():
+            created = self._conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE name = 'artifacts'").fetchone() is None
+            self._conn.execute(
+                'CREATE TABLE IF NOT EXISTS artifacts ('
+                ' name TEXT PRIMARY KEY,'
+                ' size INTEGER NOT NULL,'
+                ' created_at REAL NOT NULL,'
+                ' accessed_at REAL NOT NULL)')
+            self._conn.execute(
+                'CREATE INDEX IF NOT EXISTS artifacts_accessed ON artifacts (accessed_at)')
+            if created:
+                # Files written before the index existed come under the quota too
+                self._adopt_existing()
+        self._swept_at = 0.0
+        self._stats = {
+            'hits': 0,
+            'misses': 0,
+            'writes': 0,
+            'evictions': 0,
+            'evicted_bytes': 0,
+            'expired': 0,
+        }
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        """
+        Serialize threads and take SQLite's write lock up front
+        """
+        with self._lock:
+            self._conn.execute('BEGIN IMMEDIATE')
+            try:
+                yield self._conn
+            except BaseException:
+                self._conn.execute('ROLLBACK')
+                raise
+            self._conn.execute('COMMIT')
+
+    def _adopt_existing(self):
+        now = time.time()
+        for entry in os.scandir(self.root_dir):
+            if entry.is_file() and not entry.name.startswith('.') \
+                    and not entry.name.endswith('.tmp'):
+                stat = entry.stat()
+                self._conn.execute(
+                    'INSERT OR IGNORE INTO artifacts VALUES (?, ?, ?, ?)',
+                    (entry.name, stat.st_size, stat.st_mtime, min(stat.st_mtime, now)))
+
+    @staticmethod
+    def valid_name(name: str) -> bool:
+        """
+        Check that a name refers to a plain file inside the store
+
+        :param name: Artifact file name
+        :return: True for names without directories that are not hidden
+        """
+        return bool(name) and os.path.basename(name) == name and not name.startswith('.')
+
+    def path(self, name: str) -> str:
+        if not self.valid_name(name):
+            raise ValueError(f"Invalid artifact name: {name!r}")
+        return os.path.join(self.root_dir, name)
+
+    def get(self, name: str) -> Optional[str]:
+        """
+        Look up an artifact and mark it as recently used
+
+        :param name: Artifact file name
+        :return: Path of the file, or None if it is not stored or has expired
+        """
+        if not self.valid_name(name):
+            return None
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT accessed_at FROM artifacts WHERE name = ?', (name,)).fetchone()
+        path = os.path.join(self.root_dir, name)
+        # Expired files are left for the next sweep to delete
+        if row is None or (self.ttl and now - row[0] > self.ttl) or not os.path.exists(path):
+            with self._lock:
+                self._stats['misses'] += 1
+            if row is not None and not os.path.exists(path):
+                self._forget(name)
+            return None
+
+        if now - row[0] > TOUCH_INTERVAL:
+            with self._transaction() as conn:
+                conn.execute('UPDATE artifacts SET accessed_at = ? WHERE name = ?', (now, name))
+        with self._lock:
+            self._stats['hits'] += 1
+        return path
+
+    def temp_path(self, name: str) -> str:
+        """
+        Unique temporary path in the store directory for writing an artifact
+
+        :param name: Artifact file name the temporary file will be committed as
+        :return: Path to write to before calling commit
+        """
+        self.path(name)
+        return os.path.join(self.root_dir, f'.{name}.{uuid.uuid4().hex}.tmp')
+
+    def commit(self, name: str, temp_path: str) -> str:
+        """
+        Move a written temporary file into place and record it
+
+        :param name: Artifact file name
+        :param temp_path: Path returned by temp_path, already written
+        :return: Path of the stored artifact
+        """
+        path = self.path(name)
+        size = os.path.getsize(temp_path)
+        os.replace(temp_path, path)
+        now = time.time()
+        with self._transaction() as conn:
+            conn.execute('INSERT OR REPLACE INTO artifacts VALUES (?, ?, ?, ?)',
+                         (name, size, now, now))
+            self._stats['writes'] += 1
+            self._evict(conn)
+        self._maybe_sweep()
+        return path
+
+    def discard(self, temp_path: str):
+        """
+        Remove a temporary file that will not be committed
+        """
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+
+    def write(self, name: str, writer: Callable[[str], None]) -> str:
+        """
+        Write an artifact atomically with a function that saves to a path
+
+        :param name: Artifact file name
+        :param writer: Function writing the file contents to the given path, e.g. ``tts.save``
+        :return: Path of the stored artifact
+        """
+        temp_path = self.temp_path(name)
+        try:
+            writer(temp_path)
+            return self.commit(name, temp_path)
+        finally:
+            self.discard(temp_path)
+
+    def _forget(self, name: str):
+        with self._transaction() as conn:
+            conn.execute('DELETE FROM artifacts WHERE name = ?', (name,))
+
+    def _delete(self, conn: sqlite3.Connection, rows: list, counter: str):
+        for name, size in rows:
+            try:
+                os.remove(os.path.join(self.root_dir, name))
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                print(f"Error deleting artifact {name}: {e}")
+                continue
+            conn.execute('DELETE FROM artifacts WHERE name = ?', (name,))
+            self._stats[counter] += 1
+            if counter == 'evictions':
+                self._stats['evicted_bytes'] += size
+
+    def _evict(self, conn: sqlite3.Connection):
+        """
+        Delete least recently used files until the quota is met; must hold the transaction
+        """
+        total = conn.execute('SELECT COALESCE(SUM(size), 0) FROM artifacts').fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        victims = []
+        for name, size in conn.execute(
+                'SELECT name, size FROM artifacts ORDER BY accessed_at'):
+            if total <= self.max_bytes:
+                break
+            victims.append((name, size))
+            total -= size
+        self._delete(conn, victims, 'evictions')
+
+    def _maybe_sweep(self):
+        if not self.ttl or time.time() - self._swept_at < self.sweep_interval:
+            return
+        self.sweep()
+
+    def sweep(self):
+        """
+        Remove files unused for longer than the TTL
+        """
+        self._swept_at = time.time()
+        with self._transaction() as conn:
+            expired = conn.execute(
+                'SELECT name, size FROM artifacts WHERE accessed_at < ?',
+                (self._swept_at - self.ttl,)).fetchall()
+            self._delete(conn, expired, 'expired')
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def stats(self) -> dict:
+        """
+        Report disk usage from the shared index and this process's counters
+
+        :return: Dictionary of store statistics
+        """
+        with self._lock:
+            count, total = self._conn.execute(
+                'SELECT COUNT(*), COALESCE(SUM(size), 0) FROM artifacts').fetchone()
+            return dict(self._stats, artifacts=count, bytes=total,
+                        max_bytes=self.max_bytes, ttl=self.ttl)
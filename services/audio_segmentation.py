@@ -0,0 +1,178 @@
+import wave
+from typing import List, NamedTuple, Tuple
+
+import numpy as np
+
+
+class WavInfo(NamedTuple):
+    sample_rate: int
+    sample_width: int
+    channels: int
+    n_samples: int
+
+
+def wav_info(path: str) -> WavInfo:
+    """
+    Read the format of a PCM WAV file
+
+    :param path: WAV file path
+    :return: Sample rate, sample width in bytes, channel count and length in samples
+    :raises wave.Error: If the file is not PCM WAV
+    """
+    with wave.open(path, 'rb') as wav:
+        return WavInfo(wav.getframerate(), wav.getsampwidth(),
+                       wav.getnchannels(), wav.getnframes())
+
+
+def _decode(raw: bytes, width: int, channels: int) -> np.ndarray:
+    """
+    Decode little-endian PCM into an int32 array of shape (samples, channels)
+    """
+    if width == 1:
+        samples = np.frombuffer(raw, dtype=np.uint8).astype(np.int32) - 128
+    elif width == 2:
+        samples = np.frombuffer(raw, dtype='<i2').astype(np.int32)
+    elif width == 3:
+        b = np.frombuffer(raw, dtype=np.uint8).reshape(-1, 3).astype(np.int32)
+        samples = b[:, 0] | (b[:, 1] << 8) | (b[:, 2] << 16)
+        samples = np.where(samples >= 1 << 23, samples - (1 << 24), samples)
+    elif width == 4:
+        samples = np.frombuffer(raw, dtype='<i4').astype(np.int32)
+    else:
+        raise ValueError(f"Unsupported sample width: {width}")
+    return samples.reshape(-1, channels)
+
+
+def _encode(samples: np.ndarray, width: int) -> bytes:
+    """
+    Encode a 1-D int32 array back into little-endian PCM
+    """
+    if width == 1:
+        return (samples + 128).astype(np.uint8).tobytes()
+    if width == 2:
+        return samples.astype('<i2').tobytes()
+    if width == 3:
+        return samples.astype('<i4').view(np.uint8).reshape(-1, 4)[:, :3].tobytes()
+    return samples.astype('<i4').tobytes()
+
+
+def frame_levels(path: str, frame_ms: int = 30, block_frames: int = 1000) -> np.ndarray:
+    """
+    Loudness of consecutive short frames, reading the file block by block
+
+    :param path: PCM WAV file path
+    :param frame_ms: Frame length in milliseconds
+    :param block_frames: Frames decoded per read, bounding memory use
+    :return: RMS level of each frame in dB relative to full scale
+    """
+    info = wav_info(path)
+    frame_len = max(1, info.sample_rate * frame_ms // 1000)
+    full_scale = float(1 << (8 * info.sample_width - 1))
+    levels = []
+    with wave.open(path, 'rb') as wav:
+        while True:
+            raw = wav.readframes(frame_len * block_frames)
+            if not raw:
+                break
+            samples = _decode(raw, info.sample_width, info.channels).mean(axis=1)
+            n = len(samples) // frame_len * frame_len
+            if n == 0:
+                break
+            frames = samples[:n].reshape(-1, frame_len) / full_scale
+            rms = np.sqrt(np.mean(frames * frames, axis=1))
+            levels.append(20 * np.log10(np.maximum(rms, 1e-10)))
+    return np.concatenate(levels) if levels else np.empty(0)
+
+
+def split_on_silence(levels: np.ndarray,
+                     frame_ms: int = 30,
+                     min_silence_ms: int = 400,
+                     min_segment_ms: int = 2000,
+                     max_segment_ms: int = 30000,
+                     margin_db: float = 12.0,
+                     silence_db: float = -45.0) -> List[Tuple[int, int]]:
+    """
+    Choose segment boundaries at pauses in speech
+
+    A frame is silent when it is below ``silence_db`` and within
+    ``margin_db`` of the recording's noise floor (its 10th percentile
+    level, at least -70 dBFS). The absolute limit keeps speech without
+    pauses from being taken for the noise floor. Segments are cut in the
+    middle of silent runs of at least ``min_silence_ms``, once they are at
+    least ``min_segment_ms`` long. A segment reaching ``max_segment_ms``
+    without a pause is cut at its quietest frame. Segments that are silent
+    throughout are dropped.
+
+    :param levels: Frame levels from frame_levels
+    :param frame_ms: Frame length in milliseconds
+    :param min_silence_ms: Shortest pause that may separate segments
+    :param min_segment_ms: Shortest segment cut at a pause
+    :param max_segment_ms: Longest segment
+    :param margin_db: Level above the noise floor still treated as silence
+    :param silence_db: Level in dBFS at or above which a frame is never silent
+    :return: List of (start frame, end frame) pairs in order
+    """
+    n = len(levels)
+    if n == 0:
+        return []
+    # Digital silence would put the floor far below any real pause
+    threshold = min(max(np.percentile(levels, 10), -70.0) + margin_db, silence_db)
+    silent = levels < threshold
+
+    # Midpoints of silent runs long enough to be pauses
+    edges = np.flatnonzero(np.diff(np.concatenate(([0], silent.astype(np.int8), [0]))))
+    runs = edges.reshape(-1, 2)
+    min_silence = max(1, min_silence_ms // frame_ms)
+    cuts = [int(start + end) // 2 for start, end in runs if end - start >= min_silence]
+
+    min_len = max(1, min_segment_ms // frame_ms)
+    max_len = max(min_len + 1, max_segment_ms // frame_ms)
+    segments = []
+    start = 0
+    for cut in cuts + [n]:
+        while cut - start > max_len:
+            forced = start + min_len + int(np.argmin(levels[start + min_len:start + max_len]))
+            segments.append((start, forced))
+            start = forced
+        if cut - start >= min_len or cut == n:
+            if cut > start:
+                segments.append((start, cut))
+            start = cut
+    return [(s, e) for s, e in segments if not silent[s:e].all()]
+
+
+def segment_wav(path: str, frame_ms: int = 30, **options) -> Tuple[WavInfo, List[Tuple[int, int]]]:
+    """
+    Split a PCM WAV file at silence
+
+    :param path: PCM WAV file path
+    :param frame_ms: Analysis frame length in milliseconds
+    :param options: Keyword arguments for split_on_silence
+    :return: File format and (start sample, end sample) pairs in order
+    :raises wave.Error: If the file is not PCM WAV
+    """
+    info = wav_info(path)
+    frame_len = max(1, info.sample_rate * frame_ms // 1000)
+    levels = frame_levels(path, frame_ms)
+    # Samples after the last whole frame belong to a segment ending at the last frame
+    return info, [(start * frame_len, info.n_samples if end == len(levels) else end * frame_len)
+                  for start, end in split_on_silence(levels, frame_ms, **options)]
+
+
+def read_mono_pcm(path: str, start: int, end: int) -> bytes:
+    """
+    Read a range of samples as mono PCM in the file's sample width
+
+    :param path: PCM WAV file path
+    :param start: First sample
+    :param end: Sample after the last
+    :return: Raw mono PCM bytes
+    """
+    with wave.open(path, 'rb') as wav:
+        wav.setpos(start)
+        raw = wav.readframes(end - start)
+        width, channels = wav.getsampwidth(), wav.getnchannels()
+    if channels == 1:
+        return raw
+    samples = _decode(raw, width, channels).mean(axis=1).round().astype(np.int32)
+    return _encode(samples, width)
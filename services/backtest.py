@@ -0,0 +1,286 @@
+import argparse
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+from .forecasting import (
+    ARIMA_ORDER,
+    BACKENDS,
+    FORECAST_STEPS,
+    native_forecast_matrix,
+    statsmodels_forecast
+)
+from .price_store import CsvDirectorySource, PriceStore
+
+
+def rolling_origins(n_obs: int, window: int, horizon: int, stride: int) -> np.ndarray:
+    """
+    Forecast origins of a rolling-origin backtest
+
+    An origin ``t`` fits on bars ``t - window .. t - 1`` and is scored on
+    bars ``t .. t + horizon - 1``.
+
+    :param n_obs: Length of the price history
+    :param window: Number of bars each model is fitted on
+    :param horizon: Number of bars forecast from each origin
+    :param stride: Bars between consecutive origins
+    :return: Array of origin positions
+    """
+    return np.arange(window, n_obs - horizon + 1, stride)
+
+
+def _backtest_worker(task: tuple) -> tuple:
+    """
+    Backtest one symbol; runs in a worker process
+
+    Native forecasts for every window of the symbol are fitted in one
+    batched solve. Only error sums are returned so results stay small.
+
+    :param task: Tuple of (symbol, closes, window, horizon, stride, backend, order)
+    :return: Tuple of (symbol, error sums or None, error message or None)
+    """
+    stock_symbol, close, window, horizon, stride, backend, order = task
+    try:
+        origins = rolling_origins(len(close), window, horizon, stride)
+        if len(origins) == 0:
+            return stock_symbol, None, (
+                f"Need at least {window + horizon} bars, got {len(close)}")
+
+        windows = sliding_window_view(close, window)[origins - window]
+        if backend == 'native':
+            forecasts = native_forecast_matrix(windows, order, horizon)
+        elif backend == 'statsmodels':
+            forecasts = np.stack([statsmodels_forecast(row, order, horizon)
+                                  for row in windows])
+        else:
+            raise ValueError(f"Unknown forecast backend: {backend}")
+
+        actuals = close[origins[:, None] + np.arange(horizon)]
+        last_close = close[origins - 1]
+        errors = np.abs(forecasts - actuals)
+        return stock_symbol, {
+            'windows': len(origins),
+            'abs_error': errors.sum(axis=0),
+            'pct_error': (errors / np.abs(actuals)).sum(axis=0),
+            'direction_hits': int(np.sum(
+                np.sign(forecasts[:, -1] - last_close) == np.sign(actuals[:, -1] - last_close))),
+        }, None
+    except Exception as e:
+        return stock_symbol, None, str(e)
+
+
+def summarize(sums: dict) -> dict:
+    """
+    Turn accumulated error sums into backtest metrics
+
+    :param sums: Error sums as produced by the backtest workers
+    :return: Dictionary of MAE, MAPE (%) and directional accuracy, overall and per horizon step
+    """
+    windows = sums['windows']
+    mae_by_step = sums['abs_error'] / windows
+    mape_by_step = sums['pct_error'] / windows * 100
+    return {
+        'windows': int(windows),
+        'mae': float(mae_by_step.mean()),
+        'mape': float(mape_by_step.mean()),
+        'directional_accuracy': sums['direction_hits'] / windows,
+        'mae_by_step': mae_by_step.tolist(),
+        'mape_by_step': mape_by_step.tolist(),
+    }
+
+
+class Backtester:
+    """
+    Rolling-origin backtests of the ARIMA(5, 1, 0) price forecasts
+
+    Each origin refits the same model ``generate_predictions`` uses on the
+    preceding window of closes and compares its forecast with the bars that
+    followed. Histories come from the price store, so repeated runs reuse
+    stored bars, and symbols are spread over a process pool.
+    """
+    def __init__(self, price_store: PriceStore, process_pool: Optional[Executor] = None):
+        """
+        Initialize the backtester
+
+        :param price_store: Price history store to read closes from
+        :param process_pool: Executor for per-symbol work; a temporary pool is used when omitted
+        """
+        self.price_store = price_store
+        self.process_pool = process_pool
+
+    def run(self,
+            stock_symbols: List[str],
+            period: str = '5y',
+            interval: str = '1d',
+            backend: str = 'native',
+            window: int = 250,
+            horizon: int = FORECAST_STEPS,
+            stride: int = 5,
+            order: tuple = ARIMA_ORDER) -> dict:
+        """
+        Backtest forecasts for many symbols
+
+        :param stock_symbols: Stock symbols to backtest
+        :param period: History period to replay, e.g. '5y'
+        :param interval: Bar interval, e.g. '1d'
+        :param backend: Forecast backend, 'native' or 'statsmodels'
+        :param window: Number of bars each model is fitted on
+        :param horizon: Number of bars forecast from each origin
+        :param stride: Bars between consecutive origins
+        :param order: ARIMA order
+        :return: Dictionary with per-symbol metrics, pooled metrics and failures
+        """
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown forecast backend: {backend}")
+        started = time.perf_counter()
+        stock_symbols = list(dict.fromkeys(s.upper() for s in stock_symbols))
+
+        histories = self.price_store.get_many(stock_symbols, period=period,
+                                              interval=interval)
+        failed: Dict[str, str] = {}
+        tasks = []
+        for stock_symbol in stock_symbols:
+            history = histories.get(stock_symbol)
+            if history is None or not history:
+                failed[stock_symbol] = "No price data available"
+                continue
+            close = np.asarray(history['Close'], dtype='float64')
+            close = close[~np.isnan(close)]
+            tasks.append((stock_symbol, close, window, horizon, stride, backend, order))
+
+        results = {}
+        total = None
+        for stock_symbol, sums, error in self._map(tasks):
+            if error:
+                failed[stock_symbol] = error
+                continue
+            results[stock_symbol] = summarize(sums)
+            if total is None:
+                total = dict(sums)
+            else:
+                total = {key: total[key] + sums[key] for key in total}
+
+        return {
+            'period': period,
+            'interval': interval,
+            'backend': backend,
+            'window': window,
+            'horizon': horizon,
+            'stride': stride,
+            'symbols': results,
+            'overall': summarize(total) if total else None,
+            'failed': failed,
+            'elapsed_seconds': time.perf_counter() - started,
+        }
+
+    def _map(self, tasks: List[tuple]):
+        """
+        Run backtest tasks on the process pool in chunks
+        """
+        if not tasks:
+            return []
+        workers = os.cpu_count() or 1
+        chunksize = max(1, len(tasks) // (workers * 4))
+        if self.process_pool is not None:
+            return list(self.process_pool.map(_backtest_worker, tasks,
+                                              chunksize=chunksize))
+        with ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context('forkserver')) as pool:
+            return list(pool.map(_backtest_worker, tasks, chunksize=chunksize))
+
+
+def synthesize_fixtures(data_dir: str,
+                        n_symbols: int = 500,
+                        n_bars: int = 1260,
+                        interval: str = '1d',
+                        seed: int = 0) -> List[str]:
+    """
+    Write random-walk OHLCV fixtures for offline backtests
+
+    Daily bars end on the current business day so that period filters
+    such as '5y' cover them.
+
+    :param data_dir: Fixture directory for CsvDirectorySource
+    :param n_symbols: Number of symbols to write
+    :param n_bars: Number of bars per symbol
+    :param interval: Bar interval subdirectory
+    :param seed: Random seed
+    :return: List of written symbols
+    """
+    rng = np.random.default_rng(seed)
+    index = pd.bdate_range(end=pd.Timestamp.utcnow().tz_localize(None).normalize(),
+                           periods=n_bars, name='Date')
+    os.makedirs(os.path.join(data_dir, interval), exist_ok=True)
+
+    symbols = []
+    for i in range(n_symbols):
+        stock_symbol = f'SYN{i:04d}'
+        close = 100 * np.exp(np.cumsum(rng.normal(0.0003, 0.015, n_bars)))
+        spread = close * np.abs(rng.normal(0, 0.01, n_bars))
+        pd.DataFrame({
+            'Open': np.concatenate([[close[0]], close[:-1]]),
+            'High': close + spread,
+            'Low': close - spread,
+            'Close': close,
+            'Volume': rng.integers(100_000, 10_000_000, n_bars),
+        }, index=index).to_csv(os.path.join(data_dir, interval, f'{stock_symbol}.csv'))
+        symbols.append(stock_symbol)
+    return symbols
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(
+        description="Rolling-origin backtest of the ARIMA price forecasts, "
+                    "run offline against CSV fixtures")
+    parser.add_argument('--data-dir', required=True,
+                        help="Fixture directory with {interval}/{SYMBOL}.csv files")
+    parser.add_argument('--store-dir', default=None,
+                        help="Price store directory, defaults to DATA_DIR/.store")
+    parser.add_argument('--symbols', nargs='*', default=None,
+                        help="Symbols to backtest, defaults to every fixture")
+    parser.add_argument('--synthesize', type=int, default=0, metavar='N',
+                        help="Write N random-walk fixtures before running")
+    parser.add_argument('--period', default='5y')
+    parser.add_argument('--interval', default='1d')
+    parser.add_argument('--backend', choices=BACKENDS, default='native')
+    parser.add_argument('--window', type=int, default=250)
+    parser.add_argument('--horizon', type=int, default=FORECAST_STEPS)
+    parser.add_argument('--stride', type=int, default=5)
+    parser.add_argument('--output', default=None, help="Write the full report as JSON")
+    args = parser.parse_args(argv)
+
+    if args.synthesize:
+        synthesize_fixtures(args.data_dir, args.synthesize, interval=args.interval)
+
+    source = CsvDirectorySource(args.data_dir)
+    # Fixtures never change underneath the store, so stored bars never go stale
+    store = PriceStore(root_dir=args.store_dir or os.path.join(args.data_dir, '.store'),
+                       data_source=source, max_staleness=float('inf'))
+    symbols = args.symbols or source.symbols(args.interval)
+
+    report = Backtester(store).run(
+        symbols, period=args.period, interval=args.interval, backend=args.backend,
+        window=args.window, horizon=args.horizon, stride=args.stride)
+
+    overall = report['overall']
+    print(f"{len(report['symbols'])} symbols, {overall['windows'] if overall else 0} windows "
+          f"in {report['elapsed_seconds']:.1f}s ({len(report['failed'])} failed)")
+    if overall:
+        print(f"MAE {overall['mae']:.4f}  MAPE {overall['mape']:.2f}%  "
+              f"directional accuracy {overall['directional_accuracy']:.1%}")
+    print(f"price store: {store.stats()}")
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,262 @@
+import hashlib
+import importlib
+import json
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from typing import Dict, Optional
+
+import numpy as np
+
+from .artifact_store import ArtifactStore
+from .timeseries import TimeSeries
+
+
+# Bump when the chart style changes so existing images are not reused
+CHART_VERSION = 1
+
+DEFAULT_OPTIONS = {
+    'width': 12,
+    'height': 6,
+    'dpi': 100,
+}
+
+
+def chart_key(stock_symbol: str,
+              history_index: np.ndarray,
+              history_close: np.ndarray,
+              forecast_index: np.ndarray,
+              forecast_close: np.ndarray,
+              options: dict) -> str:
+    """
+    Hash everything that affects the rendered image
+
+    :return: Hex digest identifying the chart contents
+    """
+    digest = hashlib.sha256()
+    digest.update(json.dumps([CHART_VERSION, stock_symbol, options],
+                             sort_keys=True).encode('utf-8'))
+    for array, dtype in ((history_index, 'datetime64[ns]'), (history_close, 'float64'),
+                         (forecast_index, 'datetime64[ns]'), (forecast_close, 'float64')):
+        data = np.ascontiguousarray(array, dtype=dtype)
+        digest.update(len(data).to_bytes(8, 'little'))
+        digest.update(data.tobytes())
+    return digest.hexdigest()
+
+
+def chart_series(stock_symbol: str,
+                 history: TimeSeries,
+                 predictions: TimeSeries,
+                 decimals: int = 4) -> dict:
+    """
+    Compact JSON form of the forecast chart for client-side drawing
+
+    Timestamps are Unix seconds and prices are rounded, in parallel arrays.
+    ``version`` identifies the contents, like the hash in chart file names.
+
+    :param stock_symbol: Stock symbol
+    :param history: Historical prices with a 'Close' column
+    :param predictions: Forecast with a 'Predicted_Close' column
+    :param decimals: Decimal places kept for prices
+    :return: JSON-compatible dictionary
+    """
+    def series(index: np.ndarray, values: np.ndarray) -> dict:
+        values = np.round(np.asarray(values, dtype='float64'), decimals)
+        return {
+            't': (index.astype('datetime64[s]').astype('int64')).tolist(),
+            'close': [None if np.isnan(v) else v for v in values.tolist()],
+        }
+
+    key = chart_key(stock_symbol, history.index, history['Close'],
+                    predictions.index, predictions['Predicted_Close'], {'decimals': decimals})
+    return {
+        'stock_symbol': stock_symbol,
+        'version': key[:16],
+        'history': series(history.index, history['Close']),
+        'forecast': series(predictions.index, predictions['Predicted_Close']),
+    }
+
+
+def _load_matplotlib():
+    """
+    Import matplotlib in each worker up front so the first render is not slowed by it
+    """
+    importlib.import_module('matplotlib.backends.backend_agg')
+    importlib.import_module('matplotlib.figure')
+
+
+def render_forecast_png(path: str,
+                        stock_symbol: str,
+                        history_index: np.ndarray,
+                        history_close: np.ndarray,
+                        forecast_index: np.ndarray,
+                        forecast_close: np.ndarray,
+                        options: dict) -> float:
+    """
+    Render the forecast chart to a PNG file
+
+    Uses a standalone Figure with the Agg canvas instead of pyplot, so no
+    global figure state is shared and renders can run concurrently.
+
+    :param path: Output file path, normally an artifact store temporary path
+    :return: Seconds spent rendering
+    """
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    started = time.perf_counter()
+    figure = Figure(figsize=(options['width'], options['height']), dpi=options['dpi'])
+    FigureCanvasAgg(figure)
+    ax = figure.add_subplot()
+
+    # Plot historical prices
+    ax.plot(history_index, history_close, label='Historical Prices')
+
+    # Plot predictions
+    ax.plot(forecast_index, forecast_close, color='red', label='Predicted Prices')
+
+    ax.set_title(f'{stock_symbol} Price Forecast')
+    ax.set_xlabel('Date')
+    ax.set_ylabel('Price')
+    ax.legend()
+    ax.tick_params(axis='x', labelrotation=45)
+
+    figure.savefig(path, format='png', bbox_inches='tight')
+    return time.perf_counter() - started
+
+
+class ChartRenderer:
+    """
+    Content-addressed chart rendering on a worker pool
+
+    Each chart is named by a hash of the plotted data and options, so an
+    unchanged chart is served from disk instead of being rendered again,
+    and concurrent requests for the same chart share one render. Renders
+    run in worker processes, so charts for different symbols are drawn in
+    parallel without touching the request handler's interpreter.
+    """
+    def __init__(self,
+                 output_dir: str = 'visualizations',
+                 max_workers: Optional[int] = None,
+                 executor: Optional[Executor] = None,
+                 store: Optional[ArtifactStore] = None):
+        """
+        Initialize the chart renderer
+
+        :param output_dir: Directory holding rendered charts, used when no store is given
+        :param max_workers: Render processes, defaults to half the cores
+        :param executor: Executor to render on instead of an owned process pool
+        :param store: Artifact store holding the charts under a disk quota
+        """
+        self.store = store or ArtifactStore(output_dir)
+        self.output_dir = self.store.root_dir
+        self.max_workers = max_workers or max(1, (os.cpu_count() or 2) // 2)
+        self._executor = executor
+        self._owns_executor = executor is None
+        self._in_flight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._stats = {
+            'renders': 0,
+            'hits': 0,
+            'deduplicated': 0,
+            'errors': 0,
+            'render_seconds': 0.0,
+        }
+
+    @property
+    def executor(self) -> Executor:
+        """
+        Lazily created render pool
+        """
+        with self._lock:
+            if self._executor is None:
+                # Forking a process that already runs I/O threads can deadlock
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context('forkserver'),
+                    initializer=_load_matplotlib)
+            return self._executor
+
+    def close(self):
+        """
+        Release the render pool if this renderer created it
+        """
+        if self._owns_executor and self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    def render_forecast(self,
+                        stock_symbol: str,
+                        history: TimeSeries,
+                        predictions: TimeSeries,
+                        **options) -> str:
+        """
+        Return the path of the forecast chart, rendering it only if it does not exist yet
+
+        :param stock_symbol: Stock symbol shown in the title
+        :param history: Historical prices with a 'Close' column
+        :param predictions: Forecast with a 'Predicted_Close' column
+        :param options: Overrides of DEFAULT_OPTIONS, e.g. width, height and dpi
+        :return: Path of the PNG file
+        """
+        options = dict(DEFAULT_OPTIONS, **options)
+        args = (stock_symbol, history.index, history['Close'],
+                predictions.index, predictions['Predicted_Close'], options)
+        key = chart_key(*args)
+        name = f'{stock_symbol}_forecast_{key[:16]}.png'
+
+        with self._lock:
+            future = self._in_flight.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._in_flight[key] = future
+            else:
+                self._stats['deduplicated'] += 1
+        if not owner:
+            # Another request is rendering the same chart
+            return future.result()
+
+        temp_path = None
+        try:
+            path = self.store.get(name)
+            if path is not None:
+                with self._lock:
+                    self._stats['hits'] += 1
+            else:
+                temp_path = self.store.temp_path(name)
+                seconds = self.executor.submit(
+                    render_forecast_png, temp_path, *args).result()
+                path = self.store.commit(name, temp_path)
+                with self._lock:
+                    self._stats['renders'] += 1
+                    self._stats['render_seconds'] += seconds
+            future.set_result(path)
+            return path
+        except Exception as e:
+            with self._lock:
+                self._stats['errors'] += 1
+            future.set_exception(e)
+            raise
+        finally:
+            if temp_path is not None:
+                self.store.discard(temp_path)
+            with self._lock:
+                del self._in_flight[key]
+
+    def stats(self) -> dict:
+        """
+        Report render counts, reuse and average render time
+
+        :return: Dictionary of renderer statistics
+        """
+        with self._lock:
+            renders = self._stats['renders']
+            return dict(
+                self._stats,
+                in_flight=len(self._in_flight),
+                render_ms_avg=1000 * self._stats['render_seconds'] / renders if renders else 0.0,
+            )
+
@@ -0,0 +1,162 @@
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent identical calls and briefly reuse their result
+
+    The first caller for a key runs the computation; callers arriving while
+    it is in flight wait for the same result instead of starting their own.
+    A successful result is then served from memory for ``ttl`` seconds.
+    Exceptions are shared with the waiting callers but never kept.
+    """
+    def __init__(self,
+                 ttl: float = 30.0,
+                 max_entries: int = 1024,
+                 cacheable: Optional[Callable[[Any], bool]] = None):
+        """
+        Initialize the coalescer
+
+        :param ttl: Seconds a finished result is served to new callers
+        :param max_entries: Maximum number of fresh results kept
+        :param cacheable: Predicate deciding whether a result may be reused after it finishes
+        """
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.cacheable = cacheable or (lambda result: True)
+        self._fresh: 'OrderedDict[Hashable, tuple]' = OrderedDict()
+        self._tasks: Dict[Hashable, asyncio.Future] = {}
+        self._futures: Dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+        self._stats = {
+            'requests': 0,
+            'executions': 0,
+            'coalesced': 0,
+            'fresh_hits': 0,
+            'errors': 0,
+        }
+
+    def _lookup(self, key: Hashable):
+        """
+        Return a fresh result for key, counting the request; must hold the lock
+        """
+        self._stats['requests'] += 1
+        entry = self._fresh.get(key)
+        if entry is None:
+            return False, None
+        if time.monotonic() - entry[0] > self.ttl:
+            del self._fresh[key]
+            return False, None
+        self._stats['fresh_hits'] += 1
+        return True, entry[1]
+
+    def _finish(self, key: Hashable, result: Any = None, error: Optional[BaseException] = None):
+        """
+        Record a finished computation; must hold the lock
+        """
+        if error is not None:
+            self._stats['errors'] += 1
+            return
+        if self.ttl <= 0 or not self.cacheable(result):
+            return
+        self._fresh[key] = (time.monotonic(), result)
+        self._fresh.move_to_end(key)
+        while len(self._fresh) > self.max_entries:
+            self._fresh.popitem(last=False)
+
+    async def run(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Await ``fn()`` once per key across concurrent callers
+
+        The computation runs as its own task, so a caller that is cancelled
+        (e.g. a disconnected client) does not cancel it for the others.
+
+        :param key: Identity of the computation
+        :param fn: Coroutine function producing the result
+        :return: Result of the shared computation
+        """
+        with self._lock:
+            found, result = self._lookup(key)
+            if found:
+                return result
+            task = self._tasks.get(key)
+            if task is not None:
+                self._stats['coalesced'] += 1
+            else:
+                self._stats['executions'] += 1
+                task = asyncio.ensure_future(fn())
+                self._tasks[key] = task
+                task.add_done_callback(lambda done: self._task_done(key, done))
+
+        return await asyncio.shield(task)
+
+    def _task_done(self, key: Hashable, task: asyncio.Future):
+        with self._lock:
+            if self._tasks.get(key) is task:
+                del self._tasks[key]
+            if task.cancelled():
+                return
+            error = task.exception()
+            self._finish(key, None if error else task.result(), error)
+
+    def run_sync(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """
+        Call ``fn()`` once per key across concurrent threads
+
+        :param key: Identity of the computation
+        :param fn: Function producing the result
+        :return: Result of the shared computation
+        """
+        with self._lock:
+            found, result = self._lookup(key)
+            if found:
+                return result
+            future = self._futures.get(key)
+            leader = future is None
+            if leader:
+                self._stats['executions'] += 1
+                future = Future()
+                self._futures[key] = future
+            else:
+                self._stats['coalesced'] += 1
+
+        if not leader:
+            return future.result()
+
+        try:
+            result = fn()
+        except BaseException as e:
+            with self._lock:
+                del self._futures[key]
+                self._finish(key, error=e)
+            future.set_exception(e)
+            raise
+
+        with self._lock:
+            del self._futures[key]
+            self._finish(key, result)
+        future.set_result(result)
+        return result
+
+    def invalidate(self, key: Hashable):
+        """
+        Drop a fresh result so the next caller recomputes it
+        """
+        with self._lock:
+            self._fresh.pop(key, None)
+
+    def stats(self) -> dict:
+        """
+        Report how many requests were coalesced or served fresh
+
+        :return: Dictionary of request counters
+        """
+        with self._lock:
+            return dict(self._stats,
+                        in_flight=len(self._tasks) + len(self._futures),
+                        fresh_entries=len(self._fresh))
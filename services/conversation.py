@@ -0,0 +1,219 @@
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Callable, List, Optional, Tuple
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Approximate the token count of text without calling the model
+
+    Uses the common estimate of four characters per token for English text.
+
+    :param text: Text to measure
+    :return: Estimated number of tokens
+    """
+    return (len(text) + 3) // 4
+
+
+def truncate_tokens(text: str, max_tokens: int) -> str:
+    """
+    Cut text to roughly ``max_tokens`` tokens
+
+    :param text: Text to shorten
+    :param max_tokens: Token limit
+    :return: Text within the limit
+    """
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    return text[:max_tokens * 4 - 3].rstrip() + '...'
+
+
+class ConversationSession:
+    """
+    Stored turns of one conversation plus a running summary of older turns
+
+    ``turns[:summarized]`` are folded into ``summary``; the rest are sent
+    verbatim. Token counts are stored with each turn so that building a
+    prompt never re-measures the transcript.
+    """
+    def __init__(self, session_id: str):
+        self.session_id = session_id
+        self.turns: List[Tuple[str, str, int]] = []
+        self.summarized = 0
+        self.summary = ''
+        self.summary_tokens = 0
+        self.recent_tokens = 0
+        self.updated_at = time.time()
+        self.lock = threading.Lock()
+
+
+class ConversationStore:
+    """
+    Server-side chat sessions with a bounded prompt history
+
+    The history section of each prompt holds a cached summary of older turns
+    followed by as many recent turns as fit the token budget. When recent
+    turns overflow, the oldest are folded into the summary in one summarizer
+    call, leaving room for several more turns before the next fold, so each
+    turn is summarized once and prompt size stays bounded however long the
+    conversation runs.
+    """
+    def __init__(self,
+                 summarize: Callable[[str, str], str],
+                 token_budget: int = 2000,
+                 max_sessions: int = 10_000,
+                 ttl: float = 24 * 3600):
+        """
+        Initialize the conversation store
+
+        :param summarize: Function of (previous summary, transcript) returning an updated summary
+        :param token_budget: Maximum tokens of history included in a prompt
+        :param max_sessions: Maximum number of sessions kept before LRU eviction
+        :param ttl: Seconds an idle session is kept
+        """
+        self.summarize = summarize
+        self.token_budget = token_budget
+        # A quarter of the budget goes to the summary, the rest to recent
+        # turns, less a few tokens for section headers
+        self.summary_budget = token_budget // 4
+        self.recent_budget = token_budget - self.summary_budget - 32
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self._sessions: 'OrderedDict[str, ConversationSession]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {
+            'turns': 0,
+            'prompts': 0,
+            'summaries': 0,
+            'summarized_turns': 0,
+            'history_tokens_max': 0,
+            'history_tokens_total': 0,
+        }
+
+    def get_or_create(self,
+                      session_id: Optional[str] = None,
+                      history: Optional[List[List[str]]] = None) -> ConversationSession:
+        """
+        Return an existing session or start a new one
+
+        :param session_id: Session identifier returned by an earlier turn
+        :param history: Client-side [user, assistant] pairs used to seed a new session
+        :return: Conversation session
+        """
+        now = time.time()
+        with self._lock:
+            while self._sessions:
+                oldest = next(iter(self._sessions.values()))
+                if now - oldest.updated_at <= self.ttl and len(self._sessions) < self.max_sessions:
+                    break
+                self._sessions.popitem(last=False)
+
+            session = self._sessions.get(session_id) if session_id else None
+            if session is None:
+                session = ConversationSession(session_id or uuid.uuid4().hex)
+                self._sessions[session.session_id] = session
+                for turn in history or []:
+                    if len(turn) >= 2:
+                        self._append(session, turn[0], turn[1])
+            self._sessions.move_to_end(session.session_id)
+            session.updated_at = now
+            return session
+
+    def _append(self, session: ConversationSession, message: str, response: str):
+        # A single oversized turn may take at most half the recent budget
+        limit = self.recent_budget // 4
+        message = truncate_tokens(message, limit)
+        response = truncate_tokens(response, limit)
+        tokens = estimate_tokens(message) + estimate_tokens(response) + 4
+        session.turns.append((message, response, tokens))
+        session.recent_tokens += tokens
+
+    def record(self, session: ConversationSession, message: str, response: str):
+        """
+        Append a completed turn to a session
+
+        :param session: Conversation session
+        :param message: User message
+        :param response: Assistant response
+        """
+        with session.lock:
+            self._append(session, message, response)
+            session.updated_at = time.time()
+        with self._lock:
+            self._stats['turns'] += 1
+
+    @staticmethod
+    def _transcript(turns: List[Tuple[str, str, int]]) -> str:
+        return "\n".join(f"User: {message}\nAssistant: {response}"
+                         for message, response, _ in turns)
+
+    def history_context(self, session: ConversationSession) -> str:
+        """
+        Build the history section of the next prompt
+
+        :param session: Conversation session
+        :return: Summary and recent turns within the token budget
+        """
+        with session.lock:
+            if session.recent_tokens > self.recent_budget:
+                self._fold(session)
+
+            parts = []
+            if session.summary:
+                parts.append(f"Summary of the earlier conversation:\n{session.summary}")
+            recent = session.turns[session.summarized:]
+            if recent:
+                parts.append(f"Recent conversation:\n{self._transcript(recent)}")
+            tokens = session.summary_tokens + session.recent_tokens
+
+        with self._lock:
+            self._stats['prompts'] += 1
+            self._stats['history_tokens_max'] = max(self._stats['history_tokens_max'], tokens)
+            self._stats['history_tokens_total'] += tokens
+        return "\n\n".join(parts)
+
+    def _fold(self, session: ConversationSession):
+        """
+        Fold the oldest recent turns into the summary; must hold the session lock
+        """
+        # Leave half the recent budget free so folds happen every few turns
+        target = self.recent_budget // 2
+        end = session.summarized
+        remaining = session.recent_tokens
+        while end < len(session.turns) and remaining > target:
+            remaining -= session.turns[end][2]
+            end += 1
+
+        folded = session.turns[session.summarized:end]
+        try:
+            summary = self.summarize(session.summary, self._transcript(folded))
+        except Exception as e:
+            print(f"Error summarizing conversation: {e}")
+            # Without a summary the turns are dropped rather than overflowing the budget
+            summary = session.summary
+
+        session.summary = truncate_tokens(summary, self.summary_budget)
+        session.summary_tokens = estimate_tokens(session.summary)
+        session.summarized = end
+        session.recent_tokens = remaining
+        with self._lock:
+            self._stats['summaries'] += 1
+            self._stats['summarized_turns'] += len(folded)
+
+    def stats(self) -> dict:
+        """
+        Report session counts and history prompt sizes
+
+        :return: Dictionary of counters, including the largest history sent
+        """
+        with self._lock:
+            prompts = self._stats['prompts']
+            return dict(
+                self._stats,
+                sessions=len(self._sessions),
+                token_budget=self.token_budget,
+                history_tokens_avg=self._stats['history_tokens_total'] / prompts if prompts else 0.0,
+            )
+
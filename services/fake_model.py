@@ -0,0 +1,81 @@
+import hashlib
+import time
+from typing import Iterator, Optional
+
+
+_VOCABULARY = (
+    "The stock shows a moderate upward trend with support near recent lows. "
+    "Momentum indicators remain neutral while volatility is close to its "
+    "historical average. Earnings revisions and sector rotation are the main "
+    "drivers to watch. Short-term risk is balanced, and the long-term outlook "
+    "depends on margin stability and broader market conditions. "
+).split(' ')
+
+
+class FakeResponse:
+    """
+    Minimal stand-in for a Gemini response or streamed chunk
+    """
+    def __init__(self, text: str):
+        self.text = text
+
+
+class FakeGenerativeModel:
+    """
+    Offline stand-in for ``genai.GenerativeModel``
+
+    Produces deterministic text derived from the prompt and emits it token
+    by token with configurable delays, so streaming and caching can be
+    exercised without network access or an API key.
+    """
+    model_name = 'fake'
+
+    def __init__(self,
+                 first_token_delay: float = 0.5,
+                 token_delay: float = 0.02,
+                 n_tokens: int = 120,
+                 response_text: Optional[str] = None):
+        """
+        Initialize the fake model
+
+        :param first_token_delay: Seconds before the first token, like model prefill
+        :param token_delay: Seconds between subsequent tokens
+        :param n_tokens: Number of tokens in generated responses
+        :param response_text: Fixed response text, overriding the generated one
+        """
+        self.first_token_delay = first_token_delay
+        self.token_delay = token_delay
+        self.n_tokens = n_tokens
+        self.response_text = response_text
+
+    def _tokens(self, prompt: str) -> list:
+        if self.response_text is not None:
+            words = self.response_text.split(' ')
+        else:
+            # Rotate the vocabulary by a prompt hash so prompts get distinct answers
+            offset = hashlib.sha256(prompt.encode('utf-8')).digest()[0]
+            words = [_VOCABULARY[(offset + i) % len(_VOCABULARY)]
+                     for i in range(self.n_tokens)]
+        return [word + ' ' for word in words[:-1]] + words[-1:]
+
+    def _stream(self, tokens: list) -> Iterator[FakeResponse]:
+        time.sleep(self.first_token_delay)
+        for i, token in enumerate(tokens):
+            if i:
+                time.sleep(self.token_delay)
+            yield FakeResponse(token)
+
+    def generate_content(self, prompt: str, stream: bool = False, **kwargs):
+        """
+        Generate a response the way ``GenerativeModel.generate_content`` does
+
+        :param prompt: Prompt text
+        :param stream: Return an iterator of chunks instead of a full response
+        :return: FakeResponse, or an iterator of FakeResponse chunks when streaming
+        """
+        tokens = self._tokens(prompt)
+        if stream:
+            return self._stream(tokens)
+        for _ in self._stream(tokens):
+            pass
+        return FakeResponse(''.join(tokens))
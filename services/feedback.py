@@ -1,102 +1,773 @@
-import pandas as pd
+import base64
+import csv
 import os
-from datetime import datetime
+import queue
+import sqlite3
+import threading
+from concurrent.futures import Future
+from datetime import datetime, timedelta
+from typing import BinaryIO, Dict, Iterable, List, Optional, TextIO, Tuple
+
+import pandas as pd
+from dateutil import tz
+
 from .models import FeedbackModel
 
 
+CSV_COLUMNS = ['timestamp', 'stock_symbol', 'rating', 'comments']
+
+# Most feedback rows written in one transaction
+MAX_BATCH = 1000
+
+RATINGS = range(1, 6)
+
+# Trend buckets are prefixes of the fixed-width timestamps
+BUCKET_WIDTHS = {
+    'hour': len('2024-01-31T09'),
+    'day': len('2024-01-31'),
+}
+
+# Days of hourly trend buckets kept; daily buckets are kept for all feedback
+HOURLY_TREND_DAYS = 30
+
+# Rows validated and inserted together during a bulk ingest
+INGEST_CHUNK_ROWS = 50_000
+
+# Rejected rows described in an ingest result
+MAX_REPORTED_ERRORS = 20
+
+# Timestamps ending in a UTC offset are converted to local time
+_UTC_OFFSET = r'(?:Z|[+-]\d{2}:?\d{2})$'
+
+INDEXES = [
+    # Filtering by symbol and paging by time
+    'CREATE INDEX IF NOT EXISTS feedback_symbol_time ON feedback (stock_symbol, timestamp)',
+    'CREATE INDEX IF NOT EXISTS feedback_time ON feedback (timestamp)',
+    # Lowest-rated recent comments, one rating at a time
+    'CREATE INDEX IF NOT EXISTS feedback_symbol_comments ON feedback'
+    ' (stock_symbol, rating, timestamp) WHERE comments IS NOT NULL',
+    'CREATE INDEX IF NOT EXISTS feedback_comments ON feedback'
+    ' (rating, timestamp) WHERE comments IS NOT NULL',
+]
+
+
+def format_timestamp(value: datetime) -> str:
+    """
+    Fixed-width ISO timestamp, so stored timestamps sort and compare as text
+
+    Aware timestamps are converted to local time, matching the naive local
+    times FeedbackModel records by default.
+
+    :param value: Feedback timestamp
+    :return: Timestamp like 2024-01-31T09:30:00.000000
+    """
+    if value.tzinfo is not None:
+        value = value.astimezone().replace(tzinfo=None)
+    return value.isoformat(timespec='microseconds')
+
+
+def _check_rating(rating: int) -> int:
+    if rating not in RATINGS:
+        raise ValueError(f"Rating must be between 1 and 5, got {rating}")
+    return rating
+
+
+def _row(feedback: FeedbackModel) -> Tuple[str, str, int, Optional[str]]:
+    return (format_timestamp(feedback.timestamp), feedback.stock_symbol,
+            _check_rating(int(feedback.rating)), feedback.comments or None)
+
+
+def _strip_text(column: pd.Series) -> pd.Series:
+    """
+    Strip string values; anything else, e.g. a number from a JSON line, becomes missing
+    """
+    column = column.astype(object)
+    if pd.api.types.infer_dtype(column, skipna=True) == 'string':
+        return column.str.strip()
+    return column.map(lambda v: v.strip() if isinstance(v, str) else None).astype(object)
+
+
+def validate_feedback_frame(frame: pd.DataFrame) -> Tuple[pd.DataFrame, pd.Series]:
+    """
+    Validate and normalize a batch of feedback rows with column operations
+
+    Timestamps are ISO 8601; ones with a UTC offset are converted to local
+    time. Ratings must be whole numbers from 1 to 5 and stock symbols must
+    not be blank. Blank comments are stored as missing. Timestamps,
+    symbols and comments must be text; rows where a JSON line gives, say, a
+    number instead are rejected like any other malformed row.
+
+    :param frame: Rows with timestamp, stock_symbol, rating and optional comments columns
+    :return: Valid rows in stored form, and the reason each other row was rejected
+    :raises ValueError: If a required column is missing
+    """
+    missing = [column for column in CSV_COLUMNS[:3] if column not in frame.columns]
+    if missing:
+        raise ValueError(f"Missing columns: {', '.join(missing)}")
+
+    # Object columns: pandas' string dtype is slower for these element-wise operations
+    text = _strip_text(frame['timestamp'])
+    aware = text.str.contains(_UTC_OFFSET, na=False)
+    timestamps = pd.Series(pd.NaT, index=frame.index, dtype='datetime64[ns]')
+    if (~aware).any():
+        timestamps[~aware] = pd.to_datetime(text[~aware], errors='coerce', format='ISO8601')
+    if aware.any():
+        timestamps[aware] = pd.to_datetime(text[aware], errors='coerce', format='ISO8601',
+                                           utc=True).dt.tz_convert(tz.tzlocal()).dt.tz_localize(None)
+    symbols = _strip_text(frame['stock_symbol'])
+    # Booleans would pass as 0 or 1, and containers make to_numeric raise
+    ratings = frame['rating']
+    if ratings.dtype == object:
+        ratings = ratings.map(lambda v: None if isinstance(v, (bool, dict, list)) else v)
+    elif pd.api.types.is_bool_dtype(ratings):
+        ratings = pd.Series(None, index=frame.index, dtype=object)
+    ratings = pd.to_numeric(ratings, errors='coerce')
+    if 'comments' in frame.columns:
+        comments = frame['comments'].astype(object)
+        if pd.api.types.infer_dtype(comments, skipna=True) == 'string':
+            non_text = pd.Series(False, index=frame.index)
+        else:
+            non_text = comments.notna() & ~comments.map(lambda v: isinstance(v, str))
+        comments = comments.where(_strip_text(comments).fillna('') != '')
+    else:
+        comments = pd.Series(None, index=frame.index, dtype=object)
+        non_text = pd.Series(False, index=frame.index)
+
+    reasons = pd.Series(pd.NA, index=frame.index, dtype='string')
+    reasons = reasons.mask(non_text, 'comments must be text')
+    reasons = reasons.mask(~ratings.isin(list(RATINGS)), 'rating must be a whole number from 1 to 5')
+    reasons = reasons.mask(symbols.fillna('') == '', 'missing stock_symbol')
+    reasons = reasons.mask(timestamps.isna(), 'invalid timestamp')
+    valid = reasons.isna()
+
+    rows = pd.DataFrame({
+        # NumPy's microsecond ISO format matches format_timestamp and is much faster than strftime
+        'timestamp': timestamps[valid].to_numpy().astype('datetime64[us]').astype(str).astype(object),
+        'stock_symbol': symbols[valid],
+        'rating': ratings[valid].astype('int64'),
+        'comments': comments[valid].where(comments[valid].notna(), None),
+    })
+    return rows, reasons[~valid]
+
+
+def encode_cursor(timestamp: str, row_id: int) -> str:
+    """
+    Opaque page cursor for the position after a row
+    """
+    return base64.urlsafe_b64encode(f'{timestamp}|{row_id}'.encode('utf-8')).decode('ascii')
+
+
+def decode_cursor(cursor: str) -> Tuple[str, int]:
+    """
+    Position encoded by encode_cursor
+
+    :raises ValueError: If the cursor is malformed
+    """
+    try:
+        timestamp, row_id = base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8').split('|')
+        return timestamp, int(row_id)
+    except ValueError:
+        raise ValueError(f"Invalid cursor: {cursor!r}")
+
+
+class RatingTally:
+    """
+    Count, rating sum and histogram of a group of feedback
+    """
+    __slots__ = ('count', 'total', 'histogram')
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0
+        self.histogram = [0] * len(RATINGS)
+
+    def add(self, rating: int, n: int = 1):
+        self.count += n
+        self.total += rating * n
+        self.histogram[rating - RATINGS.start] += n
+
+    def summary(self) -> dict:
+        return {
+            'total_feedback_count': self.count,
+            'average_rating': self.total / self.count if self.count else 0,
+            'rating_distribution': {rating: n for rating, n in zip(RATINGS, self.histogram) if n}
+        }
+
+
+class FeedbackAggregates:
+    """
+    Running feedback statistics kept in memory
+
+    Holds a tally for all feedback, for each stock symbol, and for each
+    day and each hour of the last ``hourly_days`` days, overall and per
+    symbol. Adding feedback and reading a summary take constant time, and
+    a trend query only visits the buckets of one symbol. Only feedback
+    written through this process is counted after the rebuild at start-up.
+    """
+    def __init__(self, hourly_days: int = HOURLY_TREND_DAYS):
+        """
+        Initialize empty aggregates
+
+        :param hourly_days: Days of hourly buckets kept
+        """
+        self.hourly_days = hourly_days
+        self._lock = threading.Lock()
+        self._clear()
+
+    def _clear(self):
+        self._overall = RatingTally()
+        self._symbols: Dict[str, RatingTally] = {}
+        # granularity -> symbol (None for all) -> bucket -> tally
+        self._buckets: Dict[str, Dict[Optional[str], Dict[str, RatingTally]]] = {
+            granularity: {None: {}} for granularity in BUCKET_WIDTHS}
+        self._hour_cutoff = ''
+
+    def _advance_hour_cutoff(self) -> str:
+        """
+        Move the start of the hourly window to now, dropping older hours once a day
+        """
+        cutoff = format_timestamp(datetime.now() - timedelta(days=self.hourly_days))
+        cutoff = cutoff[:BUCKET_WIDTHS['hour']]
+        if cutoff[:BUCKET_WIDTHS['day']] != self._hour_cutoff[:BUCKET_WIDTHS['day']]:
+            for buckets in self._buckets['hour'].values():
+                for bucket in [bucket for bucket in buckets if bucket < cutoff]:
+                    del buckets[bucket]
+        self._hour_cutoff = cutoff
+        return cutoff
+
+    def _add(self, timestamp: str, stock_symbol: str, rating: int, n: int):
+        self._overall.add(rating, n)
+        self._tally(self._symbols, stock_symbol).add(rating, n)
+        for granularity, width in BUCKET_WIDTHS.items():
+            bucket = timestamp[:width]
+            if granularity == 'hour' and bucket < self._hour_cutoff:
+                continue
+            symbols = self._buckets[granularity]
+            for key in (None, stock_symbol):
+                self._tally(self._tally_map(symbols, key), bucket).add(rating, n)
+
+    @staticmethod
+    def _tally(tallies: dict, key) -> RatingTally:
+        tally = tallies.get(key)
+        if tally is None:
+            tally = tallies[key] = RatingTally()
+        return tally
+
+    @staticmethod
+    def _tally_map(symbols: dict, stock_symbol: str) -> Dict[str, RatingTally]:
+        buckets = symbols.get(stock_symbol)
+        if buckets is None:
+            buckets = symbols[stock_symbol] = {}
+        return buckets
+
+    def add_counts(self, counts: pd.DataFrame, replace: bool = False):
+        """
+        Count committed feedback given as grouped counts
+
+        Each aggregation level is summed with pandas first, so tallies are
+        updated once per group rather than once per input row.
+
+        :param counts: Frame of timestamp (or hour prefix), stock_symbol, rating and n columns
+        :param replace: Clear the aggregates first
+        """
+        def groups(frame: pd.DataFrame, *keys: str) -> List[tuple]:
+            series = frame.groupby(list(keys), sort=False)['n'].sum()
+            return list(zip(series.index.tolist(), series.tolist()))
+
+        with self._lock:
+            hour_cutoff = self._advance_hour_cutoff()
+        by_symbol = groups(counts, 'stock_symbol', 'rating')
+        by_bucket = {}
+        for granularity, width in BUCKET_WIDTHS.items():
+            frame = counts.assign(bucket=counts['timestamp'].str[:width])
+            if granularity == 'hour':
+                frame = frame[frame['bucket'] >= hour_cutoff]
+            by_bucket[granularity] = (groups(frame, 'bucket', 'rating'),
+                                      groups(frame, 'bucket', 'stock_symbol', 'rating'))
+        with self._lock:
+            if replace:
+                self._clear()
+                self._hour_cutoff = hour_cutoff
+            for (stock_symbol, rating), n in by_symbol:
+                self._overall.add(rating, n)
+                self._tally(self._symbols, stock_symbol).add(rating, n)
+            for granularity, (overall, per_symbol) in by_bucket.items():
+                symbols = self._buckets[granularity]
+                for (bucket, rating), n in overall:
+                    self._tally(symbols[None], bucket).add(rating, n)
+                for (bucket, stock_symbol, rating), n in per_symbol:
+                    self._tally(self._tally_map(symbols, stock_symbol), bucket).add(rating, n)
+
+    def add_rows(self, rows: Iterable[tuple]):
+        """
+        Count committed feedback
+
+        :param rows: (timestamp, stock_symbol, rating, ...) tuples as stored
+        """
+        with self._lock:
+            self._advance_hour_cutoff()
+            for row in rows:
+                self._add(row[0], row[1], row[2], 1)
+
+    def rebuild(self, conn: sqlite3.Connection):
+        """
+        Replace the aggregates with hourly counts grouped in the database
+
+        :param conn: Connection to the feedback database
+        """
+        rows = conn.execute(
+            'SELECT substr(timestamp, 1, ?), stock_symbol, rating, COUNT(*) FROM feedback'
+            ' GROUP BY 1, 2, 3', (BUCKET_WIDTHS['hour'],)).fetchall()
+        self.add_counts(pd.DataFrame(rows, columns=['timestamp', 'stock_symbol', 'rating', 'n']),
+                        replace=True)
+
+    def summary(self, stock_symbol: str = None) -> dict:
+        with self._lock:
+            tally = self._symbols.get(stock_symbol, RatingTally()) if stock_symbol \
+                else self._overall
+            return tally.summary()
+
+    def trends(self,
+               stock_symbol: str = None,
+               granularity: str = 'day',
+               start: Optional[str] = None,
+               end: Optional[str] = None) -> List[dict]:
+        """
+        Per-bucket statistics in time order
+
+        :param stock_symbol: Optional stock symbol to filter feedback
+        :param granularity: 'hour' (recent days only) or 'day'
+        :param start: Formatted timestamp; buckets before the one containing it are left out
+        :param end: Formatted timestamp; buckets after the one containing it are left out
+        :return: List of bucket summaries
+        """
+        width = BUCKET_WIDTHS[granularity]
+        start = start[:width] if start else None
+        end = end[:width] if end else None
+        with self._lock:
+            buckets = self._buckets[granularity].get(stock_symbol or None, {})
+            selected = [(bucket, tally.summary()) for bucket, tally in buckets.items()
+                        if (start is None or bucket >= start) and (end is None or bucket <= end)]
+        selected.sort()
+        return [dict(summary, bucket=bucket) for bucket, summary in selected]
+
+
 class FeedbackService:
     """
     Service for managing user feedback
+
+    Feedback is appended to a WAL-mode SQLite table by a single background
+    writer. Writes queue up while a transaction commits and the next
+    transaction takes all of them at once, so concurrent requests share
+    commits instead of each paying for one. Callers are answered only after
+    their row is committed. Existing CSV feedback is imported when the
+    database is created, and the table can be exported back to CSV.
+    Summaries and trends are served from in-memory aggregates that are
+    rebuilt from the table at start-up and updated after each commit.
+    Bulk imports are validated and committed a chunk at a time, and row
+    queries page through indexes by keyset.
     """
 
-    def __init__(self, feedback_file: str = 'user_feedback.csv'):
+    def __init__(self,
+                 feedback_file: str = 'user_feedback.csv',
+                 db_path: str = 'user_feedback.sqlite',
+                 max_batch: int = MAX_BATCH):
         """
         Initialize feedback service
 
-        :param feedback_file: Path to feedback CSV file
+        :param feedback_file: CSV file imported when the database is first created
+        :param db_path: Path to the feedback database
+        :param max_batch: Most feedback rows committed in one transaction
         """
         self.feedback_file = feedback_file
+        self.db_path = db_path
+        self.max_batch = max_batch
+
+        # Get the directory path of the database
+        db_dir = os.path.dirname(db_path)
+
+        # Only create the directory if the path is non-empty
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+
+        # Writes go through this connection under the write lock
+        self._conn = self._connect()
+        # Room for the index pages touched by a large import (64 MiB)
+        self._conn.execute('PRAGMA cache_size=-65536')
+        created = self._conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'feedback'").fetchone() is None
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS feedback ('
+            ' id INTEGER PRIMARY KEY,'
+            ' timestamp TEXT NOT NULL,'
+            ' stock_symbol TEXT NOT NULL,'
+            ' rating INTEGER NOT NULL,'
+            ' comments TEXT)')
+        for statement in INDEXES:
+            self._conn.execute(statement)
+        self._conn.commit()
+        self._read_conn = self._connect()
+        self.aggregates = FeedbackAggregates()
+
+        self._write_lock = threading.Lock()
+        self._read_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._stats = {
+            'written': 0,
+            'batches': 0,
+            'largest_batch': 0,
+            'errors': 0,
+            'ingested': 0,
+            'ingest_rejected': 0,
+        }
+        self._queue: queue.Queue = queue.Queue()
+        self._closed = False
+        self._writer = threading.Thread(target=self._write_loop, name='feedback-writer',
+                                        daemon=True)
+        self._writer.start()
 
-        # Initialize feedback file if it doesn't exist
-        self._initialize_feedback_file()
+        if created and os.path.exists(feedback_file):
+            imported = self.import_csv(feedback_file)
+            if imported:
+                print(f"Imported {imported} feedback rows from {feedback_file}")
+        else:
+            with self._write_lock:
+                self.aggregates.rebuild(self._conn)
 
-    def _initialize_feedback_file(self):
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False)
+        conn.execute('PRAGMA journal_mode=WAL')
+        # In WAL mode this only syncs at checkpoints, keeping commits cheap
+        conn.execute('PRAGMA synchronous=NORMAL')
+        return conn
+
+    def _write_loop(self):
         """
-        Create feedback CSV file if it doesn't exist
+        Commit queued feedback in batches until the service is closed
         """
-        if not os.path.exists(self.feedback_file):
-            # Get the directory path of the feedback file
-            feedback_dir = os.path.dirname(self.feedback_file)
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            batch = [item]
+            stop = False
+            # Everything queued during the previous commit joins this one
+            while len(batch) < self.max_batch:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                batch.append(item)
+            self._write_batch(batch)
+            if stop:
+                return
 
-            # Only create the directory if the path is non-empty
-            if feedback_dir:
-                os.makedirs(feedback_dir, exist_ok=True)
+    def _write_batch(self, batch: List[Tuple[tuple, Future]]):
+        try:
+            with self._write_lock, self._conn:
+                self._conn.executemany(
+                    'INSERT INTO feedback (timestamp, stock_symbol, rating, comments) '
+                    'VALUES (?, ?, ?, ?)', [row for row, _ in batch])
+        except sqlite3.Error as e:
+            print(f"Error saving feedback: {e}")
+            with self._stats_lock:
+                self._stats['errors'] += len(batch)
+            for _, future in batch:
+                future.set_exception(e)
+            return
+        self.aggregates.add_rows(row for row, _ in batch)
+        with self._stats_lock:
+            self._stats['written'] += len(batch)
+            self._stats['batches'] += 1
+            self._stats['largest_batch'] = max(self._stats['largest_batch'], len(batch))
+        for _, future in batch:
+            future.set_result(True)
 
-            # Create initial CSV with headers
-            pd.DataFrame(columns=[
-                'timestamp',
-                'stock_symbol',
-                'rating',
-                'comments'
-            ]).to_csv(self.feedback_file, index=False)
+    def submit(self, feedback: FeedbackModel) -> Future:
+        """
+        Queue feedback for the next group commit
+
+        :param feedback: Feedback model containing feedback details
+        :return: Future resolving to True once the feedback is committed
+        """
+        future = Future()
+        if self._closed:
+            future.set_exception(RuntimeError("Feedback service is closed"))
+            return future
+        try:
+            row = _row(feedback)
+        except ValueError as e:
+            future.set_exception(e)
+            return future
+        self._queue.put((row, future))
+        return future
 
     def save_feedback(self, feedback: FeedbackModel) -> bool:
         """
-        Save user feedback to CSV file
+        Save user feedback and wait for it to be committed
 
         :param feedback: Feedback model containing feedback details
         :return: Boolean indicating success of save operation
         """
         try:
-            # Convert feedback to dictionary
-            feedback_dict = {
-                'timestamp': feedback.timestamp,
-                'stock_symbol': feedback.stock_symbol,
-                'rating': feedback.rating,
-                'comments': feedback.comments
-            }
+            return self.submit(feedback).result()
+        except Exception as e:
+            print(f"Error saving feedback: {e}")
+            return False
 
-            # Read existing feedback
-            df = pd.read_csv(self.feedback_file)
+    def import_csv(self, path: str) -> int:
+        """
+        Append feedback from a CSV file with the legacy columns
 
-            # Append new feedback
-            df = df.append(feedback_dict, ignore_index=True)
+        Rows that cannot be parsed are skipped. All rows are committed in
+        one transaction.
 
-            # Save updated dataframe
-            df.to_csv(self.feedback_file, index=False)
+        :param path: CSV file with timestamp, stock_symbol, rating and comments columns
+        :return: Number of rows imported
+        """
+        def rows(reader: Iterable[dict]):
+            for line, record in enumerate(reader, start=2):
+                try:
+                    yield (format_timestamp(datetime.fromisoformat(record['timestamp'])),
+                           record['stock_symbol'],
+                           _check_rating(int(float(record['rating']))),
+                           record.get('comments') or None)
+                except (KeyError, TypeError, ValueError) as e:
+                    print(f"Skipping feedback row {line} of {path}: {e}")
 
-            return True
-        except Exception as e:
-            print(f"Error saving feedback: {e}")
-            return False
+        with open(path, newline='', encoding='utf-8') as f, self._write_lock:
+            with self._conn:
+                before = self._conn.total_changes
+                self._conn.executemany(
+                    'INSERT INTO feedback (timestamp, stock_symbol, rating, comments) '
+                    'VALUES (?, ?, ?, ?)', rows(csv.DictReader(f)))
+                imported = self._conn.total_changes - before
+            self.aggregates.rebuild(self._conn)
+        return imported
+
+    def ingest(self, stream: BinaryIO, fmt: str = 'csv',
+               chunk_rows: int = INGEST_CHUNK_ROWS) -> dict:
+        """
+        Import feedback from a CSV or NDJSON stream a chunk at a time
+
+        Rows are parsed and validated ``chunk_rows`` at a time, so memory
+        stays bounded, and each chunk is committed on its own. Live
+        feedback is committed between chunks rather than waiting for the
+        whole import. Invalid rows are rejected and counted while the rest
+        are imported; malformed input stops the import, keeping the chunks
+        committed before it.
+
+        :param stream: Binary stream of CSV with a header row, or one JSON object per line
+        :param fmt: 'csv' or 'ndjson'
+        :param chunk_rows: Rows validated and inserted at a time
+        :return: Counts of received, imported and rejected rows and the first rejections
+        :raises ValueError: If the input cannot be parsed or lacks required columns
+        """
+        if fmt == 'csv':
+            chunks = pd.read_csv(stream, chunksize=chunk_rows, dtype=str,
+                                 keep_default_na=False, na_values=[''])
+        elif fmt == 'ndjson':
+            chunks = pd.read_json(stream, lines=True, chunksize=chunk_rows,
+                                  dtype=False, convert_dates=False)
+        else:
+            raise ValueError(f"Unsupported format: {fmt}")
+
+        received = imported = rejected = 0
+        errors = []
+        try:
+            for frame in chunks:
+                rows, reasons = validate_feedback_frame(frame)
+                # Only the insert holds the write lock, so group commits run between chunks
+                with self._write_lock, self._conn:
+                    self._conn.executemany(
+                        'INSERT INTO feedback (timestamp, stock_symbol, rating, comments) '
+                        'VALUES (?, ?, ?, ?)',
+                        zip(rows['timestamp'].tolist(), rows['stock_symbol'].tolist(),
+                            rows['rating'].tolist(), rows['comments'].tolist()))
+                received += len(frame)
+                imported += len(rows)
+                rejected += len(reasons)
+                for index, reason in reasons.head(MAX_REPORTED_ERRORS - len(errors)).items():
+                    errors.append({'row': int(index) + 1, 'error': reason})
+                # Hourly counts are all the aggregates need once the chunk commits
+                self.aggregates.add_counts(rows.groupby(
+                    [rows['timestamp'].str[:BUCKET_WIDTHS['hour']], 'stock_symbol', 'rating'],
+                    sort=False).size().rename('n').reset_index())
+        finally:
+            with self._stats_lock:
+                self._stats['ingested'] += imported
+                self._stats['ingest_rejected'] += rejected
+        return {
+            'received': received,
+            'imported': imported,
+            'rejected': rejected,
+            'errors': errors,
+        }
+
+    def query_feedback(self,
+                       stock_symbol: str = None,
+                       start: Optional[datetime] = None,
+                       end: Optional[datetime] = None,
+                       limit: int = 100,
+                       cursor: Optional[str] = None) -> dict:
+        """
+        Page through feedback, newest first
+
+        Pages continue from the last row of the previous page rather than
+        an offset, so every page is an index range scan however deep it is.
+
+        :param stock_symbol: Optional stock symbol to filter feedback
+        :param start: Optional earliest timestamp
+        :param end: Optional latest timestamp
+        :param limit: Rows per page
+        :param cursor: next_cursor of the previous page
+        :return: Rows and the cursor of the next page, None on the last page
+        :raises ValueError: If the cursor is malformed
+        """
+        clauses = []
+        params: list = []
+        if stock_symbol:
+            clauses.append('stock_symbol = ?')
+            params.append(stock_symbol)
+        if start:
+            clauses.append('timestamp >= ?')
+            params.append(format_timestamp(start))
+        if end:
+            clauses.append('timestamp <= ?')
+            params.append(format_timestamp(end))
+        if cursor:
+            clauses.append('(timestamp, id) < (?, ?)')
+            params.extend(decode_cursor(cursor))
+        query = 'SELECT id, timestamp, stock_symbol, rating, comments FROM feedback'
+        if clauses:
+            query += ' WHERE ' + ' AND '.join(clauses)
+        query += ' ORDER BY timestamp DESC, id DESC LIMIT ?'
+        with self._read_lock:
+            rows = self._read_conn.execute(query, params + [limit + 1]).fetchall()
+
+        next_cursor = encode_cursor(rows[limit - 1][1], rows[limit - 1][0]) \
+            if len(rows) > limit else None
+        return {
+            'items': [dict(zip(('id', *CSV_COLUMNS), row)) for row in rows[:limit]],
+            'next_cursor': next_cursor
+        }
+
+    def lowest_rated_comments(self,
+                              stock_symbol: str = None,
+                              since: Optional[datetime] = None,
+                              limit: int = 20) -> List[dict]:
+        """
+        Feedback with comments, lowest rating first and newest first within a rating
+
+        Each rating is read from its own index range, so only the returned
+        rows are visited.
+
+        :param stock_symbol: Optional stock symbol to filter feedback
+        :param since: Optional earliest timestamp
+        :param limit: Most rows returned
+        :return: Feedback rows
+        """
+        query = ('SELECT id, timestamp, stock_symbol, rating, comments FROM feedback'
+                 ' WHERE comments IS NOT NULL AND rating = ?')
+        params: list = []
+        if stock_symbol:
+            query += ' AND stock_symbol = ?'
+            params.append(stock_symbol)
+        if since:
+            query += ' AND timestamp >= ?'
+            params.append(format_timestamp(since))
+        query += ' ORDER BY timestamp DESC, id DESC LIMIT ?'
+
+        items = []
+        with self._read_lock:
+            for rating in RATINGS:
+                rows = self._read_conn.execute(
+                    query, [rating] + params + [limit - len(items)]).fetchall()
+                items.extend(dict(zip(('id', *CSV_COLUMNS), row)) for row in rows)
+                if len(items) >= limit:
+                    break
+        return items
+
+    def export_csv(self, out: TextIO, stock_symbol: str = None) -> int:
+        """
+        Write feedback as CSV with the legacy columns, oldest first
+
+        :param out: Text stream to write to
+        :param stock_symbol: Optional stock symbol to filter feedback
+        :return: Number of rows written
+        """
+        query = 'SELECT timestamp, stock_symbol, rating, comments FROM feedback'
+        params: tuple = ()
+        if stock_symbol:
+            query += ' WHERE stock_symbol = ?'
+            params = (stock_symbol,)
+        writer = csv.writer(out)
+        writer.writerow(CSV_COLUMNS)
+        count = 0
+        # A separate connection reads a consistent snapshot while writes continue
+        conn = self._connect()
+        try:
+            for row in conn.execute(query + ' ORDER BY id', params):
+                writer.writerow(row)
+                count += 1
+        finally:
+            conn.close()
+        return count
 
     def get_feedback_summary(self, stock_symbol: str = None):
         """
-        Retrieve feedback summary
+        Retrieve feedback summary from the in-memory aggregates
 
         :param stock_symbol: Optional stock symbol to filter feedback
         :return: Aggregated feedback statistics
         """
-        try:
-            # Read feedback file
-            df = pd.read_csv(self.feedback_file)
+        return self.aggregates.summary(stock_symbol)
+
+    def get_feedback_trends(self,
+                            stock_symbol: str = None,
+                            granularity: str = 'day',
+                            start: Optional[datetime] = None,
+                            end: Optional[datetime] = None) -> List[dict]:
+        """
+        Retrieve feedback statistics per hour or day
 
-            # Filter by stock symbol if provided
-            if stock_symbol:
-                df = df[df['stock_symbol'] == stock_symbol]
+        :param stock_symbol: Optional stock symbol to filter feedback
+        :param granularity: 'hour' or 'day'
+        :param start: Optional start of the window
+        :param end: Optional end of the window
+        :return: Bucket summaries in time order
+        """
+        return self.aggregates.trends(
+            stock_symbol, granularity,
+            format_timestamp(start) if start else None,
+            format_timestamp(end) if end else None)
 
-            # Calculate summary statistics
-            summary = {
-                'total_feedback_count': len(df),
-                'average_rating': df['rating'].mean() if not df.empty else 0,
-                'rating_distribution': df['rating'].value_counts().to_dict()
-            }
+    def stats(self) -> dict:
+        """
+        Report write counts and batching
+
+        :return: Dictionary of feedback store statistics
+        """
+        with self._stats_lock:
+            batches = self._stats['batches']
+            return dict(self._stats,
+                        queued=self._queue.qsize(),
+                        average_batch=self._stats['written'] / batches if batches else 0.0)
+
+    def close(self):
+        """
+        Commit queued feedback and stop the writer
+        """
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._writer.join()
+        with self._read_lock:
+            self._read_conn.close()
+        with self._write_lock:
+            self._conn.close()
 
-            return summary
-        except Exception as e:
-            print(f"Error retrieving feedback summary: {e}")
-            return {
-                'total_feedback_count': 0,
-                'average_rating': 0,
-                'rating_distribution': {}
-            }
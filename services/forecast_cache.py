@@ -0,0 +1,236 @@
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+from statsmodels.tsa.arima.model import ARIMA
+
+from .forecasting import (
+    ARIMA_ORDER,
+    FORECAST_STEPS,
+    ar_normal_equations,
+    forecast_ar_batch,
+    forecast_index,
+    solve_ar
+)
+
+
+# Native models are refitted from scratch after this many sliding updates,
+# so rounding error from adding and removing rows cannot accumulate
+MAX_INCREMENTAL_UPDATES = 256
+
+
+class _CachedModel:
+    """
+    Fitted model state for one window of a series
+    """
+    __slots__ = ('timestamps', 'values', 'model', 'forecast', 'updates')
+
+    def __init__(self, timestamps: np.ndarray, values: np.ndarray, model: Any,
+                 forecast: np.ndarray, updates: int = 0):
+        self.timestamps = timestamps
+        self.values = values
+        self.model = model
+        self.forecast = forecast
+        self.updates = updates
+
+
+class ForecastCache:
+    """
+    LRU cache of fitted forecast models with incremental updates
+
+    Entries are keyed by (symbol, interval, period, order, backend, steps)
+    and the window's identity: its first and last bar timestamps and its
+    length. A key whose stored window matches the new series bar for bar
+    returns the stored forecast, so a 1mo and a 5y analysis ending on the
+    same bar never share a model. When the new window is
+    the cached one with bars dropped from the front and appended at the
+    end, a native model is slid instead of refitted: the rows that left the
+    window are subtracted from its normal equations and the new rows added,
+    which gives the same coefficients as a fit on the new window.
+    statsmodels estimates cannot be updated that way, so a changed window
+    is always refitted. Either way the forecast depends only on the window,
+    not on what the cache saw before.
+    """
+    def __init__(self, max_entries: int = 512):
+        """
+        Initialize the forecast cache
+
+        :param max_entries: Maximum number of cached models before LRU eviction
+        """
+        self.max_entries = max_entries
+        self._entries: 'OrderedDict[tuple, _CachedModel]' = OrderedDict()
+        self._latest: Dict[tuple, tuple] = {}
+        self._lock = threading.Lock()
+        self._stats = {
+            'hits': 0,
+            'incremental_updates': 0,
+            'full_refits': 0,
+            'evictions': 0,
+        }
+
+    def forecast(self,
+                 stock_symbol: str,
+                 close_prices: pd.Series,
+                 interval: str = '1d',
+                 period: str = '1mo',
+                 order: tuple = ARIMA_ORDER,
+                 backend: str = 'native',
+                 steps: int = FORECAST_STEPS) -> pd.DataFrame:
+        """
+        Forecast closing prices, reusing a cached model when possible
+
+        :param stock_symbol: Stock symbol the series belongs to
+        :param close_prices: Closing prices indexed by timestamp
+        :param interval: Bar interval of the series
+        :param period: History period the series was fetched for, e.g. '1mo' or '5y'
+        :param order: ARIMA order
+        :param backend: Forecast backend, 'native' or 'statsmodels'
+        :param steps: Number of steps to forecast
+        :return: DataFrame of predicted closes indexed by date
+        """
+        values = close_prices.to_numpy(dtype='float64')
+        timestamps = close_prices.index.values.astype('datetime64[ns]').view('int64')
+        p = order[0]
+        series_key = (stock_symbol.upper(), interval, period, tuple(order), backend, steps)
+        key = series_key + ((int(timestamps[0]), int(timestamps[-1]), len(timestamps)),)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and np.array_equal(entry.timestamps, timestamps) \
+                    and np.array_equal(entry.values, values):
+                self._entries.move_to_end(key)
+                self._stats['hits'] += 1
+                return self._frame(entry.forecast, close_prices.index[-1], steps,
+                                   interval)
+
+            base_key = self._latest.get(series_key)
+            base = self._entries.get(base_key) if base_key else None
+
+        forecast = None
+        updates = 0
+        if backend == 'native' and base is not None \
+                and base.updates < MAX_INCREMENTAL_UPDATES and len(values) > 2 * p:
+            dropped = self._slide(base, timestamps, values, p)
+            if dropped is not None:
+                model, forecast = self._update(base, values, dropped, p, steps)
+                updates = base.updates + 1
+                counter = 'incremental_updates'
+
+        if forecast is None:
+            model, forecast = self._fit(values, order, backend, steps)
+            counter = 'full_refits'
+
+        with self._lock:
+            self._stats[counter] += 1
+            if counter == 'incremental_updates' and base_key in self._entries:
+                # The slid model supersedes the one it was built from
+                del self._entries[base_key]
+            self._entries[key] = _CachedModel(timestamps.copy(), values.copy(), model,
+                                              forecast, updates)
+            self._entries.move_to_end(key)
+            self._latest[series_key] = key
+            while len(self._entries) > self.max_entries:
+                evicted, _ = self._entries.popitem(last=False)
+                if self._latest.get(evicted[:-1]) == evicted:
+                    del self._latest[evicted[:-1]]
+                self._stats['evictions'] += 1
+
+        return self._frame(forecast, close_prices.index[-1], steps, interval)
+
+    @staticmethod
+    def _slide(base: _CachedModel, timestamps: np.ndarray, values: np.ndarray,
+               p: int) -> Optional[int]:
+        """
+        Check that a window is the cached one with bars dropped and appended
+
+        The new window must start on a bar of the cached one and agree with
+        it on every bar they share, not just the last few.
+
+        :return: Number of bars dropped from the front, or None if the windows do not line up
+        """
+        dropped = int(np.searchsorted(base.timestamps, timestamps[0]))
+        kept = len(base.timestamps) - dropped
+        if dropped >= len(base.timestamps) or base.timestamps[dropped] != timestamps[0] \
+                or kept < p + 1 or kept >= len(timestamps):
+            return None
+        if not (np.array_equal(base.timestamps[dropped:], timestamps[:kept])
+                and np.array_equal(base.values[dropped:], values[:kept])):
+            return None
+        return dropped
+
+    @staticmethod
+    def _frame(forecast: np.ndarray, last_timestamp, steps: int,
+               interval: str) -> pd.DataFrame:
+        return pd.DataFrame({
+            'Predicted_Close': forecast[:steps],
+            'Date': forecast_index(last_timestamp, steps, interval)
+        }).set_index('Date')
+
+    @staticmethod
+    def _fit(values: np.ndarray, order: tuple, backend: str, steps: int) -> tuple:
+        """
+        Fit a model from scratch
+
+        :return: Tuple of (model state, forecast array)
+        """
+        if backend == 'native':
+            p = order[0]
+            xtx, xty = ar_normal_equations(np.diff(values)[None, :], p)
+            coefs = solve_ar(xtx, xty)
+            model = {'xtx': xtx[0], 'xty': xty[0]}
+            return model, forecast_ar_batch(values[None, :], coefs, steps)[0]
+        if backend == 'statsmodels':
+            model_fit = ARIMA(values, order=order).fit()
+            return model_fit, np.asarray(model_fit.forecast(steps=steps))
+        raise ValueError(f"Unknown forecast backend: {backend}")
+
+    @staticmethod
+    def _update(base: _CachedModel,
+                values: np.ndarray,
+                dropped: int,
+                p: int,
+                steps: int) -> tuple:
+        """
+        Slide a cached native model to the new window
+
+        :param base: Cached model of the previous window
+        :param values: Prices of the new window
+        :param dropped: Bars of the previous window no longer in the new one
+        :param p: Autoregressive order
+        :param steps: Number of steps to forecast
+        :return: Tuple of (model state, forecast array)
+        """
+        def rows(levels: np.ndarray) -> tuple:
+            diffs = np.diff(levels)
+            windows = sliding_window_view(diffs[:-1], p)[:, ::-1]
+            return windows, diffs[p:]
+
+        xtx = base.model['xtx'].copy()
+        xty = base.model['xty'].copy()
+        if dropped:
+            # Rows whose target falls in the first `dropped` differences of the old window
+            windows, targets = rows(base.values[:dropped + p + 1])
+            xtx -= windows.T @ windows
+            xty -= windows.T @ targets
+        # Rows whose target lies after the old window's last bar
+        position = len(base.values) - dropped - 1
+        windows, targets = rows(values[position - p:])
+        xtx += windows.T @ windows
+        xty += windows.T @ targets
+
+        coefs = solve_ar(xtx[None], xty[None])
+        return {'xtx': xtx, 'xty': xty}, forecast_ar_batch(values[None, -(p + 1):], coefs,
+                                                          steps)[0]
+
+    def stats(self) -> dict:
+        """
+        Report cache effectiveness counters
+
+        :return: Dictionary of hit, update and refit counts
+        """
+        with self._lock:
+            return dict(self._stats, entries=len(self._entries))
+
@@ -0,0 +1,202 @@
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+from statsmodels.tsa.arima.model import ARIMA
+
+
+ARIMA_ORDER = (5, 1, 0)
+FORECAST_STEPS = 7
+BACKENDS = ('native', 'statsmodels')
+
+
+# pandas offsets matching each yfinance bar interval
+INTERVAL_OFFSETS = {
+    '1m': pd.Timedelta(minutes=1),
+    '2m': pd.Timedelta(minutes=2),
+    '5m': pd.Timedelta(minutes=5),
+    '15m': pd.Timedelta(minutes=15),
+    '30m': pd.Timedelta(minutes=30),
+    '60m': pd.Timedelta(hours=1),
+    '90m': pd.Timedelta(minutes=90),
+    '1h': pd.Timedelta(hours=1),
+    '1d': pd.DateOffset(days=1),
+    '5d': pd.DateOffset(days=5),
+    '1wk': pd.DateOffset(weeks=1),
+    '1mo': pd.DateOffset(months=1),
+    '3mo': pd.DateOffset(months=3),
+}
+
+
+def forecast_index(last_timestamp,
+                   steps: int = FORECAST_STEPS,
+                   interval: str = '1d') -> pd.DatetimeIndex:
+    """
+    Timestamps of the bars following the last observed bar
+
+    :param last_timestamp: Timestamp of the last observed bar
+    :param steps: Number of forecast steps
+    :param interval: Bar interval of the series
+    :return: DatetimeIndex of forecast timestamps
+    """
+    return pd.date_range(start=pd.Timestamp(last_timestamp), periods=steps + 1,
+                         freq=INTERVAL_OFFSETS[interval])[1:]
+
+
+def ar_normal_equations(diffs: np.ndarray, p: int) -> tuple:
+    """
+    Build the least-squares normal equations of zero-mean AR(p) models
+
+    :param diffs: Array of shape (n_series, n_obs) of differenced values
+    :param p: Autoregressive order
+    :return: Tuple of X'X with shape (n_series, p, p) and X'y with shape (n_series, p)
+    """
+    n_obs = diffs.shape[1]
+    if n_obs - p < p:
+        raise ValueError(
+            f"At least {2 * p + 1} observations are needed to fit AR({p})")
+
+    # windows[:, t] holds diffs[:, t:t + p]; reversed it lists lags 1..p of t + p
+    windows = sliding_window_view(diffs[:, :-1], p, axis=1)[:, :, ::-1]
+    targets = diffs[:, p:]
+
+    xtx = np.einsum('ntk,ntj->nkj', windows, windows)
+    xty = np.einsum('ntk,nt->nk', windows, targets)
+    return xtx, xty
+
+
+def solve_ar(xtx: np.ndarray, xty: np.ndarray) -> np.ndarray:
+    """
+    Solve batched AR normal equations for the coefficients
+
+    :param xtx: Array of shape (n_series, p, p)
+    :param xty: Array of shape (n_series, p)
+    :return: Array of shape (n_series, p); column k is the coefficient of lag k + 1
+    """
+    p = xtx.shape[-1]
+    # A tiny ridge keeps flat (constant price) series solvable
+    ridge = 1e-12 * np.maximum(np.trace(xtx, axis1=1, axis2=2), 1.0)
+    return np.linalg.solve(xtx + np.eye(p) * ridge[:, None, None],
+                           xty[..., None])[..., 0]
+
+
+def fit_ar_batch(diffs: np.ndarray, p: int) -> np.ndarray:
+    """
+    Estimate zero-mean AR(p) coefficients for many aligned series at once
+
+    Each row is fitted by conditional least squares; all rows are solved in
+    a single batched call to ``np.linalg.solve``.
+
+    :param diffs: Array of shape (n_series, n_obs) of differenced values
+    :param p: Autoregressive order
+    :return: Array of shape (n_series, p); column k is the coefficient of lag k + 1
+    """
+    return solve_ar(*ar_normal_equations(diffs, p))
+
+
+def forecast_ar_batch(levels: np.ndarray,
+                      coefs: np.ndarray,
+                      steps: int = FORECAST_STEPS) -> np.ndarray:
+    """
+    Forecast integrated AR(p) processes for many series
+
+    :param levels: Array of shape (n_series, n_obs) of observed levels
+    :param coefs: Array of shape (n_series, p) of AR coefficients
+    :param steps: Number of steps to forecast
+    :return: Array of shape (n_series, steps) of forecast levels
+    """
+    p = coefs.shape[1]
+    # Most recent difference first, matching the coefficient order
+    lags = np.diff(levels[:, -(p + 1):], axis=1)[:, ::-1].copy()
+    diffs = np.empty((levels.shape[0], steps))
+    for step in range(steps):
+        diffs[:, step] = np.einsum('nk,nk->n', coefs, lags)
+        lags[:, 1:] = lags[:, :-1]
+        lags[:, 0] = diffs[:, step]
+    return levels[:, -1:] + np.cumsum(diffs, axis=1)
+
+
+def native_forecast_matrix(levels: np.ndarray,
+                           order: tuple = ARIMA_ORDER,
+                           steps: int = FORECAST_STEPS) -> np.ndarray:
+    """
+    Forecast a matrix of aligned price series with a batched ARIMA(p, 1, 0)
+
+    :param levels: Array of shape (n_series, n_obs) of prices
+    :param order: ARIMA order; only (p, 1, 0) is supported
+    :param steps: Number of steps to forecast
+    :return: Array of shape (n_series, steps) of forecast prices
+    """
+    p, d, q = order
+    if d != 1 or q != 0:
+        raise ValueError(f"Native backend only supports ARIMA(p, 1, 0), got {order}")
+    levels = np.asarray(levels, dtype='float64')
+    coefs = fit_ar_batch(np.diff(levels, axis=1), p)
+    return forecast_ar_batch(levels, coefs, steps)
+
+
+def native_forecast_many(series: List[np.ndarray],
+                         order: tuple = ARIMA_ORDER,
+                         steps: int = FORECAST_STEPS) -> List[np.ndarray]:
+    """
+    Forecast series of differing lengths, batching series of equal length
+
+    :param series: List of 1-D price arrays
+    :param order: ARIMA order; only (p, 1, 0) is supported
+    :param steps: Number of steps to forecast
+    :return: List of forecast arrays in input order
+    """
+    groups: Dict[int, List[int]] = {}
+    for i, values in enumerate(series):
+        groups.setdefault(len(values), []).append(i)
+
+    forecasts: List[Optional[np.ndarray]] = [None] * len(series)
+    for positions in groups.values():
+        matrix = np.stack([series[i] for i in positions])
+        for i, row in zip(positions, native_forecast_matrix(matrix, order, steps)):
+            forecasts[i] = row
+    return forecasts
+
+
+def statsmodels_forecast(values: np.ndarray,
+                         order: tuple = ARIMA_ORDER,
+                         steps: int = FORECAST_STEPS) -> np.ndarray:
+    """
+    Reference forecast using the statsmodels ARIMA implementation
+
+    :param values: 1-D price array
+    :param order: ARIMA order
+    :param steps: Number of steps to forecast
+    :return: Forecast array
+    """
+    model_fit = ARIMA(np.asarray(values, dtype='float64'), order=order).fit()
+    return np.asarray(model_fit.forecast(steps=steps))
+
+
+def forecast_close_prices(close_prices: pd.Series,
+                          steps: int = FORECAST_STEPS,
+                          backend: str = 'statsmodels',
+                          interval: str = '1d') -> pd.DataFrame:
+    """
+    Fit ARIMA(5, 1, 0) on closing prices and forecast the following bars
+
+    :param close_prices: Closing prices indexed by date
+    :param steps: Number of bars to forecast
+    :param backend: 'native' for the batched NumPy estimator, 'statsmodels' for the reference
+    :param interval: Bar interval of the series
+    :return: DataFrame of predicted closes indexed by date
+    """
+    values = close_prices.to_numpy(dtype='float64')
+    if backend == 'native':
+        forecast = native_forecast_matrix(values[None, :], steps=steps)[0]
+    elif backend == 'statsmodels':
+        forecast = statsmodels_forecast(values, steps=steps)
+    else:
+        raise ValueError(f"Unknown forecast backend: {backend}")
+
+    return pd.DataFrame({
+        'Predicted_Close': forecast,
+        'Date': forecast_index(close_prices.index[-1], steps, interval)
+    }).set_index('Date')
+
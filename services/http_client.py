@@ -0,0 +1,239 @@
+import asyncio
+import os
+import random
+import threading
+import weakref
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+# Statuses worth retrying after a backoff
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+}
+
+
+class _AsyncState:
+    """
+    httpx client and host slots bound to one event loop
+    """
+    def __init__(self, client: httpx.AsyncClient):
+        self.client = client
+        self.slots: Dict[str, asyncio.Semaphore] = {}
+
+
+class HttpClient:
+    """
+    Shared HTTP client with pooled keep-alive connections
+
+    Blocking requests go through one requests.Session whose adapter keeps
+    connections to each host open and retries connection errors, read
+    timeouts and retryable statuses with jittered exponential backoff.
+    Async requests use an httpx client with the same timeouts, pool size
+    and retry policy. At most ``per_host_limit`` requests per host are in
+    flight at a time in each mode, so one slow site cannot occupy every
+    worker, and every request is bounded by the connect and read timeouts.
+    """
+    def __init__(self,
+                 connect_timeout: float = 3.05,
+                 read_timeout: float = 10.0,
+                 max_retries: int = 2,
+                 backoff_base: float = 0.5,
+                 backoff_max: float = 8.0,
+                 per_host_limit: int = 8,
+                 pool_size: int = 16,
+                 headers: Optional[dict] = None):
+        """
+        Initialize the HTTP client
+
+        :param connect_timeout: Seconds to establish a connection
+        :param read_timeout: Seconds to wait for each read from the server
+        :param max_retries: Retries after the first attempt
+        :param backoff_base: Base delay of the exponential backoff in seconds
+        :param backoff_max: Maximum backoff delay in seconds
+        :param per_host_limit: Requests in flight per host
+        :param pool_size: Keep-alive connections kept per host
+        :param headers: Headers sent with every request, defaults to a browser User-Agent
+        """
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.per_host_limit = per_host_limit
+        self.pool_size = pool_size
+        self.headers = dict(DEFAULT_HEADERS if headers is None else headers)
+
+        retry = Retry(
+            total=max_retries,
+            connect=max_retries,
+            read=max_retries,
+            status=max_retries,
+            status_forcelist=RETRY_STATUSES,
+            allowed_methods=frozenset({'GET', 'HEAD'}),
+            backoff_factor=backoff_base,
+            backoff_max=backoff_max,
+            backoff_jitter=backoff_base,
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size,
+                              max_retries=retry)
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+        self._lock = threading.Lock()
+        self._slots: Dict[str, threading.BoundedSemaphore] = {}
+        # httpx connections and asyncio semaphores belong to the loop that created them
+        self._async_states: 'weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, _AsyncState]' = \
+            weakref.WeakKeyDictionary()
+        self._stats = {
+            'requests': 0,
+            'retries': 0,
+            'failures': 0,
+            'waits': 0,
+        }
+
+    @classmethod
+    def from_env(cls) -> 'HttpClient':
+        """
+        Build a client from HTTP_* environment variables
+        """
+        return cls(
+            connect_timeout=float(os.getenv('HTTP_CONNECT_TIMEOUT', '3.05')),
+            read_timeout=float(os.getenv('HTTP_READ_TIMEOUT', '10')),
+            max_retries=int(os.getenv('HTTP_MAX_RETRIES', '2')),
+            per_host_limit=int(os.getenv('HTTP_PER_HOST_LIMIT', '8')),
+            pool_size=int(os.getenv('HTTP_POOL_SIZE', '16')),
+        )
+
+    def _count(self, name: str, n: int = 1):
+        with self._lock:
+            self._stats[name] += n
+
+    def _slot(self, url: str) -> threading.BoundedSemaphore:
+        host = urlsplit(url).netloc
+        with self._lock:
+            slot = self._slots.get(host)
+            if slot is None:
+                slot = self._slots[host] = threading.BoundedSemaphore(self.per_host_limit)
+            return slot
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        """
+        GET a URL on the pooled session, retrying transient failures
+
+        :param url: URL to fetch
+        :param kwargs: Extra arguments for requests, e.g. params or headers
+        :return: Response after the last attempt; retryable statuses are returned once retries run out
+        :raises requests.RequestException: If the request fails after all retries
+        """
+        kwargs.setdefault('timeout', (self.connect_timeout, self.read_timeout))
+        slot = self._slot(url)
+        if not slot.acquire(blocking=False):
+            self._count('waits')
+            slot.acquire()
+        try:
+            self._count('requests')
+            response = self.session.get(url, **kwargs)
+        except requests.RequestException:
+            self._count('failures')
+            raise
+        finally:
+            slot.release()
+        retries = response.raw.retries
+        if retries is not None and retries.history:
+            self._count('retries', len(retries.history))
+        return response
+
+    def _async_state(self) -> _AsyncState:
+        loop = asyncio.get_running_loop()
+        state = self._async_states.get(loop)
+        if state is None:
+            state = _AsyncState(httpx.AsyncClient(
+                headers=self.headers,
+                timeout=httpx.Timeout(self.read_timeout, connect=self.connect_timeout),
+                limits=httpx.Limits(max_keepalive_connections=self.pool_size),
+                follow_redirects=True,
+            ))
+            self._async_states[loop] = state
+        return state
+
+    def _backoff(self, attempt: int, response: Optional[httpx.Response] = None) -> float:
+        """
+        Full-jitter exponential backoff, or the server's Retry-After when it asks for longer
+        """
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+        retry_after = response.headers.get('Retry-After') if response is not None else None
+        if retry_after and retry_after.isdigit():
+            delay = max(delay, min(float(retry_after), self.backoff_max))
+        return delay
+
+    async def aget(self, url: str, **kwargs) -> httpx.Response:
+        """
+        GET a URL on the pooled async client, retrying transient failures
+
+        :param url: URL to fetch
+        :param kwargs: Extra arguments for httpx, e.g. params or headers
+        :return: Response after the last attempt; retryable statuses are returned once retries run out
+        :raises httpx.HTTPError: If the request fails after all retries
+        """
+        state = self._async_state()
+        host = urlsplit(url).netloc
+        slot = state.slots.get(host)
+        if slot is None:
+            slot = state.slots[host] = asyncio.Semaphore(self.per_host_limit)
+
+        attempt = 0
+        while True:
+            if slot.locked():
+                self._count('waits')
+            response = None
+            async with slot:
+                self._count('requests')
+                try:
+                    response = await state.client.get(url, **kwargs)
+                    if response.status_code not in RETRY_STATUSES or attempt >= self.max_retries:
+                        return response
+                except httpx.TransportError:
+                    if attempt >= self.max_retries:
+                        self._count('failures')
+                        raise
+            # Back off without holding the host slot
+            self._count('retries')
+            await asyncio.sleep(self._backoff(attempt, response))
+            attempt += 1
+
+    def close(self):
+        """
+        Close the pooled connections of the blocking session
+        """
+        self.session.close()
+
+    async def aclose(self):
+        """
+        Close the async client of the running event loop
+        """
+        state = self._async_states.pop(asyncio.get_running_loop(), None)
+        if state is not None:
+            await state.client.aclose()
+
+    def stats(self) -> dict:
+        """
+        Report request, retry and failure counts
+
+        :return: Dictionary of client statistics
+        """
+        hosts = set(self._slots)
+        for state in list(self._async_states.values()):
+            hosts.update(state.slots)
+        with self._lock:
+            return dict(self._stats, hosts=len(hosts), per_host_limit=self.per_host_limit)
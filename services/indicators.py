@@ -0,0 +1,382 @@
+import threading
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from scipy.signal import lfilter
+
+from .timeseries import TimeSeries
+
+
+def _ema(values: np.ndarray, alpha: float, previous: Optional[float] = None) -> np.ndarray:
+    """
+    Exponential moving average as a linear filter
+
+    Matches ``pandas.Series.ewm(alpha=alpha, adjust=False).mean()``: without a
+    previous value the average is seeded with the first observation.
+
+    :param values: Input array
+    :param alpha: Smoothing factor
+    :param previous: Average before the first value, if continuing a series
+    :return: Averages aligned with values
+    """
+    if len(values) == 0:
+        return np.empty(0)
+    if previous is None:
+        out = np.empty(len(values))
+        out[0] = values[0]
+        if len(values) > 1:
+            out[1:] = lfilter([alpha], [1.0, alpha - 1.0], values[1:],
+                              zi=[(1.0 - alpha) * values[0]])[0]
+        return out
+    return lfilter([alpha], [1.0, alpha - 1.0], values,
+                   zi=[(1.0 - alpha) * previous])[0]
+
+
+def _windows(tail: np.ndarray, values: np.ndarray, window: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Rolling windows ending at each new value, continuing from a stored tail
+
+    :param tail: Up to ``window - 1`` values preceding ``values``
+    :param values: New values
+    :param window: Window length
+    :return: Tuple of (windows, mask of rows with a full window, new tail)
+    """
+    buffer = np.concatenate([tail, values])
+    new_tail = buffer[-(window - 1):] if window > 1 else buffer[:0]
+    full = np.zeros(len(values), dtype=bool)
+    if len(buffer) < window:
+        return np.empty((0, window)), full, new_tail
+    windows = sliding_window_view(buffer, window)[-len(values):]
+    full[len(values) - len(windows):] = True
+    return windows, full, new_tail
+
+
+def _masked(full: np.ndarray, computed: np.ndarray) -> np.ndarray:
+    out = np.full(len(full), np.nan)
+    out[full] = computed
+    return out
+
+
+class Indicator(ABC):
+    """
+    Base class for technical indicators
+
+    ``step`` consumes a block of bars and a state from the previous block and
+    returns the indicator values for the block plus the state after it.
+    Passing no state computes the indicator from the start of the series, so
+    full-history computation and incremental updates share one vectorized
+    code path, and an update costs O(new bars) regardless of history length.
+    """
+    columns: List[str] = []
+
+    @abstractmethod
+    def step(self, state: Optional[dict], data: TimeSeries) -> Tuple[Dict[str, np.ndarray], dict]:
+        """
+        Compute the indicator over a block of bars
+
+        :param state: State after the previous block, or None to start from scratch
+        :param data: Bars following the ones the state was built from
+        :return: Tuple of (output columns for the block, state after it)
+        """
+
+
+class SMA(Indicator):
+    def __init__(self, window: int = 20):
+        self.window = window
+        self.columns = [f'SMA_{window}']
+
+    def step(self, state, data):
+        tail = state['tail'] if state else np.empty(0)
+        windows, full, tail = _windows(tail, data['Close'], self.window)
+        return {self.columns[0]: _masked(full, windows.mean(axis=1))}, {'tail': tail}
+
+
+class EMA(Indicator):
+    def __init__(self, span: int = 20):
+        self.alpha = 2.0 / (span + 1)
+        self.columns = [f'EMA_{span}']
+
+    def step(self, state, data):
+        ema = _ema(data['Close'], self.alpha, state['ema'] if state else None)
+        return {self.columns[0]: ema}, {'ema': ema[-1]}
+
+
+class RSI(Indicator):
+    def __init__(self, window: int = 14):
+        self.alpha = 1.0 / window
+        self.columns = [f'RSI_{window}']
+
+    def step(self, state, data):
+        close = data['Close']
+        if state:
+            deltas = np.diff(close, prepend=state['close'])
+            offset = 0
+        else:
+            # The first bar has no previous close and no RSI
+            deltas = np.diff(close)
+            offset = 1
+        previous_gain = state.get('avg_gain') if state else None
+        previous_loss = state.get('avg_loss') if state else None
+        avg_gain = _ema(np.maximum(deltas, 0.0), self.alpha, previous_gain)
+        avg_loss = _ema(np.maximum(-deltas, 0.0), self.alpha, previous_loss)
+
+        rsi = np.full(len(close), np.nan)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rsi[offset:] = np.where(avg_loss == 0, 100.0,
+                                    100.0 - 100.0 / (1.0 + avg_gain / avg_loss))
+        return {self.columns[0]: rsi}, {
+            'close': close[-1],
+            'avg_gain': avg_gain[-1] if len(deltas) else previous_gain,
+            'avg_loss': avg_loss[-1] if len(deltas) else previous_loss,
+        }
+
+
+class MACD(Indicator):
+    def __init__(self, fast: int = 12, slow: int = 26, signal: int = 9):
+        self.alphas = (2.0 / (fast + 1), 2.0 / (slow + 1), 2.0 / (signal + 1))
+        self.columns = ['MACD', 'MACD_Signal', 'MACD_Hist']
+
+    def step(self, state, data):
+        close = data['Close']
+        fast = _ema(close, self.alphas[0], state['fast'] if state else None)
+        slow = _ema(close, self.alphas[1], state['slow'] if state else None)
+        macd = fast - slow
+        signal = _ema(macd, self.alphas[2], state['signal'] if state else None)
+        return {
+            'MACD': macd,
+            'MACD_Signal': signal,
+            'MACD_Hist': macd - signal,
+        }, {'fast': fast[-1], 'slow': slow[-1], 'signal': signal[-1]}
+
+
+class BollingerBands(Indicator):
+    def __init__(self, window: int = 20, num_std: float = 2.0):
+        self.window = window
+        self.num_std = num_std
+        self.columns = ['BB_Upper', 'BB_Middle', 'BB_Lower']
+
+    def step(self, state, data):
+        tail = state['tail'] if state else np.empty(0)
+        windows, full, tail = _windows(tail, data['Close'], self.window)
+        middle = windows.mean(axis=1)
+        band = self.num_std * windows.std(axis=1)
+        return {
+            'BB_Upper': _masked(full, middle + band),
+            'BB_Middle': _masked(full, middle),
+            'BB_Lower': _masked(full, middle - band),
+        }, {'tail': tail}
+
+
+class ATR(Indicator):
+    def __init__(self, window: int = 14):
+        self.alpha = 1.0 / window
+        self.columns = [f'ATR_{window}']
+
+    def step(self, state, data):
+        high, low, close = data['High'], data['Low'], data['Close']
+        previous = np.empty(len(close))
+        previous[1:] = close[:-1]
+        previous[0] = state['close'] if state else np.nan
+
+        with np.errstate(invalid='ignore'):
+            true_range = np.fmax(high - low,
+                                 np.fmax(np.abs(high - previous), np.abs(low - previous)))
+        atr = _ema(true_range, self.alpha, state['atr'] if state else None)
+        return {self.columns[0]: atr}, {'close': close[-1], 'atr': atr[-1]}
+
+
+class RollingVolatility(Indicator):
+    def __init__(self, window: int = 20):
+        self.window = window
+        self.columns = [f'Volatility_{window}']
+
+    def step(self, state, data):
+        close = data['Close']
+        if state:
+            log_returns = np.diff(np.log(close), prepend=np.log(state['close']))
+            tail = state['tail']
+        else:
+            log_returns = np.empty(len(close))
+            log_returns[0] = np.nan
+            log_returns[1:] = np.diff(np.log(close))
+            tail = np.empty(0)
+            # Skip the undefined first return so it never enters a window
+            windows, full, tail = _windows(tail, log_returns[1:], self.window)
+            out = np.full(len(close), np.nan)
+            out[1:] = _masked(full, windows.std(axis=1, ddof=1))
+            return {self.columns[0]: out}, {'close': close[-1], 'tail': tail}
+
+        windows, full, tail = _windows(tail, log_returns, self.window)
+        return {self.columns[0]: _masked(full, windows.std(axis=1, ddof=1))}, {
+            'close': close[-1], 'tail': tail}
+
+
+# Indicators selectable by name, with their default parameters
+INDICATORS: Dict[str, Indicator] = {
+    'sma': SMA(20),
+    'ema': EMA(20),
+    'rsi': RSI(14),
+    'macd': MACD(12, 26, 9),
+    'bollinger': BollingerBands(20, 2.0),
+    'atr': ATR(14),
+    'volatility': RollingVolatility(20),
+}
+
+
+class _CachedIndicators:
+    """
+    Indicator outputs for a series plus the state after its second-to-last bar
+
+    The last bar may still be forming, so the committed state stops one bar
+    short and the last bar is recomputed on every update.
+    """
+    __slots__ = ('index', 'close', 'outputs', 'states')
+
+    def __init__(self, index, close, outputs, states):
+        self.index = index
+        self.close = close
+        self.outputs = outputs
+        self.states = states
+
+
+class IndicatorEngine:
+    """
+    Vectorized technical indicators with incremental updates
+
+    ``compute`` evaluates indicators over a whole series. ``apply`` keeps
+    per-series state so that when bars are appended, only the new bars are
+    processed instead of the full history. State is only continued for a
+    series that starts on the same bar as the cached one, since EMA-based
+    indicators and warm-up periods depend on where the series starts; any
+    other window is computed from scratch.
+    """
+    def __init__(self, max_entries: int = 512):
+        """
+        Initialize the indicator engine
+
+        :param max_entries: Maximum number of series whose state is kept
+        """
+        self.max_entries = max_entries
+        self._entries: 'OrderedDict[tuple, _CachedIndicators]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {'full_computes': 0, 'incremental_updates': 0}
+
+    def _count(self, name: str, n: int = 1):
+        with self._lock:
+            self._stats[name] += n
+
+    @staticmethod
+    def columns(names: List[str]) -> List[str]:
+        """
+        Output column names of the selected indicators
+
+        :param names: Indicator names
+        :return: Column names in indicator order
+        """
+        return [column for name in names for column in INDICATORS[name].columns]
+
+    @staticmethod
+    def update(states: Dict[str, Optional[dict]],
+               data: TimeSeries,
+               names: List[str]) -> Tuple[Dict[str, np.ndarray], Dict[str, dict]]:
+        """
+        Advance indicator states over a block of bars
+
+        :param states: State per indicator name, or None to start from scratch
+        :param data: Bars following the ones the states were built from
+        :param names: Indicator names
+        :return: Tuple of (output columns for the block, new states)
+        """
+        if len(data) == 0:
+            return ({column: np.empty(0) for column in IndicatorEngine.columns(names)},
+                    dict(states))
+
+        outputs: Dict[str, np.ndarray] = {}
+        new_states: Dict[str, dict] = {}
+        for name in names:
+            values, new_states[name] = INDICATORS[name].step(states.get(name), data)
+            outputs.update(values)
+        return outputs, new_states
+
+    def compute(self, data: TimeSeries, names: List[str]) -> Dict[str, np.ndarray]:
+        """
+        Compute indicators over a whole series
+
+        :param data: OHLCV time series
+        :param names: Indicator names
+        :return: Mapping of output column to array aligned with data
+        """
+        outputs, _ = self.update({}, data, names)
+        return outputs
+
+    def apply(self, key: tuple, data: TimeSeries, names: List[str]) -> Dict[str, np.ndarray]:
+        """
+        Compute indicators, continuing from cached state when bars were appended
+
+        :param key: Identity of the series, e.g. (symbol, interval, period)
+        :param data: OHLCV time series
+        :param names: Indicator names
+        :return: Mapping of output column to array aligned with data
+        """
+        names = list(names)
+        if len(data) < 2:
+            return self.compute(data, names)
+
+        cache_key = tuple(key) + tuple(names)
+        with self._lock:
+            entry = self._entries.get(cache_key)
+
+        position = None
+        if entry is not None and entry.index[0] == data.index[0]:
+            # The committed state covers every cached bar but the last
+            position = len(entry.index) - 2
+            valid = (
+                position < len(data) - 1
+                and np.array_equal(entry.index[:position + 1], data.index[:position + 1])
+                and np.array_equal(entry.close[:position + 1], data['Close'][:position + 1])
+            )
+            if not valid:
+                position = None
+
+        if position is None:
+            self._count('full_computes')
+            body, states = self.update({}, data.take(slice(None, -1)), names)
+            prefix = body
+        else:
+            self._count('incremental_updates')
+            body, states = self.update(entry.states,
+                                       data.take(slice(position + 1, -1)), names)
+            prefix = {
+                column: np.concatenate([
+                    entry.outputs[column][:position + 1],
+                    body[column]])
+                for column in body
+            }
+
+        last, _ = self.update(states, data.take(slice(-1, None)), names)
+        outputs = {
+            column: np.concatenate([prefix[column], last[column]])
+            for column in prefix
+        }
+
+        with self._lock:
+            self._entries[cache_key] = _CachedIndicators(
+                data.index, data['Close'], outputs, states)
+            self._entries.move_to_end(cache_key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+        return outputs
+
+    def stats(self) -> dict:
+        """
+        Report how often indicators were updated incrementally
+
+        :return: Dictionary of computation counters
+        """
+        with self._lock:
+            return dict(self._stats, entries=len(self._entries))
+
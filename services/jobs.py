@@ -0,0 +1,448 @@
+import asyncio
+import json
+import queue
+import sqlite3
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Sequence
+
+
+JOB_STATUSES = ('queued', 'running', 'succeeded', 'failed')
+FINISHED_STATUSES = ('succeeded', 'failed')
+
+# Seconds between prunes of expired finished jobs
+PRUNE_INTERVAL = 60.0
+
+# Fraction by which finished jobs in memory may exceed max_finished between prunes
+PRUNE_SLACK = 0.1
+
+
+class QueueFullError(Exception):
+    """
+    Raised when a job is submitted while the queue is at its depth limit
+    """
+
+
+class Job:
+    """
+    A submitted unit of work with per-stage progress and partial results
+    """
+    def __init__(self,
+                 job_id: str,
+                 kind: str,
+                 params: dict,
+                 stages: Sequence[str] = (),
+                 key: Optional[Hashable] = None):
+        self.job_id = job_id
+        self.kind = kind
+        self.params = params
+        self.key = key
+        self.status = 'queued'
+        self.stages: Dict[str, Optional[float]] = {stage: None for stage in stages}
+        self.result: Optional[Any] = None
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self.updated_at = self.created_at
+        # Bumped on every change; long-polling clients wait for it to move
+        self.version = 0
+        self._changed: Optional[asyncio.Event] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in FINISHED_STATUSES
+
+    def to_dict(self) -> dict:
+        """
+        Serialize for the API and the job store
+
+        :return: JSON-compatible dictionary
+        """
+        return {
+            'job_id': self.job_id,
+            'kind': self.kind,
+            'params': self.params,
+            'status': self.status,
+            'stages': {
+                stage: {'status': 'done' if finished_at else 'pending',
+                        'finished_at': finished_at}
+                for stage, finished_at in self.stages.items()
+            },
+            'result': self.result,
+            'error': self.error,
+            'created_at': self.created_at,
+            'updated_at': self.updated_at,
+            'version': self.version,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'Job':
+        job = cls(data['job_id'], data['kind'], data['params'])
+        job.status = data['status']
+        job.stages = {stage: info['finished_at'] for stage, info in data['stages'].items()}
+        job.result = data['result']
+        job.error = data['error']
+        job.created_at = data['created_at']
+        job.updated_at = data['updated_at']
+        job.version = data['version']
+        return job
+
+
+class SqliteJobStore:
+    """
+    SQLite table of job snapshots so results survive a restart
+
+    Each job is stored as one JSON document, rewritten on every update.
+    Snapshots from the event loop are queued to a single writer thread,
+    which writes them in submission order and commits each batch once.
+    """
+    def __init__(self, path: str):
+        """
+        Initialize the job store
+
+        :param path: Database file path
+        """
+        self.path = path
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        # In WAL mode this only syncs at checkpoints, keeping updates cheap
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS jobs ('
+            ' job_id TEXT PRIMARY KEY,'
+            ' status TEXT NOT NULL,'
+            ' updated_at REAL NOT NULL,'
+            ' data TEXT NOT NULL)')
+        self._conn.commit()
+        self._lock = threading.Lock()
+        self._writes: queue.Queue = queue.Queue()
+        self._writer = threading.Thread(target=self._write_loop, name='job-store-writer',
+                                        daemon=True)
+        self._writer.start()
+
+    def _write(self, job_id: str, status: str, updated_at: float, snapshot: dict):
+        self._conn.execute(
+            'INSERT OR REPLACE INTO jobs (job_id, status, updated_at, data) '
+            'VALUES (?, ?, ?, ?)',
+            (job_id, status, updated_at, json.dumps(snapshot, default=str)))
+
+    def save(self, job: Job):
+        with self._lock:
+            self._write(job.job_id, job.status, job.updated_at, job.to_dict())
+            self._conn.commit()
+
+    def save_later(self, job: Job):
+        """
+        Queue a snapshot of the job for the writer thread
+
+        :param job: Job whose current state is written
+        """
+        self._writes.put(('save', (job.job_id, job.status, job.updated_at, job.to_dict())))
+
+    def prune_later(self, older_than: float):
+        """
+        Queue deletion of finished jobs behind the snapshots already queued
+
+        :param older_than: Cutoff time; finished jobs last updated before it are deleted
+        """
+        self._writes.put(('prune', older_than))
+
+    def flush(self):
+        """
+        Block until every queued write is committed
+        """
+        self._writes.join()
+
+    def _write_loop(self):
+        while True:
+            batch = [self._writes.get()]
+            while True:
+                try:
+                    batch.append(self._writes.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                with self._lock:
+                    for op, args in batch:
+                        if op == 'save':
+                            self._write(*args)
+                        elif op == 'prune':
+                            self._prune(args)
+                    self._conn.commit()
+            except Exception as e:
+                print(f"Error writing job snapshots: {e}")
+            finally:
+                for _ in batch:
+                    self._writes.task_done()
+            if any(op == 'close' for op, _ in batch):
+                return
+
+    def load(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT data FROM jobs WHERE job_id = ?', (job_id,)).fetchone()
+        return Job.from_dict(json.loads(row[0])) if row else None
+
+    def fail_unfinished(self, error: str) -> int:
+        """
+        Mark jobs left queued or running by a previous process as failed
+
+        :param error: Error message to record
+        :return: Number of jobs marked
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT data FROM jobs WHERE status IN ('queued', 'running')").fetchall()
+        for (data,) in rows:
+            job = Job.from_dict(json.loads(data))
+            job.status = 'failed'
+            job.error = error
+            job.updated_at = time.time()
+            job.version += 1
+            self.save(job)
+        return len(rows)
+
+    def _prune(self, older_than: float):
+        self._conn.execute(
+            "DELETE FROM jobs WHERE status IN ('succeeded', 'failed') AND updated_at < ?",
+            (older_than,))
+
+    def prune(self, older_than: float):
+        with self._lock:
+            self._prune(older_than)
+            self._conn.commit()
+
+    def close(self):
+        """
+        Write any queued snapshots, stop the writer thread and close the database
+        """
+        self._writes.put(('close', None))
+        self._writer.join()
+        with self._lock:
+            self._conn.close()
+
+
+class JobManager:
+    """
+    Bounded in-process worker pool running queued jobs
+
+    Jobs wait in a queue of limited depth and run on a fixed number of
+    asyncio workers. Submitting a job identical to one still queued or
+    running returns the existing job. Finished jobs stay available for
+    ``retention`` seconds, and with a job store also across restarts.
+    """
+    def __init__(self,
+                 runner: Callable[[Job, Callable[[str, Any], None]], Awaitable[Any]],
+                 workers: int = 4,
+                 max_queue: int = 100,
+                 store: Optional[SqliteJobStore] = None,
+                 retention: float = 24 * 3600,
+                 max_finished: int = 10_000):
+        """
+        Initialize the job manager
+
+        :param runner: Coroutine function of (job, on_stage) returning the job result
+        :param workers: Number of jobs run concurrently
+        :param max_queue: Maximum number of jobs waiting to run
+        :param store: Optional persistent job store
+        :param retention: Seconds finished jobs are kept
+        :param max_finished: Finished jobs kept in memory; pruning lets up to PRUNE_SLACK more build up
+        """
+        self.runner = runner
+        self.workers = workers
+        self.max_queue = max_queue
+        self.store = store
+        self.retention = retention
+        self.max_finished = max_finished
+        self._jobs: 'OrderedDict[str, Job]' = OrderedDict()
+        self._active: Dict[Hashable, Job] = {}
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks = []
+        self._pruned_at = 0.0
+        self._stats = {
+            'submitted': 0,
+            'deduplicated': 0,
+            'rejected': 0,
+            'succeeded': 0,
+            'failed': 0,
+        }
+
+    async def start(self):
+        """
+        Start the workers on the running event loop
+        """
+        self._queue = asyncio.Queue(maxsize=self.max_queue)
+        if self.store is not None:
+            await asyncio.to_thread(self.store.fail_unfinished,
+                                    "Interrupted by a server restart")
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self):
+        """
+        Cancel the workers; jobs still running are marked failed in the store
+        """
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        if self.store is not None:
+            await asyncio.to_thread(self.store.flush)
+            await asyncio.to_thread(self.store.fail_unfinished,
+                                    "Interrupted by a server shutdown")
+
+    def submit(self,
+               kind: str,
+               params: dict,
+               stages: Sequence[str] = (),
+               key: Optional[Hashable] = None) -> Job:
+        """
+        Queue a job, or return the identical job already queued or running
+
+        :param kind: Job type, e.g. 'analysis'
+        :param params: JSON-compatible job parameters
+        :param stages: Stage names reported by the runner
+        :param key: Identity used to deduplicate active jobs
+        :return: The queued or existing job
+        :raises QueueFullError: If the queue is at its depth limit
+        """
+        if key is not None and key in self._active:
+            self._stats['deduplicated'] += 1
+            return self._active[key]
+
+        job = Job(uuid.uuid4().hex, kind, params, stages, key)
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            self._stats['rejected'] += 1
+            raise QueueFullError(f"Job queue is full ({self.max_queue} jobs waiting)")
+
+        self._stats['submitted'] += 1
+        self._jobs[job.job_id] = job
+        if key is not None:
+            self._active[key] = job
+        self._maybe_prune()
+        self._persist(job)
+        return job
+
+    async def get(self, job_id: str) -> Optional[Job]:
+        """
+        Look up a job in memory, then in the job store
+
+        :param job_id: Job identifier
+        :return: Job, or None if unknown
+        """
+        job = self._jobs.get(job_id)
+        if job is None and self.store is not None:
+            job = await asyncio.to_thread(self.store.load, job_id)
+        return job
+
+    async def wait(self, job_id: str, since_version: int = -1,
+                   timeout: float = 0.0) -> Optional[Job]:
+        """
+        Long-poll a job until it changes past a version, finishes, or the timeout passes
+
+        :param job_id: Job identifier
+        :param since_version: Version the client has already seen
+        :param timeout: Maximum seconds to wait
+        :return: Job, or None if unknown
+        """
+        job = await self.get(job_id)
+        deadline = time.monotonic() + timeout
+        while (job is not None and job.job_id in self._jobs
+               and job.version <= since_version and not job.finished):
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            if job._changed is None:
+                job._changed = asyncio.Event()
+            try:
+                await asyncio.wait_for(job._changed.wait(), remaining)
+            except asyncio.TimeoutError:
+                break
+        return job
+
+    def _update(self, job: Job, **changes):
+        for name, value in changes.items():
+            setattr(job, name, value)
+        job.updated_at = time.time()
+        job.version += 1
+        if job._changed is not None:
+            # Wake current waiters; later waiters get a fresh event
+            job._changed.set()
+            job._changed = None
+        self._persist(job)
+
+    def _persist(self, job: Job):
+        if self.store is not None:
+            # The writer thread keeps SQLite off the loop and writes snapshots in order
+            self.store.save_later(job)
+
+    async def _worker(self):
+        while True:
+            job = await self._queue.get()
+            try:
+                await self._run(job)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job: Job):
+        self._update(job, status='running')
+
+        def on_stage(stage: str, partial: Any = None):
+            job.stages[stage] = time.time()
+            self._update(job, result=partial if partial is not None else job.result)
+
+        try:
+            result = await self.runner(job, on_stage)
+            error = result.get('error') if isinstance(result, dict) else None
+            self._update(job, status='failed' if error else 'succeeded',
+                         result=result, error=error)
+        except asyncio.CancelledError:
+            self._update(job, status='failed', error="Cancelled")
+            raise
+        except Exception as e:
+            self._update(job, status='failed', error=str(e))
+        finally:
+            if job.status in self._stats:
+                self._stats[job.status] += 1
+            if job.key is not None and self._active.get(job.key) is job:
+                del self._active[job.key]
+
+    def _maybe_prune(self):
+        """
+        Prune at most once per PRUNE_INTERVAL, unless jobs in memory outgrow the limit first
+        """
+        # Jobs still queued or running are never pruned, so they do not count against the limit
+        limit = int(self.max_finished * (1 + PRUNE_SLACK)) + self.max_queue + self.workers
+        if len(self._jobs) > limit or time.time() - self._pruned_at > PRUNE_INTERVAL:
+            self._prune()
+
+    def _prune(self):
+        """
+        Forget finished jobs past their retention or beyond the memory limit
+        """
+        self._pruned_at = time.time()
+        cutoff = self._pruned_at - self.retention
+        finished = [j for j in self._jobs.values() if j.finished]
+        excess = len(finished) - self.max_finished
+        for job in finished:
+            if excess > 0 or job.updated_at < cutoff:
+                del self._jobs[job.job_id]
+                excess -= 1
+        if self.store is not None:
+            self.store.prune_later(cutoff)
+
+    def stats(self) -> dict:
+        """
+        Report queue depth and job outcomes
+
+        :return: Dictionary of job counters
+        """
+        return dict(
+            self._stats,
+            queued=self._queue.qsize() if self._queue else 0,
+            running=sum(1 for j in self._jobs.values() if j.status == 'running'),
+            max_queue=self.max_queue,
+            workers=self.workers,
+        )
@@ -0,0 +1,332 @@
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Callable, Iterable, Iterator, Optional
+
+
+def normalize_prompt(prompt: str) -> str:
+    """
+    Collapse whitespace so prompts differing only in layout share a cache entry
+
+    :param prompt: Prompt text
+    :return: Normalized prompt
+    """
+    return re.sub(r'\s+', ' ', prompt).strip()
+
+
+def cache_key(prompt: str, model_name: str) -> str:
+    """
+    Cache key of a prompt sent to a model
+
+    :param prompt: Prompt text
+    :param model_name: Name of the generative model
+    :return: Hex digest identifying the normalized prompt and model
+    """
+    digest = hashlib.sha256(model_name.encode('utf-8'))
+    digest.update(b'\0')
+    digest.update(normalize_prompt(prompt).encode('utf-8'))
+    return digest.hexdigest()
+
+
+class MemoryStore:
+    """
+    In-memory LRU of cached responses bounded by entry count and text size
+    """
+    def __init__(self, max_entries: int = 1024, max_bytes: int = 16 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.evictions = 0
+        self._entries: 'OrderedDict[str, dict]' = OrderedDict()
+        self._bytes = 0
+
+    def get(self, key: str) -> Optional[dict]:
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    def put(self, key: str, entry: dict):
+        self.delete(key)
+        self._entries[key] = entry
+        self._bytes += entry['size']
+        while self._entries and (len(self._entries) > self.max_entries
+                                 or self._bytes > self.max_bytes):
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= evicted['size']
+            self.evictions += 1
+
+    def delete(self, key: str):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry['size']
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def nbytes(self) -> int:
+        return self._bytes
+
+
+class DiskStore:
+    """
+    Directory of cached responses, one JSON file per key
+
+    Files are written to a temporary name and renamed into place, so
+    readers in other processes never see partial entries. When the
+    directory grows past ``max_bytes``, least recently used files go first.
+    """
+    def __init__(self, root_dir: str, max_bytes: int = 256 * 1024 * 1024):
+        self.root_dir = root_dir
+        self.max_bytes = max_bytes
+        self.evictions = 0
+        os.makedirs(root_dir, exist_ok=True)
+        self._bytes = sum(size for _, size, _ in self._files())
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root_dir, f'{key}.json')
+
+    @property
+    def nbytes(self) -> int:
+        return self._bytes
+
+    def _files(self):
+        for entry in os.scandir(self.root_dir):
+            if entry.name.endswith('.json'):
+                stat = entry.stat()
+                yield entry.path, stat.st_size, stat.st_mtime
+
+    def get(self, key: str) -> Optional[dict]:
+        path = self._path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+        # Touch the file so eviction follows recency of use
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return entry
+
+    def put(self, key: str, entry: dict):
+        path = self._path(key)
+        tmp_path = f'{path}.{uuid.uuid4().hex}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(entry, f)
+        size = os.path.getsize(tmp_path)
+        try:
+            previous = os.path.getsize(path)
+        except OSError:
+            previous = 0
+        os.replace(tmp_path, path)
+        self._bytes += size - previous
+        if self._bytes > self.max_bytes:
+            self._evict()
+
+    def delete(self, key: str):
+        try:
+            size = os.path.getsize(self._path(key))
+            os.unlink(self._path(key))
+            self._bytes -= size
+        except FileNotFoundError:
+            pass
+
+    def _evict(self):
+        files = sorted(self._files(), key=lambda f: f[2])
+        self._bytes = sum(size for _, size, _ in files)
+        # Trim to 90% so eviction does not run on every write
+        for path, size, _ in files:
+            if self._bytes <= self.max_bytes * 0.9:
+                break
+            try:
+                os.unlink(path)
+                self._bytes -= size
+                self.evictions += 1
+            except FileNotFoundError:
+                pass
+
+
+class ResponseCache:
+    """
+    Cache of generative model responses keyed on normalized prompt and model
+
+    Lookups check the in-memory LRU first and then the optional disk store,
+    promoting disk hits into memory. Entries expire after their TTL. Each
+    entry remembers how long the model took to produce it, so hits report
+    the latency they saved.
+    """
+    def __init__(self,
+                 ttl: float = 6 * 3600,
+                 max_entries: int = 1024,
+                 max_bytes: int = 16 * 1024 * 1024,
+                 disk_dir: Optional[str] = None,
+                 disk_max_bytes: int = 256 * 1024 * 1024):
+        """
+        Initialize the response cache
+
+        :param ttl: Default seconds a response stays valid
+        :param max_entries: Maximum number of responses kept in memory
+        :param max_bytes: Maximum total size of responses kept in memory
+        :param disk_dir: Directory for the on-disk store, or None for memory only
+        :param disk_max_bytes: Maximum total size of the on-disk store
+        """
+        self.ttl = ttl
+        self.memory = MemoryStore(max_entries, max_bytes)
+        self.disk = DiskStore(disk_dir, disk_max_bytes) if disk_dir else None
+        self._lock = threading.Lock()
+        self._stats = {
+            'hits': 0,
+            'disk_hits': 0,
+            'misses': 0,
+            'saved_seconds': 0.0,
+            'generation_seconds': 0.0,
+        }
+
+    def get(self, prompt: str, model_name: str) -> Optional[str]:
+        """
+        Look up a cached response
+
+        :param prompt: Prompt text
+        :param model_name: Name of the generative model
+        :return: Cached response text, or None
+        """
+        key = cache_key(prompt, model_name)
+        now = time.time()
+        with self._lock:
+            entry = self.memory.get(key)
+            if entry is not None and entry['expires_at'] <= now:
+                self.memory.delete(key)
+                entry = None
+            from_disk = False
+            if entry is None and self.disk is not None:
+                entry = self.disk.get(key)
+                if entry is not None and entry['expires_at'] <= now:
+                    self.disk.delete(key)
+                    entry = None
+                if entry is not None:
+                    from_disk = True
+                    self.memory.put(key, entry)
+
+            if entry is None:
+                self._stats['misses'] += 1
+                return None
+            self._stats['hits'] += 1
+            self._stats['disk_hits'] += from_disk
+            self._stats['saved_seconds'] += entry['latency']
+            return entry['text']
+
+    def put(self,
+            prompt: str,
+            model_name: str,
+            text: str,
+            latency: float = 0.0,
+            ttl: Optional[float] = None):
+        """
+        Store a response
+
+        :param prompt: Prompt text
+        :param model_name: Name of the generative model
+        :param text: Response text
+        :param latency: Seconds the model took to produce the response
+        :param ttl: Seconds the response stays valid, defaults to the cache TTL
+        """
+        key = cache_key(prompt, model_name)
+        entry = {
+            'model': model_name,
+            'text': text,
+            'latency': latency,
+            'expires_at': time.time() + (self.ttl if ttl is None else ttl),
+            'size': len(text.encode('utf-8')),
+        }
+        with self._lock:
+            self.memory.put(key, entry)
+            if self.disk is not None:
+                self.disk.put(key, entry)
+
+    def get_or_generate(self,
+                        prompt: str,
+                        model_name: str,
+                        generate: Callable[[str], str],
+                        ttl: Optional[float] = None) -> str:
+        """
+        Return a cached response or generate and store a new one
+
+        Failed or empty generations are not cached.
+
+        :param prompt: Prompt text
+        :param model_name: Name of the generative model
+        :param generate: Function sending the prompt to the model
+        :param ttl: Seconds a new response stays valid, defaults to the cache TTL
+        :return: Response text
+        """
+        text = self.get(prompt, model_name)
+        if text is not None:
+            return text
+
+        started = time.perf_counter()
+        text = generate(prompt)
+        latency = time.perf_counter() - started
+        with self._lock:
+            self._stats['generation_seconds'] += latency
+        if text:
+            self.put(prompt, model_name, text, latency, ttl)
+        return text
+
+    def stream_or_generate(self,
+                           prompt: str,
+                           model_name: str,
+                           stream: Callable[[str], Iterable[str]],
+                           ttl: Optional[float] = None) -> Iterator[str]:
+        """
+        Yield a cached response whole, or stream a new one chunk by chunk
+
+        The streamed response is stored once the stream completes; streams
+        that fail or are abandoned by the consumer are not cached.
+
+        :param prompt: Prompt text
+        :param model_name: Name of the generative model
+        :param stream: Function sending the prompt to the model and yielding text chunks
+        :param ttl: Seconds a new response stays valid, defaults to the cache TTL
+        :return: Iterator of response text chunks
+        """
+        text = self.get(prompt, model_name)
+        if text is not None:
+            yield text
+            return
+
+        started = time.perf_counter()
+        chunks = []
+        for chunk in stream(prompt):
+            chunks.append(chunk)
+            yield chunk
+        latency = time.perf_counter() - started
+        with self._lock:
+            self._stats['generation_seconds'] += latency
+        text = ''.join(chunks)
+        if text:
+            self.put(prompt, model_name, text, latency, ttl)
+
+    def stats(self) -> dict:
+        """
+        Report cache effectiveness
+
+        :return: Dictionary of hit ratio, saved latency and store sizes
+        """
+        with self._lock:
+            lookups = self._stats['hits'] + self._stats['misses']
+            return dict(
+                self._stats,
+                hit_ratio=self._stats['hits'] / lookups if lookups else 0.0,
+                entries=len(self.memory),
+                bytes=self.memory.nbytes,
+                evictions=self.memory.evictions,
+                disk_bytes=self.disk.nbytes if self.disk else 0,
+                disk_evictions=self.disk.evictions if self.disk else 0,
+            )
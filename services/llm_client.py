@@ -0,0 +1,432 @@
+import argparse
+import json
+import os
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Iterator, Optional
+
+import google.generativeai as genai
+import requests
+
+from .fake_model import FakeGenerativeModel
+from .llm_cache import ResponseCache
+
+
+GEMINI_MODEL = 'gemini-2.0-flash'
+
+# HTTP statuses worth retrying: rate limiting and transient server errors
+RETRYABLE_STATUSES = (429, 500, 502, 503, 504)
+
+
+class LLMError(Exception):
+    """
+    Error returned by an LLM backend, with the HTTP status when known
+    """
+    def __init__(self, message: str, status_code: Optional[int] = None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def is_retryable(error: Exception) -> bool:
+    """
+    Decide whether a failed model call should be retried
+
+    Covers google.api_core errors (which carry an HTTP ``code``), LLMError
+    from the HTTP backend, and timeouts.
+
+    :param error: Exception raised by a backend
+    :return: True for rate limiting, transient server errors and timeouts
+    """
+    if isinstance(error, (TimeoutError, requests.Timeout, requests.ConnectionError)):
+        return True
+    status = getattr(error, 'status_code', None)
+    if status is None:
+        code = getattr(error, 'code', None)
+        status = code if isinstance(code, int) else None
+    return status in RETRYABLE_STATUSES
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket limiting the rate of upstream calls
+
+    Callers reserve tokens in arrival order and sleep until their token is
+    due, so a burst is spread out at the configured rate instead of
+    failing or fanning out.
+    """
+    def __init__(self, rate: float, capacity: float):
+        """
+        Initialize the token bucket
+
+        :param rate: Tokens added per second; 0 disables limiting
+        :param capacity: Maximum tokens accumulated while idle (burst size)
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """
+        Take one token, waiting until it is available
+
+        :return: Seconds spent waiting
+        """
+        if self.rate <= 0:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity,
+                               self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            # Going negative reserves a future token for this caller
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if wait:
+            time.sleep(wait)
+        return wait
+
+
+class ModelBackend:
+    """
+    Backend for any model object with the ``generate_content`` API
+
+    Wraps ``genai.GenerativeModel`` and FakeGenerativeModel.
+    """
+    def __init__(self, model):
+        self.model = model
+        self.model_name = model.model_name
+
+    def generate(self, prompt: str, timeout: float) -> str:
+        return self.model.generate_content(
+            prompt, request_options={'timeout': timeout}).text
+
+    def stream(self, prompt: str, timeout: float) -> Iterator[str]:
+        for chunk in self.model.generate_content(
+                prompt, stream=True, request_options={'timeout': timeout}):
+            yield chunk.text
+
+
+def gemini_backend(api_key: str, model_name: str = GEMINI_MODEL) -> ModelBackend:
+    """
+    Configure the Gemini SDK once and wrap a reusable model instance
+
+    :param api_key: Google Generative AI API key
+    :param model_name: Gemini model name
+    :return: Model backend
+    """
+    genai.configure(api_key=api_key)
+    return ModelBackend(genai.GenerativeModel(model_name))
+
+
+class HttpBackend:
+    """
+    Backend for a plain HTTP completion service, such as the local stub server
+
+    ``POST {base_url}/generate`` with ``{"prompt", "model", "stream"}``
+    returns ``{"text"}``, or one ``{"text"}`` JSON line per chunk when
+    streaming.
+    """
+    def __init__(self, base_url: str, model_name: str = 'stub'):
+        self.base_url = base_url.rstrip('/')
+        self.model_name = model_name
+        self.session = requests.Session()
+
+    def _post(self, prompt: str, timeout: float, stream: bool) -> requests.Response:
+        response = self.session.post(
+            f'{self.base_url}/generate',
+            json={'prompt': prompt, 'model': self.model_name, 'stream': stream},
+            timeout=timeout, stream=stream)
+        if response.status_code >= 400:
+            response.close()
+            raise LLMError(f"LLM backend returned HTTP {response.status_code}",
+                           response.status_code)
+        return response
+
+    def generate(self, prompt: str, timeout: float) -> str:
+        return self._post(prompt, timeout, stream=False).json()['text']
+
+    def stream(self, prompt: str, timeout: float) -> Iterator[str]:
+        with self._post(prompt, timeout, stream=True) as response:
+            for line in response.iter_lines():
+                if line:
+                    yield json.loads(line)['text']
+
+
+class LLMClient:
+    """
+    Shared, concurrency-safe client for text generation
+
+    All services send prompts through one client so that upstream usage is
+    bounded in one place: at most ``max_concurrency`` calls are in flight,
+    calls start no faster than the token bucket allows, each call has a
+    timeout, and rate-limit or server errors are retried with jittered
+    exponential backoff. Excess callers wait in line rather than fanning
+    out. Responses go through the optional response cache.
+    """
+    def __init__(self,
+                 backend,
+                 cache: Optional[ResponseCache] = None,
+                 max_concurrency: int = 8,
+                 rate: float = 5.0,
+                 burst: float = 10.0,
+                 timeout: float = 60.0,
+                 max_retries: int = 3,
+                 backoff_base: float = 0.5,
+                 backoff_max: float = 8.0):
+        """
+        Initialize the LLM client
+
+        :param backend: Object with model_name, generate(prompt, timeout) and stream(prompt, timeout)
+        :param cache: Optional response cache
+        :param max_concurrency: Maximum upstream calls in flight
+        :param rate: Upstream calls started per second; 0 disables rate limiting
+        :param burst: Calls that may start at once after an idle period
+        :param timeout: Seconds allowed per upstream call
+        :param max_retries: Retries after the first attempt for retryable errors
+        :param backoff_base: Base delay of the exponential backoff in seconds
+        :param backoff_max: Maximum backoff delay in seconds
+        """
+        self.backend = backend
+        self.cache = cache
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self._bucket = TokenBucket(rate, burst)
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._waiting = 0
+        self._stats = {
+            'requests': 0,
+            'upstream_calls': 0,
+            'retries': 0,
+            'failures': 0,
+            'queue_wait_seconds': 0.0,
+            'rate_limit_wait_seconds': 0.0,
+            'max_waiting': 0,
+        }
+
+    @classmethod
+    def from_env(cls, cache: Optional[ResponseCache] = None) -> 'LLMClient':
+        """
+        Build a client from LLM_* environment variables
+
+        LLM_BACKEND selects 'gemini' (default, using GEMINI_API_KEY), 'fake'
+        (offline, FAKE_LLM_* delays) or 'http' (LLM_HTTP_URL, e.g. the stub
+        server from ``python -m services.llm_client``).
+
+        :param cache: Optional response cache
+        :return: Configured client
+        """
+        kind = os.getenv('LLM_BACKEND', 'gemini')
+        if kind == 'fake':
+            backend = ModelBackend(FakeGenerativeModel(
+                first_token_delay=float(os.getenv('FAKE_LLM_FIRST_TOKEN_DELAY', '0.5')),
+                token_delay=float(os.getenv('FAKE_LLM_TOKEN_DELAY', '0.02'))))
+        elif kind == 'http':
+            backend = HttpBackend(os.getenv('LLM_HTTP_URL', 'http://127.0.0.1:8081'))
+        elif kind == 'gemini':
+            backend = gemini_backend(os.getenv('GEMINI_API_KEY', ''),
+                                     os.getenv('GEMINI_MODEL', GEMINI_MODEL))
+        else:
+            raise ValueError(f"Unknown LLM backend: {kind}")
+
+        return cls(
+            backend,
+            cache=cache,
+            max_concurrency=int(os.getenv('LLM_MAX_CONCURRENCY', '8')),
+            rate=float(os.getenv('LLM_RATE_PER_SECOND', '5')),
+            burst=float(os.getenv('LLM_BURST', '10')),
+            timeout=float(os.getenv('LLM_TIMEOUT_SECONDS', '60')),
+            max_retries=int(os.getenv('LLM_MAX_RETRIES', '3')))
+
+    @property
+    def model_name(self) -> str:
+        return self.backend.model_name
+
+    def _acquire(self):
+        """
+        Wait for a concurrency slot, then for the rate limiter
+        """
+        started = time.monotonic()
+        with self._lock:
+            self._waiting += 1
+            self._stats['max_waiting'] = max(self._stats['max_waiting'], self._waiting)
+        self._slots.acquire()
+        queued = time.monotonic() - started
+        throttled = self._bucket.acquire()
+        with self._lock:
+            self._waiting -= 1
+            self._in_flight += 1
+            self._stats['upstream_calls'] += 1
+            self._stats['queue_wait_seconds'] += queued
+            self._stats['rate_limit_wait_seconds'] += throttled
+
+    def _release(self):
+        with self._lock:
+            self._in_flight -= 1
+        self._slots.release()
+
+    def _backoff(self, attempt: int) -> float:
+        # Full jitter keeps retrying clients from synchronizing
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    def _with_retries(self, call: Callable[[], object]):
+        """
+        Run an upstream call in a slot, retrying retryable errors
+        """
+        attempt = 0
+        while True:
+            self._acquire()
+            try:
+                return call()
+            except Exception as e:
+                if attempt >= self.max_retries or not is_retryable(e):
+                    with self._lock:
+                        self._stats['failures'] += 1
+                    raise
+            finally:
+                self._release()
+            # Back off without holding a slot
+            with self._lock:
+                self._stats['retries'] += 1
+            time.sleep(self._backoff(attempt))
+            attempt += 1
+
+    def _generate_uncached(self, prompt: str) -> str:
+        return self._with_retries(lambda: self.backend.generate(prompt, self.timeout))
+
+    def _stream_uncached(self, prompt: str) -> Iterator[str]:
+        """
+        Stream from the backend, holding a slot until the stream ends
+
+        Retries happen only before the first chunk; once text has been
+        yielded, errors propagate to the caller.
+        """
+        attempt = 0
+        while True:
+            self._acquire()
+            started = False
+            try:
+                for chunk in self.backend.stream(prompt, self.timeout):
+                    started = True
+                    yield chunk
+                return
+            except Exception as e:
+                if started or attempt >= self.max_retries or not is_retryable(e):
+                    with self._lock:
+                        self._stats['failures'] += 1
+                    raise
+            finally:
+                self._release()
+            with self._lock:
+                self._stats['retries'] += 1
+            time.sleep(self._backoff(attempt))
+            attempt += 1
+
+    def generate(self, prompt: str) -> str:
+        """
+        Generate a response, from the cache when possible
+
+        :param prompt: Prompt text
+        :return: Response text
+        """
+        with self._lock:
+            self._stats['requests'] += 1
+        if self.cache is None:
+            return self._generate_uncached(prompt)
+        return self.cache.get_or_generate(prompt, self.model_name, self._generate_uncached)
+
+    def stream(self, prompt: str) -> Iterator[str]:
+        """
+        Stream a response chunk by chunk, from the cache when possible
+
+        :param prompt: Prompt text
+        :return: Iterator of response text chunks
+        """
+        with self._lock:
+            self._stats['requests'] += 1
+        if self.cache is None:
+            return self._stream_uncached(prompt)
+        return self.cache.stream_or_generate(prompt, self.model_name, self._stream_uncached)
+
+    def stats(self) -> dict:
+        """
+        Report upstream usage, queueing and retry counters
+
+        :return: Dictionary of client statistics
+        """
+        with self._lock:
+            return dict(self._stats,
+                        model=self.model_name,
+                        in_flight=self._in_flight,
+                        waiting=self._waiting,
+                        max_concurrency=self.max_concurrency)
+
+
+def run_stub_server(port: int = 8081,
+                    first_token_delay: float = 0.5,
+                    token_delay: float = 0.02,
+                    error_rate: float = 0.0):
+    """
+    Serve the HttpBackend protocol with the fake model for load tests
+
+    :param port: Port to listen on
+    :param first_token_delay: Seconds before the first token
+    :param token_delay: Seconds between tokens
+    :param error_rate: Fraction of requests answered with HTTP 429 or 503
+    """
+    model = FakeGenerativeModel(first_token_delay, token_delay)
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+            if random.random() < error_rate:
+                self.send_response(random.choice((429, 503)))
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+
+            if not body.get('stream'):
+                data = json.dumps({'text': model.generate_content(body['prompt']).text})
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data.encode('utf-8'))
+                return
+
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/x-ndjson')
+            self.send_header('Transfer-Encoding', 'chunked')
+            self.end_headers()
+            for chunk in model.generate_content(body['prompt'], stream=True):
+                line = (json.dumps({'text': chunk.text}) + '\n').encode('utf-8')
+                self.wfile.write(f'{len(line):x}\r\n'.encode('ascii') + line + b'\r\n')
+                self.wfile.flush()
+            self.wfile.write(b'0\r\n\r\n')
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', port), Handler)
+    print(f"LLM stub server listening on http://127.0.0.1:{port}")
+    server.serve_forever()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Local LLM stub server for load tests")
+    parser.add_argument('--port', type=int, default=8081)
+    parser.add_argument('--first-token-delay', type=float, default=0.5)
+    parser.add_argument('--token-delay', type=float, default=0.02)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    args = parser.parse_args()
+    run_stub_server(args.port, args.first_token_delay, args.token_delay, args.error_rate)
@@ -1,9 +1,51 @@
-from pydantic import BaseModel, Field
-from typing import Optional, List
+from pydantic import BaseModel, ConfigDict, Field, field_serializer
+from typing import Literal, Optional, List
 from datetime import datetime
+from .timeseries import TimeSeries
+
+# yfinance bar intervals and history periods accepted by the API
+Interval = Literal['1m', '2m', '5m', '15m', '30m', '60m', '90m', '1h',
+                   '1d', '5d', '1wk', '1mo', '3mo']
+Period = Literal['1d', '5d', '1mo', '3mo', '6mo', '1y', '2y', '5y', '10y',
+                 'ytd', 'max']
+
+# Technical indicators computed during preprocessing
+Indicator = Literal['sma', 'ema', 'rsi', 'macd', 'bollinger', 'atr', 'volatility']
+# Opt-in: each one adds columns to the response and lines to the report prompt
+DEFAULT_INDICATORS: List[Indicator] = []
+
+# Series longer than this are aggregated before being returned as JSON
+RESPONSE_MAX_POINTS = 5000
 
 class StockAnalysisRequest(BaseModel):
     stock_symbol: str = Field(..., description="Stock symbol to analyze")
+    period: Period = Field('1mo', description="History period to analyze")
+    interval: Interval = Field('1d', description="Bar interval, from 1m to 3mo")
+    forecast_backend: Literal['native', 'statsmodels'] = Field(
+        'statsmodels', description="Forecast engine used for the ARIMA(5, 1, 0) model")
+    indicators: List[Indicator] = Field(
+        default_factory=lambda: list(DEFAULT_INDICATORS),
+        description="Technical indicators to compute, e.g. ['rsi', 'macd']; none by default")
+    stream: bool = Field(False, description="Stream results and report text as server-sent events")
+
+class BatchStockAnalysisRequest(BaseModel):
+    stock_symbols: List[str] = Field(..., min_length=1, max_length=500,
+                                     description="Stock symbols to analyze")
+    period: Period = Field('1mo', description="History period to analyze")
+    interval: Interval = Field('1d', description="Bar interval, from 1m to 3mo")
+    forecast_backend: Literal['native', 'statsmodels'] = Field(
+        'statsmodels', description="Forecast engine used for the ARIMA(5, 1, 0) model")
+
+class BacktestRequest(BaseModel):
+    stock_symbols: List[str] = Field(..., min_length=1, max_length=500,
+                                     description="Stock symbols to backtest")
+    period: Period = Field('5y', description="History period to replay")
+    interval: Interval = Field('1d', description="Bar interval, from 1m to 3mo")
+    forecast_backend: Literal['native', 'statsmodels'] = Field(
+        'statsmodels', description="Forecast engine used for the ARIMA(5, 1, 0) model")
+    window: int = Field(250, ge=12, le=5000, description="Bars each model is fitted on")
+    horizon: int = Field(7, ge=1, le=60, description="Bars forecast from each origin")
+    stride: int = Field(5, ge=1, description="Bars between consecutive forecast origins")
 
 class FeedbackRequest(BaseModel):
     stock_symbol: str
@@ -11,21 +53,36 @@ class FeedbackRequest(BaseModel):
     comments: Optional[str] = None
 
 class FinancialAnalysisState(BaseModel):
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
     stock_symbol: str
-    raw_data: Optional[dict] = None
-    preprocessed_data: Optional[dict] = None
-    predictions: Optional[dict] = None
+    period: str = '1mo'
+    interval: str = '1d'
+    indicators: List[str] = Field(default_factory=list)
+    raw_data: Optional[TimeSeries] = None
+    preprocessed_data: Optional[TimeSeries] = None
+    predictions: Optional[TimeSeries] = None
     analysis_report: Optional[str] = None
     visualization_path: Optional[str] = None
     news: Optional[List[str]] = None
     error: Optional[str] = None
 
+    @field_serializer('raw_data', 'preprocessed_data', 'predictions')
+    def _serialize_series(self, value: Optional[TimeSeries]) -> Optional[dict]:
+        # Time series only become JSON dictionaries at the API boundary
+        if value is None:
+            return None
+        return value.downsample(RESPONSE_MAX_POINTS).to_dict()
+
 class VoiceTranscriptionRequest(BaseModel):
     audio_file: str
 
 class FinancialChatRequest(BaseModel):
     message: str
     history: Optional[List[List[str]]] = None
+    session_id: Optional[str] = Field(
+        None, description="Conversation session returned by an earlier turn")
+    stream: bool = Field(False, description="Stream the response as server-sent events")
 
 class FeedbackModel(BaseModel):
     timestamp: datetime = Field(default_factory=datetime.now)
@@ -1,53 +1,134 @@
-import google.generativeai as genai
-from typing import Optional, List
+import os
+from typing import Iterator, Optional, List
+from .llm_client import LLMClient, gemini_backend
+from .conversation import ConversationSession, ConversationStore
 
 class ReportGeneratorService:
     """
     Service for generating financial reports using Generative AI
     """
-    def __init__(self, api_key: str):
+    def __init__(self,
+                 api_key: str,
+                 llm_client: Optional[LLMClient] = None,
+                 conversations: Optional[ConversationStore] = None):
         """
         Initialize the report generator with Gemini API
-        
-        :param api_key: Google Generative AI API key
+
+        :param api_key: Google Generative AI API key, used when no client is given
+        :param llm_client: Shared LLM client, defaults to a Gemini client for this service
+        :param conversations: Store of chat sessions, defaults to one summarizing with this model
         """
-        genai.configure(api_key=api_key)
-        self.model = genai.GenerativeModel('gemini-2.0-flash')
-    
-    def generate_chat_response(self, 
-                                message: str, 
-                                report_context: Optional[str] = None, 
-                                history: Optional[List[List[str]]] = None) -> str:
+        self.llm_client = llm_client or LLMClient(gemini_backend(api_key))
+        self.conversations = conversations or ConversationStore(
+            self._summarize,
+            token_budget=int(os.getenv('CHAT_TOKEN_BUDGET', '2000')))
+
+    def _generate(self, prompt: str) -> str:
+        return self.llm_client.generate(prompt)
+
+    def _summarize(self, summary: str, transcript: str) -> str:
         """
-        Generate a conversational response based on financial context
-        
-        :param message: User's message
-        :param report_context: Optional financial report context
-        :param history: Optional conversation history
-        :return: Generated response
+        Fold conversation turns into the running summary of a session
+
+        :param summary: Summary of the turns folded so far
+        :param transcript: Turns to add to the summary
+        :return: Updated summary
         """
-        try:
-            # Prepare context
-            context = f"""
-            You are a professional financial analyst assistant. 
-            
+        return self._generate(f"""
+            Update the running summary of a conversation between a user and a
+            financial analyst assistant. Keep the stocks, figures, user goals
+            and conclusions that later questions may refer to. Answer with the
+            summary only, in at most {self.conversations.summary_budget * 3 // 4} words.
+
+            Current summary:
+            {summary or 'None'}
+
+            New conversation turns:
+            {transcript}
+            """)
+
+    def _chat_prompt(self,
+                     message: str,
+                     report_context: Optional[str] = None,
+                     history_context: str = '') -> str:
+        return f"""
+            You are a professional financial analyst assistant.
+
             {'Current Financial Report Context:' + report_context if report_context else ''}
-            
+
+            {history_context}
+
             Conversation Guidelines:
             1. Provide clear, concise, and professional financial insights
             2. Base responses on available data and context
             3. Offer actionable advice when possible
             4. Maintain a professional and helpful tone
             5. If unsure about something, be transparent
-            
+
             User Question: {message}
-            
+
             Please provide a detailed, insightful response.
             """
-            
-            # Generate response
-            response = self.model.generate_content(context)
-            
-            return response.text
+
+    def _session(self,
+                 session: Optional[ConversationSession],
+                 history: Optional[List[List[str]]]) -> Optional[ConversationSession]:
+        # Client-side history without a session starts a session seeded with it
+        if session is None and history:
+            return self.conversations.get_or_create(history=history)
+        return session
+
+    def generate_chat_response(self,
+                                message: str,
+                                report_context: Optional[str] = None,
+                                history: Optional[List[List[str]]] = None,
+                                session: Optional[ConversationSession] = None) -> str:
+        """
+        Generate a conversational response based on financial context
+
+        :param message: User's message
+        :param report_context: Optional financial report context
+        :param history: Optional conversation history, used when no session is given
+        :param session: Conversation session whose history is included and extended
+        :return: Generated response
+        """
+        try:
+            # Prepare context
+            session = self._session(session, history)
+            history_context = self.conversations.history_context(session) if session else ''
+            context = self._chat_prompt(message, report_context, history_context)
+
+            # Generate response, reusing answers to identical prompts
+            response = self._generate(context)
+            if session:
+                self.conversations.record(session, message, response)
+            return response
         except Exception as e:
             return f"Error generating response: {str(e)}"
+
+    def stream_chat_response(self,
+                             message: str,
+                             report_context: Optional[str] = None,
+                             history: Optional[List[List[str]]] = None,
+                             session: Optional[ConversationSession] = None) -> Iterator[str]:
+        """
+        Stream a conversational response as the model produces it
+
+        The turn is added to the session once the stream completes.
+
+        :param message: User's message
+        :param report_context: Optional financial report context
+        :param history: Optional conversation history, used when no session is given
+        :param session: Conversation session whose history is included and extended
+        :return: Iterator of response text chunks
+        """
+        session = self._session(session, history)
+        history_context = self.conversations.history_context(session) if session else ''
+        context = self._chat_prompt(message, report_context, history_context)
+
+        chunks = []
+        for chunk in self.llm_client.stream(context):
+            chunks.append(chunk)
+            yield chunk
+        if session:
+            self.conversations.record(session, message, ''.join(chunks))
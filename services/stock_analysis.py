@@ -1,75 +1,220 @@
-import yfinance as yf
-import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-from statsmodels.tsa.arima.model import ARIMA
 import os
-import google.generativeai as genai
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import AsyncIterator, Callable, Iterator, List, Optional
 from .web_scraper import WebScraper
+from .price_store import PriceStore
+from .timeseries import TimeSeries
+from .forecast_cache import ForecastCache
+from .indicators import IndicatorEngine
+from .coalescing import SingleFlight
+from .chart_renderer import ChartRenderer, chart_series
+from .llm_client import LLMClient, gemini_backend
+from .forecasting import (
+    forecast_close_prices,
+    forecast_index,
+    native_forecast_many
+)
 from .models import FinancialAnalysisState
 
+DAILY_INTERVALS = ('1d', '5d', '1wk', '1mo', '3mo')
+
+# Most recent bars used to fit the forecast model
+MAX_MODEL_POINTS = 2000
+
+# Historical prices are aggregated down to this many points for charts
+MAX_CHART_POINTS = 1500
+
+# Stages of comprehensive_analysis, reported in order of completion to on_stage
+ANALYSIS_STAGES = ('market_data', 'predictions', 'report', 'visualization')
+
+
+def _forecast_worker(task: tuple) -> tuple:
+    """
+    Process pool entry point forecasting a single symbol
+
+    :param task: Tuple of (stock symbol, closing prices, forecast backend, interval)
+    :return: Tuple of (stock symbol, forecast DataFrame or None, error or None)
+    """
+    stock_symbol, close_prices, backend, interval = task
+    try:
+        forecast_df = forecast_close_prices(close_prices, backend=backend,
+                                            interval=interval)
+        return stock_symbol, forecast_df, None
+    except Exception as e:
+        return stock_symbol, None, str(e)
+
 
 class StockAnalysisService:
-    def __init__(self, gemini_api_key: str):
+    def __init__(self,
+                 gemini_api_key: str,
+                 price_store: Optional[PriceStore] = None,
+                 forecast_cache: Optional[ForecastCache] = None,
+                 indicator_engine: Optional[IndicatorEngine] = None,
+                 coalescer: Optional[SingleFlight] = None,
+                 llm_client: Optional[LLMClient] = None,
+                 chart_renderer: Optional[ChartRenderer] = None,
+                 web_scraper: Optional[WebScraper] = None):
         """
         Initialize the Stock Analysis Service
 
-        :param gemini_api_key: API key for Google Generative AI
+        :param gemini_api_key: API key for Google Generative AI, used when no client is given
+        :param price_store: Local price history store, defaults to a Yahoo-backed store
+        :param forecast_cache: Cache of fitted forecast models
+        :param indicator_engine: Technical indicator engine keeping per-series state
+        :param coalescer: Shares in-flight and recent analyses between identical requests
+        :param llm_client: Shared LLM client, defaults to a Gemini client for this service
+        :param chart_renderer: Renders forecast charts on a worker pool, reusing unchanged charts
+        :param web_scraper: News scraper with a pooled HTTP client
         """
-        # Configure Gemini API
-        genai.configure(api_key=gemini_api_key)
-        self.web_scraper = WebScraper()
-
-    def fetch_and_preprocess_data(self, stock_symbol: str) -> FinancialAnalysisState:
+        self.llm_client = llm_client or LLMClient(gemini_backend(gemini_api_key))
+        self.web_scraper = web_scraper or WebScraper()
+        self.price_store = price_store or PriceStore(
+            root_dir=os.getenv('PRICE_STORE_DIR', 'price_store'))
+        self.forecast_cache = forecast_cache or ForecastCache()
+        self.indicator_engine = indicator_engine or IndicatorEngine()
+        # Failed analyses are shared with concurrent callers but not reused
+        self.coalescer = coalescer or SingleFlight(
+            ttl=float(os.getenv('ANALYSIS_FRESHNESS_SECONDS', '30')),
+            cacheable=lambda result: not (result.get('error') if isinstance(result, dict)
+                                          else result.error))
+        self.chart_renderer = chart_renderer or ChartRenderer(
+            output_dir='visualizations',
+            max_workers=int(os.getenv('CHART_WORKERS', '0')) or None)
+        self._process_pool = None
+
+    @property
+    def process_pool(self) -> ProcessPoolExecutor:
         """
-        Fetch stock data and preprocess it
+        Lazily created process pool sized to the available cores
+        """
+        if self._process_pool is None:
+            # Forking a process that already runs I/O threads can deadlock
+            self._process_pool = ProcessPoolExecutor(
+                max_workers=os.cpu_count(),
+                mp_context=multiprocessing.get_context('forkserver'))
+        return self._process_pool
+
+    def close(self):
+        """
+        Release worker processes and connections held by the service
+        """
+        if self._process_pool is not None:
+            self._process_pool.shutdown(wait=True)
+            self._process_pool = None
+        self.chart_renderer.close()
+        self.web_scraper.close()
+
+    def fetch_market_data(self,
+                          stock_symbol: str,
+                          period: str = '1mo',
+                          interval: str = '1d',
+                          indicators: Optional[List[str]] = None) -> FinancialAnalysisState:
+        """
+        Fetch stock data and preprocess it, without scraping news
 
         :param stock_symbol: Stock symbol to analyze
+        :param period: History period, e.g. '1mo' or '5y'
+        :param interval: Bar interval, e.g. '1d' or '5m'
+        :param indicators: Technical indicators to compute, e.g. ['rsi', 'macd']
         :return: FinancialAnalysisState object
         """
         try:
-            # Fetch stock data from Yahoo Finance
-            stock_data = yf.download(stock_symbol, period='1mo', interval='1d')
+            # Load stock data, fetching only missing bars from Yahoo Finance
+            stock_data = self.price_store.get_history(
+                stock_symbol, period=period, interval=interval)
 
             # Preprocess data
-            preprocessed_data = self._preprocess_data(stock_data)
-
-            # Scrape news
-            news = self.web_scraper.scrape_financial_news(stock_symbol)
+            preprocessed_data = self._preprocess_data(
+                stock_data, indicators, key=(stock_symbol.upper(), interval, period))
 
             return FinancialAnalysisState(
                 stock_symbol=stock_symbol,
-                raw_data=stock_data.to_dict(),
-                preprocessed_data=preprocessed_data.to_dict(),
-                news=news
+                period=period,
+                interval=interval,
+                indicators=indicators or [],
+                raw_data=stock_data,
+                preprocessed_data=preprocessed_data
             )
         except Exception as e:
             return FinancialAnalysisState(
                 stock_symbol=stock_symbol,
+                period=period,
+                interval=interval,
                 error=str(e)
             )
 
-    def _preprocess_data(self, data: pd.DataFrame) -> pd.DataFrame:
+    def fetch_and_preprocess_data(self,
+                                  stock_symbol: str,
+                                  period: str = '1mo',
+                                  interval: str = '1d',
+                                  indicators: Optional[List[str]] = None) -> FinancialAnalysisState:
+        """
+        Fetch stock data and preprocess it
+
+        :param stock_symbol: Stock symbol to analyze
+        :param period: History period, e.g. '1mo' or '5y'
+        :param interval: Bar interval, e.g. '1d' or '5m'
+        :param indicators: Technical indicators to compute, e.g. ['rsi', 'macd']
+        :return: FinancialAnalysisState object
+        """
+        state = self.fetch_market_data(stock_symbol, period, interval, indicators)
+        if not state.error:
+            # Scrape news
+            state.news = self.web_scraper.scrape_financial_news(stock_symbol)
+        return state
+
+    def _preprocess_data(self,
+                         data: Optional[TimeSeries],
+                         indicators: Optional[List[str]] = None,
+                         key: Optional[tuple] = None) -> TimeSeries:
         """
         Preprocess stock market data
 
+        Technical indicators are computed once here so that the report,
+        charts and API consumers all read the same columns. With a key, the
+        indicator engine only processes bars appended since the last call.
+
         :param data: Raw stock market data
-        :return: Preprocessed DataFrame
+        :param indicators: Technical indicators to compute, e.g. ['rsi', 'macd']
+        :param key: Identity of the series for incremental indicator updates
+        :return: Preprocessed time series sharing the raw columns
         """
-        if data is None or data.empty:
-            return pd.DataFrame()
-
-        data = data.dropna()
-        data.index = pd.to_datetime(data.index)  # Ensure datetime index
-        data['Returns'] = data['Close'].pct_change()
-        data['Log_Returns'] = np.log(1 + data['Returns'])
+        if data is None or not data:
+            return TimeSeries.from_frame(None)
+
+        # Drop incomplete bars, copying only when there are any
+        complete = np.ones(len(data), dtype=bool)
+        for col in data.columns.values():
+            complete &= ~np.isnan(col)
+        if not complete.all():
+            data = data.take(complete)
+
+        close = data['Close']
+        returns = np.empty_like(close)
+        returns[0] = np.nan
+        np.divide(close[1:], close[:-1], out=returns[1:])
+        returns[1:] -= 1.0
+        data = data.with_columns(Returns=returns, Log_Returns=np.log1p(returns))
+
+        if indicators:
+            if key is None:
+                columns = self.indicator_engine.compute(data, indicators)
+            else:
+                columns = self.indicator_engine.apply(key, data, indicators)
+            data = data.with_columns(**columns)
         return data
 
-    def generate_predictions(self, state: FinancialAnalysisState) -> FinancialAnalysisState:
+    def generate_predictions(self,
+                             state: FinancialAnalysisState,
+                             backend: str = 'statsmodels') -> FinancialAnalysisState:
         """
         Generate stock price predictions using ARIMA
 
         :param state: Current financial analysis state
+        :param backend: Forecast backend, 'native' or 'statsmodels'
         :return: Updated financial analysis state with predictions
         """
         try:
@@ -77,31 +222,83 @@ class StockAnalysisService:
             if not state.preprocessed_data:
                 return state
 
-            # Convert preprocessed data back to DataFrame
-            data = pd.DataFrame.from_dict(state.preprocessed_data)
-
-            # Prepare data for ARIMA
-            close_prices = data['Close']
-
-            # Fit ARIMA model
-            model = ARIMA(close_prices, order=(5, 1, 0))
-            model_fit = model.fit()
-
-            # Generate forecast for next 7 days
-            forecast = model_fit.forecast(steps=7)
-            forecast_df = pd.DataFrame({
-                'Predicted_Close': forecast,
-                'Date': pd.date_range(start=close_prices.index[-1], periods=8)[1:]
-            }).set_index('Date')
+            # Fit (or reuse) the ARIMA model on recent bars and forecast the next 7
+            recent = state.preprocessed_data.tail(MAX_MODEL_POINTS)
+            forecast_df = self.forecast_cache.forecast(
+                state.stock_symbol, recent.series('Close'),
+                interval=state.interval, period=state.period, backend=backend)
 
             # Update state with predictions
-            state.predictions = forecast_df.to_dict()
+            state.predictions = TimeSeries.from_frame(forecast_df)
 
             return state
         except Exception as e:
             state.error = str(e)
             return state
 
+    def _report_prompt(self, state: FinancialAnalysisState) -> str:
+        """
+        Build the Gemini prompt for the analysis report
+
+        :param state: Financial analysis state with preprocessed data and predictions
+        :return: Prompt text
+        """
+        preprocessed_data = state.preprocessed_data
+        predictions = state.predictions
+
+        # Calculate key metrics
+        last_close_price = float(preprocessed_data['Close'][-1])
+        predicted_prices = predictions['Predicted_Close']
+
+        # Calculate price change percentage
+        price_change_pct = (
+            predicted_prices[-1] - last_close_price) / last_close_price * 100
+        volatility = float(np.nanstd(preprocessed_data['Returns'], ddof=1) * 100)
+
+        # Prepare predicted prices string
+        predicted_prices_str = "\n".join([
+            f"  {date}: {price:.2f}"
+            for date, price in zip(
+                np.datetime_as_string(
+                    predictions.index,
+                    unit='D' if state.interval in DAILY_INTERVALS else 'm'),
+                predicted_prices)
+        ])
+
+        # Latest value of each computed technical indicator
+        indicators_str = "\n".join([
+            f"  {column}: {preprocessed_data[column][-1]:.2f}"
+            for column in self.indicator_engine.columns(state.indicators)
+            if not np.isnan(preprocessed_data[column][-1])
+        ]) or "  None"
+
+        # Prepare context for Gemini
+        context = f"""
+        Comprehensive Stock Analysis Report
+
+        Stock Symbol: {state.stock_symbol}
+        Last Closing Price: {last_close_price:.2f}
+        
+        Predicted Price Trajectory:
+        {predicted_prices_str}
+        
+        Key Insights:
+        - Projected Price Change: {price_change_pct:.2f}%
+        - Historical Volatility: {volatility:.2f}%
+
+        Technical Indicators (latest bar):
+        {indicators_str}
+        
+        Detailed Market Analysis:
+        Provide a comprehensive analysis of the stock's potential movement, 
+        including fundamental and technical insights. Consider:
+        1. Current market trends
+        2. Potential growth factors
+        3. Risk assessment
+        4. Short-term and long-term investment outlook
+        """
+        return context
+
     def generate_report(self, state: FinancialAnalysisState) -> FinancialAnalysisState:
         """
         Generate comprehensive financial analysis report
@@ -115,60 +312,37 @@ class StockAnalysisService:
                 state.error = "Insufficient data for report generation"
                 return state
 
-            # Convert data back to DataFrame
-            preprocessed_data = pd.DataFrame.from_dict(state.preprocessed_data)
-            predictions = pd.DataFrame.from_dict(state.predictions)
-
-            # Calculate key metrics
-            last_close_price = float(preprocessed_data['Close'].iloc[-1])
-            predicted_prices = predictions['Predicted_Close']
-
-            # Calculate price change percentage
-            price_change_pct = (
-                predicted_prices.iloc[-1] - last_close_price) / last_close_price * 100
-            volatility = float(preprocessed_data['Returns'].std() * 100)
-
-            # Prepare predicted prices string
-            predicted_prices_str = "\n".join([
-                f"  {date.date()}: {price:.2f}"
-                for date, price in predicted_prices.items()
-            ])
-
-            # Prepare context for Gemini
-            context = f"""
-            Comprehensive Stock Analysis Report
-
-            Stock Symbol: {state.stock_symbol}
-            Last Closing Price: {last_close_price:.2f}
-            
-            Predicted Price Trajectory:
-            {predicted_prices_str}
-            
-            Key Insights:
-            - Projected Price Change: {price_change_pct:.2f}%
-            - Historical Volatility: {volatility:.2f}%
-            
-            Detailed Market Analysis:
-            Provide a comprehensive analysis of the stock's potential movement, 
-            including fundamental and technical insights. Consider:
-            1. Current market trends
-            2. Potential growth factors
-            3. Risk assessment
-            4. Short-term and long-term investment outlook
-            """
-
-            # Use Gemini for generating insights
-            model = genai.GenerativeModel('gemini-2.0-flash')
-            response = model.generate_content(context)
-
-            # Update state with analysis report
-            state.analysis_report = response.text
+            # Use Gemini for generating insights, reusing identical prompts
+            state.analysis_report = self.llm_client.generate(self._report_prompt(state))
 
             return state
         except Exception as e:
             state.error = str(e)
             return state
 
+    def stream_report(self, state: FinancialAnalysisState) -> Iterator[str]:
+        """
+        Stream the analysis report as the model produces it
+
+        The full text is stored on the state once the stream completes;
+        failures are recorded on the state and end the stream.
+
+        :param state: Current financial analysis state
+        :return: Iterator of report text chunks
+        """
+        if not state.predictions or not state.preprocessed_data:
+            state.error = "Insufficient data for report generation"
+            return
+
+        chunks = []
+        try:
+            for chunk in self.llm_client.stream(self._report_prompt(state)):
+                chunks.append(chunk)
+                yield chunk
+        except Exception as e:
+            state.error = str(e)
+        state.analysis_report = ''.join(chunks)
+
     def create_visualization(self, state: FinancialAnalysisState) -> FinancialAnalysisState:
         """
         Create stock price forecast visualization
@@ -182,32 +356,12 @@ class StockAnalysisService:
                 state.error = "Insufficient data for visualization"
                 return state
 
-            # Convert data back to DataFrame
-            preprocessed_data = pd.DataFrame.from_dict(state.preprocessed_data)
-            predictions = pd.DataFrame.from_dict(state.predictions)
-
-            # Create visualization directory if it doesn't exist
-            os.makedirs('visualizations', exist_ok=True)
-
-            plt.figure(figsize=(12, 6))
-
-            # Plot historical prices
-            plt.plot(preprocessed_data['Close'], label='Historical Prices')
-
-            # Plot predictions
-            plt.plot(predictions.index, predictions['Predicted_Close'],
-                     color='red', label='Predicted Prices')
+            # Long histories are aggregated; the chart cannot show more points
+            history = state.preprocessed_data.downsample(MAX_CHART_POINTS)
 
-            plt.title(f'{state.stock_symbol} Price Forecast')
-            plt.xlabel('Date')
-            plt.ylabel('Price')
-            plt.legend()
-            plt.xticks(rotation=45)
-
-            # Save visualization
-            visualization_path = f'visualizations/{state.stock_symbol}_forecast.png'
-            plt.savefig(visualization_path, bbox_inches='tight')
-            plt.close()
+            # Rendered off-thread and named by content, so unchanged charts are reused
+            visualization_path = self.chart_renderer.render_forecast(
+                state.stock_symbol, history, state.predictions)
 
             # Update state with visualization path
             state.visualization_path = visualization_path
@@ -217,26 +371,54 @@ class StockAnalysisService:
             state.error = str(e)
             return state
 
-    def comprehensive_analysis(self, stock_symbol: str, gemini_key: str) -> FinancialAnalysisState:
+    @staticmethod
+    def _analysis_key(stock_symbol: str,
+                      backend: str,
+                      period: str,
+                      interval: str,
+                      indicators: Optional[List[str]]) -> tuple:
+        return (stock_symbol.upper(), backend, period, interval, tuple(indicators or ()))
+
+    def comprehensive_analysis(self,
+                               stock_symbol: str,
+                               backend: str = 'statsmodels',
+                               period: str = '1mo',
+                               interval: str = '1d',
+                               indicators: Optional[List[str]] = None) -> FinancialAnalysisState:
         """
         Perform comprehensive stock analysis
 
+        Concurrent calls with the same parameters share one computation, and
+        its result is reused for a short freshness window.
+
         :param stock_symbol: Stock symbol to analyze
-        :param gemini_key: API key for Gemini
+        :param backend: Forecast backend, 'native' or 'statsmodels'
+        :param period: History period, e.g. '1mo' or '5y'
+        :param interval: Bar interval, e.g. '1d' or '5m'
+        :param indicators: Technical indicators to compute, e.g. ['rsi', 'macd']
         :return: Comprehensive financial analysis state
         """
-        # Set the Gemini API key
-        genai.configure(api_key=gemini_key)
-
+        return self.coalescer.run_sync(
+            self._analysis_key(stock_symbol, backend, period, interval, indicators),
+            lambda: self._comprehensive_analysis(
+                stock_symbol, backend, period, interval, indicators))
+
+    def _comprehensive_analysis(self,
+                                stock_symbol: str,
+                                backend: str,
+                                period: str,
+                                interval: str,
+                                indicators: Optional[List[str]]) -> FinancialAnalysisState:
         # Fetch and preprocess data
-        state = self.fetch_and_preprocess_data(stock_symbol)
+        state = self.fetch_and_preprocess_data(stock_symbol, period, interval,
+                                               indicators)
 
         # If there's an error in initial data fetching, return immediately
         if state.error:
             return state
 
         # Generate predictions
-        state = self.generate_predictions(state)
+        state = self.generate_predictions(state, backend=backend)
 
         # Generate report
         state = self.generate_report(state)
@@ -245,3 +427,259 @@ class StockAnalysisService:
         state = self.create_visualization(state)
 
         return state
+
+    async def comprehensive_analysis_async(self,
+                                           stock_symbol: str,
+                                           backend: str = 'statsmodels',
+                                           period: str = '1mo',
+                                           interval: str = '1d',
+                                           indicators: Optional[List[str]] = None,
+                                           on_stage: Optional[Callable[[str, FinancialAnalysisState], None]] = None
+                                           ) -> FinancialAnalysisState:
+        """
+        Perform comprehensive stock analysis without blocking the event loop
+
+        Blocking stages run on the default thread pool. The price fetch
+        overlaps the news scrape, and the Gemini report overlaps the chart
+        render. Concurrent requests with the same parameters share one
+        computation, and its result is reused for a short freshness window.
+        Calls that observe stage progress run their own computation.
+
+        :param stock_symbol: Stock symbol to analyze
+        :param backend: Forecast backend, 'native' or 'statsmodels'
+        :param period: History period, e.g. '1mo' or '5y'
+        :param interval: Bar interval, e.g. '1d' or '5m'
+        :param indicators: Technical indicators to compute, e.g. ['rsi', 'macd']
+        :param on_stage: Called with each stage name from ANALYSIS_STAGES and the state as the stage completes
+        :return: Comprehensive financial analysis state
+        """
+        if on_stage is not None:
+            return await self._comprehensive_analysis_async(
+                stock_symbol, backend, period, interval, indicators, on_stage)
+        return await self.coalescer.run(
+            self._analysis_key(stock_symbol, backend, period, interval, indicators),
+            lambda: self._comprehensive_analysis_async(
+                stock_symbol, backend, period, interval, indicators))
+
+    async def _comprehensive_analysis_async(self,
+                                            stock_symbol: str,
+                                            backend: str,
+                                            period: str,
+                                            interval: str,
+                                            indicators: Optional[List[str]],
+                                            on_stage=None) -> FinancialAnalysisState:
+        state = await self.market_analysis_async(
+            stock_symbol, backend, period, interval, indicators, on_stage)
+        if state.error:
+            return state
+
+        async def run_stage(stage: str, fn):
+            await asyncio.to_thread(fn, state)
+            if on_stage is not None:
+                on_stage(stage, state)
+
+        # Report and visualization only depend on the predictions
+        await asyncio.gather(
+            run_stage('report', self.generate_report),
+            run_stage('visualization', self.create_visualization)
+        )
+
+        return state
+
+    async def market_analysis_async(self,
+                                    stock_symbol: str,
+                                    backend: str = 'statsmodels',
+                                    period: str = '1mo',
+                                    interval: str = '1d',
+                                    indicators: Optional[List[str]] = None,
+                                    on_stage: Optional[Callable[[str, FinancialAnalysisState], None]] = None
+                                    ) -> FinancialAnalysisState:
+        """
+        Run the quantitative stages of the analysis: prices, news and predictions
+
+        Streaming clients receive this state before the report is written.
+
+        :param stock_symbol: Stock symbol to analyze
+        :param backend: Forecast backend, 'native' or 'statsmodels'
+        :param period: History period, e.g. '1mo' or '5y'
+        :param interval: Bar interval, e.g. '1d' or '5m'
+        :param indicators: Technical indicators to compute, e.g. ['rsi', 'macd']
+        :param on_stage: Called with 'market_data' and 'predictions' and the state as each completes
+        :return: Financial analysis state with predictions
+        """
+        # Fetch price data and news concurrently
+        state, news = await asyncio.gather(
+            asyncio.to_thread(self.fetch_market_data, stock_symbol, period, interval,
+                              indicators),
+            self.web_scraper.scrape_financial_news_async(stock_symbol)
+        )
+
+        # If there's an error in initial data fetching, return immediately
+        if state.error:
+            return state
+        state.news = news
+        if on_stage is not None:
+            on_stage('market_data', state)
+
+        # Even the native fit is up to MAX_MODEL_POINTS bars plus DataFrame
+        # work, so it runs beside the loop. Fits stay in-process so the
+        # forecast cache can reuse them.
+        state = await asyncio.to_thread(self.generate_predictions, state, backend)
+        if on_stage is not None and not state.error:
+            on_stage('predictions', state)
+
+        return state
+
+    async def stream_analysis(self,
+                              stock_symbol: str,
+                              backend: str = 'statsmodels',
+                              period: str = '1mo',
+                              interval: str = '1d',
+                              indicators: Optional[List[str]] = None) -> AsyncIterator[tuple]:
+        """
+        Perform comprehensive stock analysis, yielding results as they are ready
+
+        Yields ``('analysis', state)`` once predictions exist, then
+        ``('report', text)`` for each chunk of the Gemini report while the
+        chart renders, and finally ``('done', state)``. The quantitative
+        stage is shared between concurrent identical requests.
+
+        :param stock_symbol: Stock symbol to analyze
+        :param backend: Forecast backend, 'native' or 'statsmodels'
+        :param period: History period, e.g. '1mo' or '5y'
+        :param interval: Bar interval, e.g. '1d' or '5m'
+        :param indicators: Technical indicators to compute, e.g. ['rsi', 'macd']
+        :return: Async iterator of (event, payload) tuples
+        """
+        key = self._analysis_key(stock_symbol, backend, period, interval, indicators)
+        shared = await self.coalescer.run(
+            ('market',) + key,
+            lambda: self.market_analysis_async(
+                stock_symbol, backend, period, interval, indicators))
+        # Each stream fills in its own report and chart path
+        state = shared.model_copy()
+        yield 'analysis', state
+        if state.error:
+            yield 'done', state
+            return
+
+        chart = asyncio.ensure_future(asyncio.to_thread(self.create_visualization, state))
+        chunks = self.stream_report(state)
+        while True:
+            # The model client blocks, so pull each chunk on a worker thread
+            chunk = await asyncio.to_thread(next, chunks, None)
+            if chunk is None:
+                break
+            yield 'report', chunk
+        await chart
+        yield 'done', state
+
+    async def chart_series_async(self,
+                                 stock_symbol: str,
+                                 backend: str = 'statsmodels',
+                                 period: str = '1mo',
+                                 interval: str = '1d') -> dict:
+        """
+        Historical closes and forecast as compact arrays for client-side charts
+
+        Skips the news scrape and report, and is shared between concurrent
+        identical requests.
+
+        :param stock_symbol: Stock symbol to chart
+        :param backend: Forecast backend, 'native' or 'statsmodels'
+        :param period: History period, e.g. '1mo' or '5y'
+        :param interval: Bar interval, e.g. '1d' or '5m'
+        :return: Series dictionary from chart_series, or a dictionary with an error
+        """
+        def build() -> dict:
+            state = self.fetch_market_data(stock_symbol, period, interval, indicators=[])
+            if not state.error:
+                state = self.generate_predictions(state, backend=backend)
+            if state.error or not state.preprocessed_data or not state.predictions:
+                return {'stock_symbol': stock_symbol,
+                        'error': state.error or "Insufficient data for chart"}
+            return chart_series(state.stock_symbol,
+                                state.preprocessed_data.downsample(MAX_CHART_POINTS),
+                                state.predictions)
+
+        key = self._analysis_key(stock_symbol, backend, period, interval, None)
+        return await self.coalescer.run(('series',) + key, lambda: asyncio.to_thread(build))
+
+    def batch_analysis(self,
+                       stock_symbols: List[str],
+                       backend: str = 'statsmodels',
+                       period: str = '1mo',
+                       interval: str = '1d') -> List[FinancialAnalysisState]:
+        """
+        Forecast many symbols at once
+
+        Price history for all symbols is loaded with grouped downloads. The
+        native backend fits all equal-length series in one batched solve;
+        statsmodels fits are spread over the process pool. Failures are
+        reported on the individual symbol's state rather than failing the batch.
+
+        :param stock_symbols: Stock symbols to analyze
+        :param backend: Forecast backend, 'native' or 'statsmodels'
+        :param period: History period, e.g. '1mo' or '5y'
+        :param interval: Bar interval, e.g. '1d' or '5m'
+        :return: One financial analysis state per symbol, in request order
+        """
+        stock_symbols = list(dict.fromkeys(s.upper() for s in stock_symbols))
+        states = {
+            s: FinancialAnalysisState(stock_symbol=s, period=period, interval=interval)
+            for s in stock_symbols
+        }
+
+        try:
+            histories = self.price_store.get_many(
+                stock_symbols, period=period, interval=interval)
+        except Exception as e:
+            for state in states.values():
+                state.error = str(e)
+            return list(states.values())
+
+        tasks = []
+        for stock_symbol in stock_symbols:
+            data = self._preprocess_data(histories.get(stock_symbol))
+            if not data:
+                states[stock_symbol].error = "No price data available"
+                continue
+            close_prices = data.tail(MAX_MODEL_POINTS).series('Close')
+            tasks.append((stock_symbol, close_prices, backend, interval))
+
+        if backend == 'native':
+            self._batch_native_forecast(tasks, states)
+            return list(states.values())
+
+        workers = os.cpu_count() or 1
+        chunksize = max(1, len(tasks) // (workers * 4))
+        for stock_symbol, forecast_df, error in self.process_pool.map(
+                _forecast_worker, tasks, chunksize=chunksize):
+            if error:
+                states[stock_symbol].error = error
+            else:
+                states[stock_symbol].predictions = TimeSeries.from_frame(forecast_df)
+
+        return list(states.values())
+
+    def _batch_native_forecast(self, tasks: List[tuple], states: dict):
+        """
+        Forecast all batch tasks with the vectorized native backend
+        """
+        try:
+            forecasts = native_forecast_many(
+                [close.to_numpy() for _, close, _, _ in tasks])
+        except Exception:
+            # Fall back to per-symbol fits so one bad series cannot fail the batch
+            for task in tasks:
+                stock_symbol, forecast_df, error = _forecast_worker(task)
+                if error:
+                    states[stock_symbol].error = error
+                else:
+                    states[stock_symbol].predictions = TimeSeries.from_frame(forecast_df)
+            return
+
+        for (stock_symbol, close, _, interval), forecast in zip(tasks, forecasts):
+            states[stock_symbol].predictions = TimeSeries(
+                forecast_index(close.index[-1], len(forecast), interval).values,
+                {'Predicted_Close': forecast})
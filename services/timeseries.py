@@ -0,0 +1,166 @@
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+
+class TimeSeries:
+    """
+    Compact column store for time-indexed market data
+
+    Timestamps are a single ``datetime64[ns]`` array and every column is its
+    own contiguous float64 array. Derived series share the index and any
+    unchanged column arrays with their parent, so pipeline stages can pass
+    data along without copying or rebuilding DataFrames.
+    """
+    __slots__ = ('index', 'columns')
+
+    def __init__(self, index: np.ndarray, columns: Dict[str, np.ndarray]):
+        """
+        Initialize the time series
+
+        :param index: Timestamps as a datetime64[ns] array
+        :param columns: Mapping of column name to a float array aligned with index
+        """
+        self.index = np.asarray(index, dtype='datetime64[ns]')
+        self.columns = columns
+
+    @classmethod
+    def from_frame(cls, data: pd.DataFrame) -> 'TimeSeries':
+        """
+        Build a time series from a DataFrame with a datetime index
+
+        :param data: Source DataFrame
+        :return: TimeSeries holding the frame's numeric columns
+        """
+        if data is None or data.empty:
+            return cls(np.empty(0, dtype='datetime64[ns]'), {})
+        index = pd.DatetimeIndex(data.index).values
+        return cls(index, {
+            str(name): np.ascontiguousarray(data[name].to_numpy(dtype='float64'))
+            for name in data.columns
+        })
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.columns
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        return self.columns[name]
+
+    @property
+    def column_names(self) -> List[str]:
+        return list(self.columns)
+
+    @property
+    def nbytes(self) -> int:
+        return self.index.nbytes + sum(c.nbytes for c in self.columns.values())
+
+    def series(self, name: str) -> pd.Series:
+        """
+        Wrap a column as a pandas Series without copying it
+
+        :param name: Column name
+        :return: Series indexed by timestamp
+        """
+        return pd.Series(self.columns[name], index=pd.DatetimeIndex(self.index),
+                         name=name, copy=False)
+
+    def with_columns(self, **columns: np.ndarray) -> 'TimeSeries':
+        """
+        Return a new series with extra columns, sharing the existing arrays
+
+        :param columns: Arrays aligned with the index
+        :return: Extended TimeSeries
+        """
+        return TimeSeries(self.index, {**self.columns, **columns})
+
+    def select(self, names: Iterable[str]) -> 'TimeSeries':
+        """
+        Return a series restricted to some columns, sharing their arrays
+        """
+        return TimeSeries(self.index, {name: self.columns[name] for name in names})
+
+    def take(self, rows) -> 'TimeSeries':
+        """
+        Return the rows selected by a slice or boolean mask
+
+        Slices produce views; masks copy only the selected rows.
+        """
+        return TimeSeries(self.index[rows],
+                          {name: col[rows] for name, col in self.columns.items()})
+
+    def since(self, start: Optional[pd.Timestamp]) -> 'TimeSeries':
+        """
+        Return the rows at or after a timestamp as views
+
+        :param start: First timestamp to keep, or None to keep everything
+        :return: Sliced TimeSeries
+        """
+        if start is None:
+            return self
+        first = np.searchsorted(self.index, np.datetime64(start, 'ns'), side='left')
+        return self.take(slice(first, None))
+
+    def tail(self, n: int) -> 'TimeSeries':
+        """
+        Return the last ``n`` rows as views
+        """
+        return self.take(slice(max(len(self) - n, 0), None))
+
+    def downsample(self, max_points: int) -> 'TimeSeries':
+        """
+        Aggregate consecutive rows into at most ``max_points`` buckets
+
+        OHLC columns aggregate as bars (first open, highest high, lowest low,
+        last close), Volume is summed and every other column keeps the last
+        value of its bucket. Each bucket is stamped with its last timestamp.
+
+        :param max_points: Maximum number of rows to return
+        :return: Downsampled TimeSeries, or self when already small enough
+        """
+        if len(self) <= max_points:
+            return self
+
+        size = -(-len(self) // max_points)
+        starts = np.arange(0, len(self), size)
+        ends = np.minimum(starts + size, len(self)) - 1
+
+        columns = {}
+        for name, col in self.columns.items():
+            if name == 'Open':
+                columns[name] = col[starts]
+            elif name == 'High':
+                columns[name] = np.maximum.reduceat(col, starts)
+            elif name == 'Low':
+                columns[name] = np.minimum.reduceat(col, starts)
+            elif name == 'Volume':
+                columns[name] = np.add.reduceat(col, starts)
+            else:
+                columns[name] = col[ends]
+        return TimeSeries(self.index[ends], columns)
+
+    def to_frame(self) -> pd.DataFrame:
+        """
+        Convert to a DataFrame for code that needs pandas semantics
+
+        :return: DataFrame indexed by timestamp
+        """
+        return pd.DataFrame(self.columns, index=pd.DatetimeIndex(self.index))
+
+    def to_dict(self) -> dict:
+        """
+        Serialize to the ``{column: {timestamp: value}}`` layout of the JSON API
+
+        :return: JSON-compatible dictionary
+        """
+        timestamps = np.datetime_as_string(self.index, unit='s').tolist()
+        return {
+            name: {
+                ts: (None if np.isnan(value) else value)
+                for ts, value in zip(timestamps, col.tolist())
+            }
+            for name, col in self.columns.items()
+        }
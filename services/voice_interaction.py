@@ -2,67 +2,332 @@ import speech_recognition as sr
 from gtts import gTTS
 import tempfile
 import os
+import hashlib
+import json
+import re
+import threading
+import time
+import wave
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator, List, Optional
+from .artifact_store import ArtifactStore
+from .audio_segmentation import read_mono_pcm, segment_wav
+from .coalescing import SingleFlight
+
+
+# Bytes read from cached audio files per streamed chunk
+STREAM_CHUNK_BYTES = 64 * 1024
+
+_SENTENCE_END = re.compile(r'(?<=[.!?;:])\s+|\n+')
+
+
+def tts_key(text: str,
+            lang: str = 'en',
+            tld: str = 'com',
+            slow: bool = False,
+            engine: str = 'gtts') -> str:
+    """
+    Stable digest of everything that determines synthesized speech
+
+    Whitespace is collapsed first since it does not change the audio.
+
+    :param text: Text to speak
+    :param lang: Language code
+    :param tld: Google Translate domain, which selects the accent
+    :param slow: Slow speech
+    :param engine: Name of the TTS engine
+    :return: Hex digest identifying the audio
+    """
+    payload = json.dumps([' '.join(text.split()), lang, tld, slow, engine])
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def split_sentences(text: str, max_chars: int = 250, min_chars: int = 40) -> List[str]:
+    """
+    Split text into sentence-sized segments for incremental synthesis
+
+    Sentences shorter than ``min_chars`` are joined with the next one, and
+    sentences longer than ``max_chars`` are split at word boundaries.
+
+    :param text: Text to split
+    :param max_chars: Longest segment
+    :param min_chars: Shortest segment, except for the last
+    :return: Segments in reading order
+    """
+    pieces = []
+    for sentence in _SENTENCE_END.split(text):
+        sentence = ' '.join(sentence.split())
+        while len(sentence) > max_chars:
+            cut = sentence.rfind(' ', 0, max_chars)
+            cut = cut if cut > 0 else max_chars
+            pieces.append(sentence[:cut])
+            sentence = sentence[cut:].lstrip()
+        if sentence:
+            pieces.append(sentence)
+
+    segments = []
+    for piece in pieces:
+        if segments and len(segments[-1]) < min_chars \
+                and len(segments[-1]) + len(piece) < max_chars:
+            segments[-1] = f'{segments[-1]} {piece}'
+        else:
+            segments.append(piece)
+    return segments
+
+
+class GttsEngine:
+    """
+    Text-to-speech engine backed by Google Translate's speech API
+    """
+    name = 'gtts'
+
+    def synthesize(self, text: str, path: str, lang: str = 'en',
+                   tld: str = 'com', slow: bool = False):
+        gTTS(text=text, lang=lang, tld=tld, slow=slow).save(path)
+
+
+class FakeTTSEngine:
+    """
+    Offline stand-in text-to-speech engine for tests and benchmarks
+
+    Writes silent MPEG audio frames, about as long as the text would take
+    to read, after a delay like a network synthesis.
+    """
+    name = 'fake'
+
+    # MPEG-1 Layer III, 128 kbit/s, 44.1 kHz, mono: 417-byte frames of 1152 samples
+    FRAME = bytes([0xFF, 0xFB, 0x90, 0xC0]) + bytes(413)
+    FRAME_SECONDS = 1152 / 44100
+
+    def __init__(self, latency: float = 0.3, seconds_per_char: float = 0.002,
+                 chars_per_second: float = 15.0):
+        """
+        Initialize the fake engine
+
+        :param latency: Seconds before any synthesis completes
+        :param seconds_per_char: Additional synthesis seconds per character
+        :param chars_per_second: Speaking rate used for the audio length
+        """
+        self.latency = latency
+        self.seconds_per_char = seconds_per_char
+        self.chars_per_second = chars_per_second
+
+    def synthesize(self, text: str, path: str, lang: str = 'en',
+                   tld: str = 'com', slow: bool = False):
+        time.sleep(self.latency + self.seconds_per_char * len(text))
+        duration = len(text) / self.chars_per_second * (2 if slow else 1)
+        with open(path, 'wb') as f:
+            f.write(self.FRAME * max(1, round(duration / self.FRAME_SECONDS)))
+
+
+class GoogleSpeechRecognizer:
+    """
+    Speech recognizer backed by the Google Web Speech API
+    """
+    def __init__(self):
+        self.recognizer = sr.Recognizer()
+
+    def recognize(self, audio: sr.AudioData) -> str:
+        return self.recognizer.recognize_google(audio)
+
+
+class OfflineSpeechRecognizer:
+    """
+    Offline stand-in recognizer for tests and benchmarks
+
+    Returns a marker with the segment duration instead of words, after a
+    delay proportional to the audio length like a real engine.
+    """
+    def __init__(self, delay_per_second: float = 0.0):
+        """
+        Initialize the offline recognizer
+
+        :param delay_per_second: Seconds of processing per second of audio
+        """
+        self.delay_per_second = delay_per_second
+
+    def recognize(self, audio: sr.AudioData) -> str:
+        seconds = len(audio.frame_data) / (audio.sample_rate * audio.sample_width)
+        time.sleep(seconds * self.delay_per_second)
+        return f"<speech {seconds:.2f}s>"
+
 
 class VoiceInteractionService:
     """
     Voice interaction service for speech-to-text and text-to-speech
     """
-    def __init__(self):
+    def __init__(self,
+                 audio_store: Optional[ArtifactStore] = None,
+                 recognizer=None,
+                 max_workers: int = 4,
+                 tts_engine=None,
+                 tts_workers: int = 4):
         """
         Initialize voice interaction service
+
+        :param audio_store: Artifact store for generated audio, defaults to audio_outputs/
+        :param recognizer: Object with recognize(sr.AudioData) -> str, defaults to Google
+        :param max_workers: Audio segments recognized concurrently
+        :param tts_engine: Object with name and synthesize(text, path, lang, tld, slow), defaults to gTTS
+        :param tts_workers: Text segments synthesized concurrently
         """
-        self.recognizer = sr.Recognizer()
+        self.tts_engine = tts_engine or GttsEngine()
+        self._synthesis_pool = ThreadPoolExecutor(max_workers=tts_workers)
+        self.recognizer = recognizer or GoogleSpeechRecognizer()
+        self._recognition_pool = ThreadPoolExecutor(max_workers=max_workers)
+        self.audio_store = audio_store or ArtifactStore(
+            'audio_outputs',
+            max_bytes=int(os.getenv('AUDIO_OUTPUTS_MAX_BYTES', str(256 * 1024 ** 2))))
+        # Concurrent requests for the same audio share one synthesis
+        self._syntheses = SingleFlight(ttl=0)
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'syntheses': 0, 'streams': 0}
     
-    def text_to_speech(self, text: str) -> str:
+    def text_to_speech(self,
+                       text: str,
+                       lang: str = 'en',
+                       tld: str = 'com',
+                       slow: bool = False) -> str:
         """
         Convert text to speech audio file
         
+        Audio is cached on disk under a digest of the text and voice options,
+        so repeated text is read back instead of synthesized again.
+
         :param text: Text to convert to speech
+        :param lang: Language code
+        :param tld: Google Translate domain, which selects the accent
+        :param slow: Slow speech
         :return: Path to generated audio file
         """
         try:
-            # Ensure visualizations directory exists
-            os.makedirs('audio_outputs', exist_ok=True)
-            
-            # Generate unique filename
-            audio_path = os.path.join('audio_outputs', f'tts_output_{hash(text)}.mp3')
-            
-            # Create text-to-speech object
-            tts = gTTS(text=text, lang='en')
-            
-            # Save the audio file
-            tts.save(audio_path)
-            
-            return audio_path
+            return self._cached_speech(text, lang, tld, slow)
         except Exception as e:
             print(f"Error in text-to-speech conversion: {e}")
             return ""
+
+    def _cached_speech(self, text: str, lang: str, tld: str, slow: bool) -> str:
+        """
+        Return the path of the audio for text, synthesizing it only if it is not stored
+        """
+        # Name the file by its content so it is found again across restarts
+        key = tts_key(text, lang, tld, slow, self.tts_engine.name)
+        audio_name = f'tts_{key[:32]}.mp3'
+        audio_path = self.audio_store.get(audio_name)
+        if audio_path:
+            with self._lock:
+                self._stats['hits'] += 1
+            return audio_path
+
+        def synthesize() -> str:
+            # A synthesis may have finished since the lookup above
+            existing = self.audio_store.get(audio_name)
+            if existing:
+                return existing
+
+            # Save the audio file atomically under the disk quota
+            with self._lock:
+                self._stats['syntheses'] += 1
+            return self.audio_store.write(
+                audio_name,
+                lambda path: self.tts_engine.synthesize(text, path, lang, tld, slow))
+
+        return self._syntheses.run_sync(audio_name, synthesize)
+
+    def stream_speech(self,
+                      text: str,
+                      lang: str = 'en',
+                      tld: str = 'com',
+                      slow: bool = False) -> Iterator[bytes]:
+        """
+        Stream MP3 audio for text, starting as soon as the first sentence is ready
+
+        The text is split into sentences that are synthesized concurrently
+        and cached individually; their audio is yielded in reading order.
+        Pending syntheses are cancelled if the consumer stops early.
+
+        :param text: Text to convert to speech
+        :param lang: Language code
+        :param tld: Google Translate domain, which selects the accent
+        :param slow: Slow speech
+        :return: Iterator of MP3 byte chunks
+        """
+        with self._lock:
+            self._stats['streams'] += 1
+        segments = split_sentences(text)
+        futures = [self._synthesis_pool.submit(self._cached_speech, segment, lang, tld, slow)
+                   for segment in segments]
+        try:
+            for segment, future in zip(segments, futures):
+                try:
+                    audio = open(future.result(), 'rb')
+                except FileNotFoundError:
+                    # Evicted since it was synthesized
+                    audio = open(self._cached_speech(segment, lang, tld, slow), 'rb')
+                with audio:
+                    while chunk := audio.read(STREAM_CHUNK_BYTES):
+                        yield chunk
+        finally:
+            for future in futures:
+                future.cancel()
+
+    def tts_stats(self) -> dict:
+        """
+        Report text-to-speech cache reuse
+
+        :return: Dictionary of hit, synthesis and deduplication counters
+        """
+        with self._lock:
+            return dict(self._stats, deduplicated=self._syntheses.stats()['coalesced'])
     
+    def _recognize(self, audio: sr.AudioData) -> str:
+        try:
+            return self.recognizer.recognize(audio)
+        except sr.UnknownValueError:
+            # Unintelligible segments are left out of the transcript
+            return ''
+
+    def _recognize_segment(self, audio_file: str, sample_rate: int, sample_width: int,
+                           start: int, end: int) -> str:
+        audio = sr.AudioData(read_mono_pcm(audio_file, start, end), sample_rate, sample_width)
+        return self._recognize(audio)
+
     def speech_to_text(self, audio_file: str) -> str:
         """
         Convert speech audio file to text
         
+        PCM WAV files are split at pauses into segments that are recognized
+        concurrently and joined in order; only one segment per worker is held
+        in memory. Other formats, and WAV files in which no segment is
+        found, are recognized in one piece.
+
         :param audio_file: Path to audio file
         :return: Transcribed text
         """
         try:
-            with sr.AudioFile(audio_file) as source:
-                # Adjust for ambient noise
-                self.recognizer.adjust_for_ambient_noise(source)
-                
-                # Record the audio
-                audio_data = self.recognizer.record(source)
-                
-                # Recognize speech using Google Speech Recognition
-                text = self.recognizer.recognize_google(audio_data)
-                
-                return text
-        except sr.UnknownValueError:
-            print("Google Speech Recognition could not understand audio")
-            return "Sorry, I couldn't understand that."
+            try:
+                info, segments = segment_wav(audio_file)
+            except (wave.Error, EOFError, ValueError):
+                segments = None
+
+            if not segments:
+                with sr.AudioFile(audio_file) as source:
+                    texts = [self._recognize(sr.Recognizer().record(source))]
+            else:
+                texts = list(self._recognition_pool.map(
+                    lambda bounds: self._recognize_segment(
+                        audio_file, info.sample_rate, info.sample_width, *bounds),
+                    segments))
+
+            text = ' '.join(t for t in texts if t)
+            if not text:
+                print("Speech recognition could not understand audio")
+                return "Sorry, I couldn't understand that."
+            return text
         except sr.RequestError as e:
             print(f"Could not request results from Google Speech Recognition service; {e}")
             return "Sorry, there was an error processing the audio."
         except Exception as e:
             print(f"Unexpected error in speech recognition: {e}")
             return "Sorry, an unexpected error occurred."
+
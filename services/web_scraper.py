@@ -1,34 +1,114 @@
-import requests
-from bs4 import BeautifulSoup
-from typing import List
+import asyncio
+import os
+from typing import Dict, List, Optional
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+from .http_client import HttpClient
+
+
+NEWS_BASE_URL = 'https://finance.yahoo.com'
+
+# Headline elements on the quote page
+HEADLINE_CLASS = 'Mb(5px)'
+
+
+def parse_headlines(html: str, limit: int = 5) -> List[str]:
+    """
+    Extract news headlines from a quote page
+
+    Only h3 elements are built into the parse tree, which keeps parsing
+    large pages cheap.
+
+    :param html: Quote page HTML
+    :param limit: Most headlines returned
+    :return: Headline texts in page order
+    """
+    soup = BeautifulSoup(html, 'html.parser', parse_only=SoupStrainer('h3'))
+
+    # Extract relevant news (this is a basic implementation)
+    news_elements = soup.find_all('h3', class_=HEADLINE_CLASS, limit=limit)
+    return [elem.get_text() for elem in news_elements]
+
 
 class WebScraper:
     """
     Web scraping component for financial news
+
+    Pages are fetched through a shared HttpClient, so requests reuse
+    keep-alive connections, are bounded by timeouts and are retried with
+    backoff. The async methods scrape many symbols concurrently within the
+    client's per-host limit.
     """
+    def __init__(self,
+                 http_client: Optional[HttpClient] = None,
+                 base_url: Optional[str] = None,
+                 max_headlines: int = 5):
+        """
+        Initialize the web scraper
+
+        :param http_client: Shared HTTP client, defaults to one configured from the environment
+        :param base_url: Site serving /quote/<symbol> pages, defaults to NEWS_BASE_URL or Yahoo Finance
+        :param max_headlines: Most headlines returned per symbol
+        """
+        self.http_client = http_client or HttpClient.from_env()
+        self.base_url = (base_url or os.getenv('NEWS_BASE_URL', NEWS_BASE_URL)).rstrip('/')
+        self.max_headlines = max_headlines
+
+    def news_url(self, stock_symbol: str) -> str:
+        return f'{self.base_url}/quote/{stock_symbol}'
+
     def scrape_financial_news(self, stock_symbol: str) -> List[str]:
         """
         Scrape financial news related to the stock
-        
+
+        :param stock_symbol: Stock symbol to scrape news for
+        :return: List of news headlines
+        """
+        try:
+            response = self.http_client.get(self.news_url(stock_symbol))
+
+            # Raise an exception for bad status codes
+            response.raise_for_status()
+
+            return parse_headlines(response.text, self.max_headlines)
+        except Exception as e:
+            print(f"Error scraping news: {e}")
+            return []
+
+    async def scrape_financial_news_async(self, stock_symbol: str) -> List[str]:
+        """
+        Scrape financial news related to the stock without blocking the event loop
+
         :param stock_symbol: Stock symbol to scrape news for
         :return: List of news headlines
         """
-        url = f'https://finance.yahoo.com/quote/{stock_symbol}'
         try:
-            response = requests.get(url, headers={
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-            })
-            
+            response = await self.http_client.aget(self.news_url(stock_symbol))
+
             # Raise an exception for bad status codes
             response.raise_for_status()
-            
-            soup = BeautifulSoup(response.text, 'html.parser')
-            
-            # Extract relevant news (this is a basic implementation)
-            news_elements = soup.find_all('h3', class_='Mb(5px)')
-            news = [elem.get_text() for elem in news_elements[:5]]
-            
-            return news
+
+            # Parsing is CPU-bound, so it runs beside the loop
+            return await asyncio.to_thread(parse_headlines, response.text, self.max_headlines)
         except Exception as e:
             print(f"Error scraping news: {e}")
             return []
+
+    async def scrape_many(self, stock_symbols: List[str]) -> Dict[str, List[str]]:
+        """
+        Scrape news for several symbols concurrently
+
+        :param stock_symbols: Stock symbols to scrape news for
+        :return: Headlines per symbol; symbols that failed map to an empty list
+        """
+        stock_symbols = list(dict.fromkeys(stock_symbols))
+        results = await asyncio.gather(
+            *(self.scrape_financial_news_async(s) for s in stock_symbols))
+        return dict(zip(stock_symbols, results))
+
+    def close(self):
+        self.http_client.close()
+
+    async def aclose(self):
+        await self.http_client.aclose()
@@ -58,20 +58,18 @@ document.getElementById("submit-btn").addEventListener("click", async () => {
       analysisReportSection.style.display = "block";
     }
 
-    // Fetch visualization image if available
+    // Draw the chart from its data; fall back to the rendered image
     if (data.visualization_path) {
-      const imagePath = data.visualization_path.split("/").pop();
-      const imageResponse = await fetch(
-        `/visualizations/${encodeURIComponent(imagePath)}`
-      );
-
-      if (!imageResponse.ok)
-        throw new Error("Failed to fetch visualization image");
-
-      const imageBlob = await imageResponse.blob();
-      const imageUrl = URL.createObjectURL(imageBlob);
-
-      visualizationImg.src = imageUrl;
+      try {
+        await drawForecastChart(stockSymbol);
+        visualizationImg.style.display = "none";
+      } catch (chartError) {
+        console.error("Error drawing chart:", chartError);
+        // Image names are content-hashed, so the browser can cache them
+        const imagePath = data.visualization_path.split("/").pop();
+        visualizationImg.src = `/visualizations/${encodeURIComponent(imagePath)}`;
+        visualizationImg.style.display = "block";
+      }
       visualizationSection.style.display = "block";
     }
   } catch (error) {
@@ -90,6 +88,59 @@ document.getElementById("submit-btn").addEventListener("click", async () => {
   }
 });
 
+let forecastChart = null;
+
+// Fetch the compact chart series and draw it with Chart.js
+// The endpoint sends an ETag, so unchanged data is revalidated with a 304
+async function drawForecastChart(stockSymbol) {
+  const response = await fetch(
+    `/chart-data/${encodeURIComponent(stockSymbol)}`
+  );
+  if (!response.ok) throw new Error("Failed to fetch chart data");
+  const series = await response.json();
+
+  const points = ({ t, close }) => t.map((x, i) => ({ x, y: close[i] }));
+  const canvas = document.getElementById("forecast-chart");
+  if (forecastChart) forecastChart.destroy();
+  forecastChart = new Chart(canvas.getContext("2d"), {
+    type: "line",
+    data: {
+      datasets: [
+        {
+          label: "Historical Prices",
+          data: points(series.history),
+          borderColor: "rgba(54, 162, 235, 1)",
+          borderWidth: 1.5,
+          pointRadius: 0,
+        },
+        {
+          label: "Predicted Prices",
+          data: points(series.forecast),
+          borderColor: "rgba(255, 0, 0, 1)",
+          borderWidth: 1.5,
+          pointRadius: 0,
+        },
+      ],
+    },
+    options: {
+      animation: false,
+      parsing: false,
+      normalized: true,
+      plugins: { title: { display: true, text: `${series.stock_symbol} Price Forecast` } },
+      scales: {
+        x: {
+          type: "linear",
+          title: { display: true, text: "Date" },
+          ticks: {
+            callback: (value) => new Date(value * 1000).toLocaleDateString(),
+          },
+        },
+        y: { title: { display: true, text: "Price" } },
+      },
+    },
+  });
+}
+
 // Enable/disable submit button based on input
 function validateInput() {
   const stockSelect = document.getElementById("stock-select");
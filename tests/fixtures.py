@@ -0,0 +1,73 @@
+import wave
+
+import numpy as np
+
+from services.timeseries import TimeSeries
+
+
+def synthetic_prices(n_series: int, n_obs: int, seed: int = 0) -> np.ndarray:
+    """
+    Simulate integrated AR(5) price paths
+
+    :param n_series: Number of series
+    :param n_obs: Prices per series
+    :param seed: Random seed, so every run sees the same paths
+    :return: Array of shape (n_series, n_obs)
+    """
+    rng = np.random.default_rng(seed)
+    phi = np.array([0.3, -0.2, 0.1, 0.05, -0.05])
+    shocks = rng.normal(0, 1, (n_series, n_obs + 50))
+    diffs = np.zeros_like(shocks)
+    for t in range(5, shocks.shape[1]):
+        diffs[:, t] = diffs[:, t - 5:t][:, ::-1] @ phi + shocks[:, t]
+    return 100 + np.cumsum(diffs[:, 50:], axis=1)
+
+
+def synthetic_bars(n_bars: int, seed: int = 0) -> TimeSeries:
+    """
+    Random-walk OHLCV bars on a one-minute grid
+
+    :param n_bars: Number of bars
+    :param seed: Random seed
+    :return: TimeSeries with Open, High, Low, Close and Volume columns
+    """
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n_bars)))
+    spread = np.abs(rng.normal(0, 0.5, n_bars))
+    index = np.arange(n_bars, dtype='int64').astype('datetime64[m]').astype('datetime64[ns]')
+    return TimeSeries(index, {
+        'Open': close, 'High': close + spread, 'Low': close - spread,
+        'Close': close, 'Volume': rng.integers(1_000, 10_000, n_bars).astype(float),
+    })
+
+
+def tone(seconds: float, sample_rate: int = 16000, amplitude: float = 8000.0,
+         modulation: float = 0.4) -> np.ndarray:
+    """
+    Amplitude-modulated 220 Hz tone standing in for speech; no modulation gives a steady voice
+    """
+    t = np.arange(int(seconds * sample_rate)) / sample_rate
+    envelope = 1.0 - modulation + modulation * np.sin(2 * np.pi * 3 * t)
+    return amplitude * np.sin(2 * np.pi * 220 * t) * envelope
+
+
+def pause(seconds: float, sample_rate: int = 16000, noise: float = 30.0, seed: int = 0) -> np.ndarray:
+    """
+    Low background noise standing in for a pause in speech
+    """
+    return np.random.default_rng(seed).normal(0, noise, int(seconds * sample_rate))
+
+
+def write_wav(path: str, samples: np.ndarray, sample_rate: int = 16000):
+    """
+    Write mono 16-bit PCM
+
+    :param path: Output file path
+    :param samples: Samples in 16-bit integer scale
+    :param sample_rate: Samples per second
+    """
+    with wave.open(path, 'wb') as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(np.asarray(samples).astype('<i2').tobytes())
@@ -0,0 +1,102 @@
+import argparse
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from services.web_scraper import HEADLINE_CLASS
+
+
+def make_fixture_server(port: int = 8082,
+                        latency: float = 0.2,
+                        error_rate: float = 0.0,
+                        headlines: int = 8) -> ThreadingHTTPServer:
+    """
+    Local stand-in for the quote pages with fixture headlines
+
+    GET /quote/<symbol> returns a page with ``headlines`` headline
+    elements after ``latency`` seconds. Connections are kept alive, and
+    ``server.connections`` counts the connections accepted.
+
+    :param port: Port to listen on, 0 for any free port
+    :param latency: Seconds before each response
+    :param error_rate: Fraction of requests answered with HTTP 503
+    :param headlines: Headlines per page
+    :return: Server, not yet serving
+    """
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+        # Headers and body are separate writes; Nagle would delay kept-alive responses
+        disable_nagle_algorithm = True
+
+        def setup(self):
+            super().setup()
+            with server.lock:
+                server.connections += 1
+
+        def do_GET(self):
+            time.sleep(latency)
+            parts = self.path.strip('/').split('/')
+            if len(parts) != 2 or parts[0] != 'quote':
+                self._send(404, b'')
+                return
+            if random.random() < error_rate:
+                self._send(503, b'')
+                return
+            symbol = parts[1]
+            items = ''.join(f'<li><h3 class="{HEADLINE_CLASS}">{symbol} headline {i}</h3>'
+                            f'<p>{"Story text. " * 40}</p></li>' for i in range(headlines))
+            page = (f'<html><head><title>{symbol}</title></head><body>'
+                    f'<h3 class="other">Markets</h3><ul>{items}</ul></body></html>')
+            self._send(200, page.encode('utf-8'), 'text/html; charset=utf-8')
+
+        def _send(self, status: int, body: bytes, content_type: str = 'text/plain'):
+            self.send_response(status)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', port), Handler)
+    server.daemon_threads = True
+    server.lock = threading.Lock()
+    server.connections = 0
+    return server
+
+
+def run_fixture_server(port: int = 8082,
+                       latency: float = 0.2,
+                       error_rate: float = 0.0):
+    """
+    Serve fixture quote pages; point NEWS_BASE_URL at it to scrape offline
+
+    :param port: Port to listen on
+    :param latency: Seconds before each response
+    :param error_rate: Fraction of requests answered with HTTP 503
+    """
+    server = make_fixture_server(port, latency, error_rate)
+    print(f"News fixture server listening on http://127.0.0.1:{port}")
+    server.serve_forever()
+
+
+def serve_in_background(server: ThreadingHTTPServer) -> str:
+    """
+    Serve on a daemon thread
+
+    :param server: Server from make_fixture_server
+    :return: Base URL of the server
+    """
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f'http://127.0.0.1:{server.server_address[1]}'
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="News fixture server for offline scraping")
+    parser.add_argument('--port', type=int, default=8082)
+    parser.add_argument('--latency', type=float, default=0.2)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    args = parser.parse_args()
+    run_fixture_server(args.port, args.latency, args.error_rate)
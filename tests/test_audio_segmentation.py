@@ -0,0 +1,81 @@
+import re
+
+import numpy as np
+import pytest
+
+from services.artifact_store import ArtifactStore
+from services.audio_segmentation import frame_levels, segment_wav, split_on_silence
+from services.voice_interaction import OfflineSpeechRecognizer, VoiceInteractionService
+
+from .fixtures import pause, tone, write_wav
+
+
+@pytest.fixture
+def voice(tmp_path):
+    service = VoiceInteractionService(audio_store=ArtifactStore(str(tmp_path / 'audio')),
+                                      recognizer=OfflineSpeechRecognizer())
+    yield service
+
+
+def test_continuous_speech_is_one_segment(tmp_path):
+    path = str(tmp_path / 'speech.wav')
+    write_wav(path, tone(3.0, modulation=0.0))
+
+    info, segments = segment_wav(path)
+    assert segments == [(0, info.n_samples)]
+
+
+def test_quiet_continuous_speech_is_kept():
+    # A steady level well above the absolute floor is speech, however flat
+    assert split_on_silence(np.full(100, -35.0)) == [(0, 100)]
+
+
+def test_pauses_split_segments(tmp_path):
+    path = str(tmp_path / 'speech.wav')
+    write_wav(path, np.concatenate([tone(3.0), pause(1.0), tone(4.0), pause(1.0), tone(3.0)]))
+
+    info, segments = segment_wav(path)
+    assert len(segments) == 3
+    assert segments[0][0] == 0 and segments[-1][1] == info.n_samples
+    assert all(end == start for (_, end), (start, _) in zip(segments, segments[1:]))
+
+
+def test_silent_recording_has_no_segments(tmp_path):
+    path = str(tmp_path / 'silence.wav')
+    write_wav(path, pause(3.0))
+
+    assert segment_wav(path)[1] == []
+    assert frame_levels(path).max() < -45
+
+
+def test_long_speech_is_cut_at_the_maximum_length():
+    levels = np.full(2000, -20.0)
+    segments = split_on_silence(levels, max_segment_ms=30000)
+
+    assert max(end - start for start, end in segments) <= 1000
+    assert segments[0][0] == 0 and segments[-1][1] == 2000
+
+
+def test_continuous_speech_is_transcribed(voice, tmp_path):
+    path = str(tmp_path / 'speech.wav')
+    write_wav(path, tone(3.0, modulation=0.0))
+
+    assert voice.speech_to_text(path) == "<speech 3.00s>"
+
+
+def test_recording_without_segments_is_recognized_whole(voice, tmp_path):
+    path = str(tmp_path / 'silence.wav')
+    write_wav(path, pause(3.0))
+
+    assert voice.speech_to_text(path) == "<speech 3.00s>"
+
+
+def test_segments_are_transcribed_in_order(voice, tmp_path):
+    path = str(tmp_path / 'speech.wav')
+    write_wav(path, np.concatenate([tone(3.0), pause(1.0), tone(5.0), pause(1.0), tone(2.5)]))
+
+    durations = [float(seconds)
+                 for seconds in re.findall(r'<speech ([\d.]+)s>', voice.speech_to_text(path))]
+    assert len(durations) == 3
+    assert durations[0] < durations[1] > durations[2]
+    assert sum(durations) == pytest.approx(12.5, abs=0.05)
@@ -0,0 +1,70 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+from services.chart_renderer import ChartRenderer, chart_series
+from services.timeseries import TimeSeries
+
+
+def make_chart(seed: int = 0, n_points: int = 200):
+    rng = np.random.default_rng(seed)
+    index = np.arange(n_points).astype('datetime64[D]').astype('datetime64[ns]')
+    close = 100 + np.cumsum(rng.normal(0, 1, n_points))
+    future_index = index[-1] + np.arange(1, 8).astype('timedelta64[D]')
+    return (TimeSeries(index, {'Close': close}),
+            TimeSeries(future_index, {'Predicted_Close': close[-1] + np.arange(7.0)}))
+
+
+@pytest.fixture
+def renderer(tmp_path):
+    # Render in threads; the process pool only changes where the same function runs
+    with ThreadPoolExecutor(4) as executor:
+        yield ChartRenderer(str(tmp_path), executor=executor)
+
+
+def test_unchanged_chart_is_served_from_disk(renderer):
+    history, predictions = make_chart()
+    path = renderer.render_forecast('SYM', history, predictions)
+
+    assert os.path.getsize(path) > 0
+    assert renderer.render_forecast('SYM', history, predictions) == path
+    stats = renderer.stats()
+    assert stats['renders'] == 1 and stats['hits'] == 1
+
+
+def test_changed_data_or_options_render_a_new_chart(renderer):
+    history, predictions = make_chart()
+    path = renderer.render_forecast('SYM', history, predictions)
+
+    assert renderer.render_forecast('SYM', *make_chart(seed=1)) != path
+    assert renderer.render_forecast('SYM', history, predictions, dpi=50) != path
+    assert renderer.stats()['renders'] == 3
+
+
+def test_concurrent_requests_share_one_render(renderer):
+    history, predictions = make_chart()
+    barrier = threading.Barrier(8)
+
+    def request(_):
+        barrier.wait()
+        return renderer.render_forecast('SYM', history, predictions)
+
+    with ThreadPoolExecutor(8) as pool:
+        paths = set(pool.map(request, range(8)))
+
+    stats = renderer.stats()
+    assert len(paths) == 1
+    assert stats['renders'] == 1
+    assert stats['hits'] + stats['deduplicated'] == 7
+
+
+def test_chart_series_version_follows_content():
+    history, predictions = make_chart()
+    series = chart_series('SYM', history, predictions)
+
+    assert len(series['history']['t']) == len(series['history']['close']) == len(history)
+    assert series['version'] == chart_series('SYM', history, predictions)['version']
+    assert series['version'] != chart_series('SYM', *make_chart(seed=1))['version']
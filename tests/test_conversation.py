@@ -0,0 +1,72 @@
+from services.conversation import ConversationStore, estimate_tokens, truncate_tokens
+
+
+def keep_tail(previous: str, transcript: str) -> str:
+    return (previous + ' ' + transcript)[-2000:]
+
+
+def talk(store, session, n_turns):
+    sizes = []
+    for turn in range(n_turns):
+        sizes.append(estimate_tokens(store.history_context(session)))
+        store.record(session, f"Question {turn} about the outlook for AAPL " * 3,
+                     f"Answer {turn}: the outlook is balanced. " * 20)
+    return sizes
+
+
+def test_truncate_tokens_respects_limit():
+    text = "word " * 1000
+    assert estimate_tokens(truncate_tokens(text, 50)) <= 50
+    assert truncate_tokens("short", 50) == "short"
+
+
+def test_history_stays_within_budget():
+    store = ConversationStore(keep_tail, token_budget=2000)
+    sizes = talk(store, store.get_or_create(), 500)
+
+    assert max(sizes) <= 2000
+    assert store.stats()['history_tokens_max'] <= 2000
+
+
+def test_each_turn_is_summarized_once():
+    transcripts = []
+
+    def summarize(previous, transcript):
+        transcripts.append(transcript)
+        return keep_tail(previous, transcript)
+
+    store = ConversationStore(summarize, token_budget=2000)
+    talk(store, store.get_or_create(), 200)
+
+    folded = [line for t in transcripts for line in t.splitlines() if line.startswith('User:')]
+    assert len(folded) == len(set(folded)) == store.stats()['summarized_turns']
+    # Folds leave room for several turns, so the summarizer is not called every turn
+    assert len(transcripts) < 200 // 3
+
+
+def test_recent_turns_are_verbatim_and_summary_comes_first():
+    store = ConversationStore(lambda previous, transcript: "SUMMARY", token_budget=2000)
+    session = store.get_or_create()
+    talk(store, session, 50)
+    context = store.history_context(session)
+
+    assert context.startswith("Summary of the earlier conversation:\nSUMMARY")
+    assert "Answer 49: the outlook is balanced." in context
+
+
+def test_failed_summary_drops_turns_instead_of_overflowing():
+    def summarize(previous, transcript):
+        raise RuntimeError("model unavailable")
+
+    store = ConversationStore(summarize, token_budget=2000)
+    sizes = talk(store, store.get_or_create(), 100)
+
+    assert max(sizes) <= 2000
+
+
+def test_session_is_seeded_from_client_history():
+    store = ConversationStore(keep_tail)
+    session = store.get_or_create(history=[["Hi", "Hello"], ["incomplete"]])
+
+    assert store.get_or_create(session.session_id) is session
+    assert session.turns[0][:2] == ("Hi", "Hello") and len(session.turns) == 1
@@ -0,0 +1,227 @@
+import io
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import pytest
+
+from services.feedback import FeedbackService
+from services.models import FeedbackModel
+
+
+@pytest.fixture
+def service(tmp_path):
+    service = FeedbackService(str(tmp_path / 'none.csv'), str(tmp_path / 'feedback.sqlite'))
+    yield service
+    service.close()
+
+
+def feedback(i: int) -> FeedbackModel:
+    return FeedbackModel(timestamp=datetime(2024, 1, 1 + i % 28, i % 24),
+                         stock_symbol=f'SYM{i % 3}', rating=i % 5 + 1, comments=f'comment {i}')
+
+
+def ndjson(*records: dict) -> io.BytesIO:
+    return io.BytesIO('\n'.join(json.dumps(record) for record in records).encode('utf-8'))
+
+
+def test_concurrent_writes_share_commits(service):
+    items = [feedback(i) for i in range(500)]
+    with ThreadPoolExecutor(32) as pool:
+        saved = list(pool.map(service.save_feedback, items))
+
+    stats = service.stats()
+    assert all(saved)
+    assert stats['written'] == 500
+    assert stats['batches'] < 500
+    assert service.get_feedback_summary()['total_feedback_count'] == 500
+
+
+def test_invalid_rating_is_not_saved(service):
+    item = FeedbackModel(stock_symbol='AAPL', rating=7)
+
+    assert service.save_feedback(item) is False
+    assert service.get_feedback_summary()['total_feedback_count'] == 0
+
+
+def test_summary_and_trends_follow_writes(service):
+    for i, rating in enumerate([5, 4, 1]):
+        service.save_feedback(FeedbackModel(timestamp=datetime(2024, 3, 1 + i, 9),
+                                            stock_symbol='AAPL', rating=rating))
+    service.save_feedback(FeedbackModel(timestamp=datetime(2024, 3, 1, 10),
+                                        stock_symbol='MSFT', rating=3))
+
+    assert service.get_feedback_summary() == {
+        'total_feedback_count': 4,
+        'average_rating': 13 / 4,
+        'rating_distribution': {1: 1, 3: 1, 4: 1, 5: 1},
+    }
+    assert service.get_feedback_summary('AAPL')['average_rating'] == 10 / 3
+    assert service.get_feedback_summary('TSLA')['total_feedback_count'] == 0
+    trends = service.get_feedback_trends('AAPL', start=datetime(2024, 3, 2))
+    assert [(t['bucket'], t['total_feedback_count']) for t in trends] == \
+        [('2024-03-02', 1), ('2024-03-03', 1)]
+
+
+def test_aggregates_are_rebuilt_on_restart(tmp_path):
+    paths = (str(tmp_path / 'none.csv'), str(tmp_path / 'feedback.sqlite'))
+    service = FeedbackService(*paths)
+    for i in range(20):
+        service.save_feedback(feedback(i))
+    summary = service.get_feedback_summary()
+    service.close()
+
+    reopened = FeedbackService(*paths)
+    try:
+        assert reopened.get_feedback_summary() == summary
+    finally:
+        reopened.close()
+
+
+def test_ingest_rejects_invalid_rows_and_keeps_the_rest(service):
+    data = io.BytesIO(
+        b"timestamp,stock_symbol,rating,comments\n"
+        b"2024-01-01T09:00:00,AAPL,5,great\n"
+        b"not a date,AAPL,4,\n"
+        b"2024-01-01T10:00:00, ,4,\n"
+        b"2024-01-01T11:00:00,MSFT,6,\n"
+        b"2024-01-01T12:00:00Z,MSFT,2,  \n")
+
+    result = service.ingest(data, 'csv', chunk_rows=2)
+
+    assert (result['received'], result['imported'], result['rejected']) == (5, 2, 3)
+    assert [e['row'] for e in result['errors']] == [2, 3, 4]
+    assert result['errors'][0]['error'] == 'invalid timestamp'
+    rows = service.query_feedback()['items']
+    assert {row['stock_symbol'] for row in rows} == {'AAPL', 'MSFT'}
+    assert [row['comments'] for row in rows if row['stock_symbol'] == 'MSFT'] == [None]
+    assert service.get_feedback_summary()['total_feedback_count'] == 2
+
+
+def test_ingest_rejects_non_text_json_values(service):
+    data = ndjson(
+        {'timestamp': '2024-01-01T09:00:00', 'stock_symbol': 'AAPL', 'rating': 5},
+        {'timestamp': '2024-01-01T09:00:00', 'stock_symbol': 42, 'rating': 5},
+        {'timestamp': '2024-01-01T09:00:00', 'stock_symbol': 'AAPL', 'rating': True},
+        {'timestamp': '2024-01-01T09:00:00', 'stock_symbol': 'AAPL', 'rating': 3,
+         'comments': {'text': 'nested'}})
+
+    result = service.ingest(data, 'ndjson')
+
+    assert (result['imported'], result['rejected']) == (1, 3)
+    assert [e['error'] for e in result['errors']] == [
+        'missing stock_symbol',
+        'rating must be a whole number from 1 to 5',
+        'comments must be text',
+    ]
+
+
+def test_ingest_requires_columns(service):
+    with pytest.raises(ValueError, match='rating'):
+        service.ingest(io.BytesIO(b"timestamp,stock_symbol\n2024-01-01,AAPL\n"), 'csv')
+    with pytest.raises(ValueError, match='Unsupported format'):
+        service.ingest(io.BytesIO(b""), 'xml')
+
+
+def test_pages_cover_every_row_once_newest_first(service):
+    for i in range(95):
+        service.submit(feedback(i))
+    service.save_feedback(feedback(95))
+
+    seen = []
+    cursor = None
+    while True:
+        page = service.query_feedback('SYM1', limit=10, cursor=cursor)
+        seen.extend(page['items'])
+        cursor = page['next_cursor']
+        if cursor is None:
+            break
+
+    assert len(seen) == len({row['id'] for row in seen}) == 32
+    keys = [(row['timestamp'], row['id']) for row in seen]
+    assert keys == sorted(keys, reverse=True)
+    assert all(row['stock_symbol'] == 'SYM1' for row in seen)
+
+
+def test_malformed_cursor_is_rejected(service):
+    with pytest.raises(ValueError, match='Invalid cursor'):
+        service.query_feedback(cursor='not-a-cursor')
+
+
+def test_lowest_rated_comments_come_first(service):
+    for i in range(30):
+        service.submit(feedback(i))
+    service.save_feedback(FeedbackModel(stock_symbol='SYM0', rating=1))
+
+    items = service.lowest_rated_comments(limit=8)
+
+    assert len(items) == 8
+    assert all(item['comments'] for item in items)
+    assert [item['rating'] for item in items] == sorted(item['rating'] for item in items)
+
+
+def test_closed_service_refuses_feedback(service):
+    service.close()
+
+    with pytest.raises(RuntimeError):
+        service.submit(feedback(0)).result()
+
+
+
+class GatedStream(io.RawIOBase):
+    """
+    Stream that serves its head, then waits for a gate before serving the rest
+    """
+    def __init__(self, head: bytes, tail: bytes):
+        self.parts = [head, tail]
+        self.waiting = threading.Event()
+        self.gate = threading.Event()
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        while self.parts and not self.parts[0]:
+            self.parts.pop(0)
+            if self.parts:
+                self.waiting.set()
+                self.gate.wait(5)
+        if not self.parts:
+            return 0
+        n = min(len(buffer), len(self.parts[0]))
+        buffer[:n] = self.parts[0][:n]
+        self.parts[0] = self.parts[0][n:]
+        return n
+
+
+def test_live_feedback_commits_while_an_ingest_runs(service):
+    # The head is larger than pandas' read buffer, so the gate is reached mid-import
+    rows = [f"2024-01-01T09:00:00,SYM{i % 7},{i % 5 + 1},\n".encode('utf-8') for i in range(30000)]
+    stream = GatedStream(b"timestamp,stock_symbol,rating,comments\n" + b''.join(rows[:20000]),
+                         b''.join(rows[20000:]))
+    result = {}
+    ingest = threading.Thread(target=lambda: result.update(service.ingest(stream, chunk_rows=1000)))
+    ingest.start()
+    try:
+        # The import is paused mid-stream; the live write must not wait for it
+        assert stream.waiting.wait(5)
+        saved = service.submit(feedback(0)).result(timeout=2)
+    finally:
+        stream.gate.set()
+        ingest.join()
+
+    assert saved
+    assert result['imported'] == 30000
+    assert service.get_feedback_summary()['total_feedback_count'] == 30001
+
+
+def test_malformed_input_keeps_committed_chunks(service):
+    data = ndjson(*[{'timestamp': '2024-01-01T09:00:00', 'stock_symbol': 'AAPL', 'rating': 4}] * 3)
+    data = io.BytesIO(data.getvalue() + b'\n{not json')
+
+    with pytest.raises(ValueError):
+        service.ingest(data, 'ndjson', chunk_rows=3)
+
+    assert service.get_feedback_summary()['total_feedback_count'] == 3
+    assert service.stats()['ingested'] == 3
@@ -0,0 +1,83 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from services.forecast_cache import ForecastCache
+
+
+WINDOW = 300
+
+
+@pytest.fixture
+def prices():
+    rng = np.random.default_rng(0)
+    n = WINDOW + 20
+    return pd.Series(100 + np.cumsum(rng.normal(0, 1, n)),
+                     index=pd.date_range('2015-01-01', periods=n, freq='D'))
+
+
+def cold(prices, **kwargs):
+    return ForecastCache().forecast('SYM', prices, **kwargs)['Predicted_Close']
+
+
+def test_same_window_is_a_hit(prices):
+    cache = ForecastCache()
+    first = cache.forecast('SYM', prices)
+    second = cache.forecast('SYM', prices)
+
+    pd.testing.assert_frame_equal(first, second)
+    assert cache.stats()['hits'] == 1
+
+
+def test_sliding_window_matches_full_refit(prices):
+    cache = ForecastCache()
+    cache.forecast('SYM', prices.iloc[:WINDOW])
+    for end in range(WINDOW + 1, len(prices) + 1):
+        window = prices.iloc[end - WINDOW:end]
+        slid = cache.forecast('SYM', window)['Predicted_Close']
+        np.testing.assert_allclose(slid, cold(window), rtol=0, atol=1e-8)
+
+    stats = cache.stats()
+    assert stats['incremental_updates'] == len(prices) - WINDOW
+    assert stats['full_refits'] == 1
+
+
+def test_changed_bar_is_refitted(prices):
+    cache = ForecastCache()
+    cache.forecast('SYM', prices.iloc[:-1])
+    revised = prices.copy()
+    revised.iloc[-5] += 1.0
+
+    np.testing.assert_allclose(cache.forecast('SYM', revised)['Predicted_Close'],
+                               cold(revised), rtol=0, atol=1e-8)
+    assert cache.stats()['full_refits'] == 2
+
+
+def test_horizon_is_part_of_the_key(prices):
+    cache = ForecastCache()
+    cache.forecast('SYM', prices)
+    short = cache.forecast('SYM', prices, steps=5)
+
+    assert len(short) == 5
+    assert cache.stats()['hits'] == 0
+
+
+def test_statsmodels_window_change_refits(prices):
+    cache = ForecastCache()
+    cache.forecast('SYM', prices.iloc[:-1], backend='statsmodels')
+    slid = cache.forecast('SYM', prices.iloc[1:], backend='statsmodels')['Predicted_Close']
+
+    np.testing.assert_allclose(slid, cold(prices.iloc[1:], backend='statsmodels'))
+    assert cache.stats()['incremental_updates'] == 0
+
+
+def test_windows_of_different_periods_get_their_own_models(prices):
+    cache = ForecastCache()
+    month = cache.forecast('SYM', prices.iloc[-22:], period='1mo')['Predicted_Close']
+    years = cache.forecast('SYM', prices, period='5y')['Predicted_Close']
+
+    assert not np.allclose(month, years)
+    np.testing.assert_allclose(years, cold(prices, period='5y'))
+    # Same period label, different window: still not the month model
+    assert not np.allclose(cache.forecast('SYM', prices)['Predicted_Close'], month)
+    assert cache.stats()['hits'] == 0
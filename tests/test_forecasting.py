@@ -0,0 +1,57 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from services.forecasting import (
+    FORECAST_STEPS,
+    forecast_close_prices,
+    native_forecast_many,
+    native_forecast_matrix,
+    statsmodels_forecast
+)
+
+from .fixtures import synthetic_prices
+
+
+@pytest.fixture(scope='module')
+def prices():
+    return synthetic_prices(20, 250, seed=7)
+
+
+def test_native_matches_statsmodels(prices):
+    native = native_forecast_matrix(prices)
+    reference = np.stack([statsmodels_forecast(row) for row in prices])
+
+    assert native.shape == (len(prices), FORECAST_STEPS)
+    # Compare forecast moves relative to the typical daily move
+    scale = np.std(np.diff(prices, axis=1), axis=1, keepdims=True)
+    assert np.max(np.abs(native - reference) / scale) < 0.25
+
+
+def test_forecast_many_keeps_input_order(prices):
+    series = [prices[0], prices[1][:200], prices[2], prices[3][:180]]
+    forecasts = native_forecast_many(series)
+
+    for values, forecast in zip(series, forecasts):
+        np.testing.assert_allclose(forecast, native_forecast_matrix(values[None, :])[0])
+
+
+def test_native_rejects_unsupported_order(prices):
+    with pytest.raises(ValueError):
+        native_forecast_matrix(prices, order=(5, 1, 1))
+
+
+def test_forecast_close_prices_dates_follow_last_bar(prices):
+    close = pd.Series(prices[0], index=pd.date_range('2024-01-01', periods=prices.shape[1]))
+    forecast = forecast_close_prices(close, backend='native')
+
+    assert list(forecast.columns) == ['Predicted_Close']
+    assert forecast.index[0] == close.index[-1] + pd.Timedelta(days=1)
+    assert len(forecast) == FORECAST_STEPS
+
+
+def test_forecast_close_prices_defaults_to_statsmodels(prices):
+    close = pd.Series(prices[0], index=pd.date_range('2024-01-01', periods=prices.shape[1]))
+
+    np.testing.assert_allclose(forecast_close_prices(close)['Predicted_Close'],
+                               statsmodels_forecast(prices[0]))
@@ -0,0 +1,72 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from services.indicators import INDICATORS, Indicator, IndicatorEngine
+
+from .fixtures import synthetic_bars
+
+
+NAMES = list(INDICATORS)
+
+
+def assert_same(outputs, expected):
+    assert outputs.keys() == expected.keys()
+    for column in expected:
+        np.testing.assert_allclose(outputs[column], expected[column], rtol=1e-9, atol=1e-9,
+                                   equal_nan=True, err_msg=column)
+
+
+@pytest.fixture(scope='module')
+def bars():
+    return synthetic_bars(1300)
+
+
+def test_matches_pandas_reference(bars):
+    close = pd.Series(bars['Close'])
+    outputs = IndicatorEngine().compute(bars, NAMES)
+
+    np.testing.assert_allclose(outputs['SMA_20'], close.rolling(20).mean(), equal_nan=True)
+    np.testing.assert_allclose(outputs['EMA_20'], close.ewm(span=20, adjust=False).mean())
+    np.testing.assert_allclose(outputs['Volatility_20'],
+                               np.log(close).diff().rolling(20).std(), equal_nan=True)
+
+
+def test_incremental_updates_match_full_compute(bars):
+    engine = IndicatorEngine()
+    for end in (1000, 1001, 1010, 1300):
+        window = bars.take(slice(None, end))
+        assert_same(engine.apply(('SYM', '1d', '5y'), window, NAMES),
+                    IndicatorEngine().compute(window, NAMES))
+    assert engine.stats()['incremental_updates'] == 3
+
+
+@pytest.mark.parametrize('start', [1300 - 22, 1300 - 30, 1])
+def test_window_with_a_different_start_is_recomputed(bars, start):
+    engine = IndicatorEngine()
+    engine.apply(('SYM', '1d', '5y'), bars, NAMES)
+    window = bars.take(slice(start, None))
+
+    assert_same(engine.apply(('SYM', '1d', '5y'), window, NAMES),
+                IndicatorEngine().compute(window, NAMES))
+    assert engine.stats()['incremental_updates'] == 0
+
+
+def test_revised_bar_is_recomputed(bars):
+    engine = IndicatorEngine()
+    engine.apply(('SYM', '1d', '5y'), bars.take(slice(None, 1000)), NAMES)
+    close = bars['Close'].copy()
+    close[500] *= 1.01
+    revised = bars.take(slice(None, 1001)).with_columns(Close=close[:1001])
+
+    assert_same(engine.apply(('SYM', '1d', '5y'), revised, NAMES),
+                IndicatorEngine().compute(revised, NAMES))
+    assert engine.stats()['incremental_updates'] == 0
+
+
+def test_indicator_requires_step():
+    class Incomplete(Indicator):
+        columns = ['X']
+
+    with pytest.raises(TypeError):
+        Incomplete()
@@ -0,0 +1,105 @@
+import asyncio
+
+import pytest
+
+from services import jobs
+from services.jobs import JobManager, QueueFullError, SqliteJobStore
+
+
+async def echo(job, on_stage):
+    on_stage('run', {'partial': True})
+    return {'value': job.params['value']}
+
+
+async def run_jobs(manager: JobManager, n: int) -> list:
+    submitted = [manager.submit('echo', {'value': i}) for i in range(n)]
+    await manager._queue.join()
+    return submitted
+
+
+def test_jobs_run_and_identical_active_jobs_are_shared():
+    async def scenario():
+        manager = JobManager(echo, workers=2)
+        await manager.start()
+        first = manager.submit('echo', {'value': 1}, key='same')
+        second = manager.submit('echo', {'value': 1}, key='same')
+        await manager._queue.join()
+        await manager.stop()
+        return manager, first, second
+
+    manager, first, second = asyncio.run(scenario())
+
+    assert first is second
+    assert first.status == 'succeeded' and first.result == {'value': 1}
+    assert manager.stats()['deduplicated'] == 1
+
+
+def test_full_queue_rejects_jobs():
+    async def scenario():
+        manager = JobManager(echo, workers=1, max_queue=2)
+        await manager.start()
+        manager.submit('echo', {'value': 0})
+        manager.submit('echo', {'value': 1})
+        with pytest.raises(QueueFullError):
+            manager.submit('echo', {'value': 2})
+        await manager.stop()
+
+    asyncio.run(scenario())
+
+
+def test_submissions_do_not_scan_the_jobs_every_time(monkeypatch):
+    manager = JobManager(echo, workers=4, max_finished=1000)
+    calls = []
+    prune = manager._prune
+    monkeypatch.setattr(manager, '_prune', lambda: calls.append(1) or prune())
+
+    async def scenario():
+        await manager.start()
+        for _ in range(10):
+            await run_jobs(manager, 100)
+        await manager.stop()
+
+    asyncio.run(scenario())
+
+    # One prune on the first submission, then one per overflow of the memory limit
+    assert len(calls) < 10
+    assert len(manager._jobs) <= 1000 * (1 + jobs.PRUNE_SLACK) + manager.max_queue + manager.workers
+
+
+def test_expired_jobs_are_pruned_once_the_interval_passes(monkeypatch):
+    manager = JobManager(echo, retention=0.0)
+
+    async def scenario():
+        await manager.start()
+        await run_jobs(manager, 5)
+        assert len(manager._jobs) == 5
+        monkeypatch.setattr(jobs, 'PRUNE_INTERVAL', 0.0)
+        await run_jobs(manager, 1)
+        await manager.stop()
+
+    asyncio.run(scenario())
+
+    assert len(manager._jobs) == 1
+
+
+def test_job_results_survive_a_restart(tmp_path):
+    path = str(tmp_path / 'jobs.sqlite')
+
+    async def scenario():
+        manager = JobManager(echo, store=SqliteJobStore(path))
+        await manager.start()
+        job, = await run_jobs(manager, 1)
+        await manager.stop()
+        manager.store.close()
+
+        restarted = JobManager(echo, store=SqliteJobStore(path))
+        await restarted.start()
+        loaded = await restarted.get(job.job_id)
+        await restarted.stop()
+        restarted.store.close()
+        return job, loaded
+
+    job, loaded = asyncio.run(scenario())
+
+    assert loaded.status == 'succeeded'
+    assert loaded.result == job.result
@@ -0,0 +1,132 @@
+import threading
+
+import pytest
+
+from services.artifact_store import ArtifactStore
+from services.voice_interaction import (
+    FakeTTSEngine,
+    OfflineSpeechRecognizer,
+    VoiceInteractionService,
+    split_sentences,
+    tts_key
+)
+
+
+REPORT = ' '.join(
+    f"Point {i}: the stock shows a moderate trend with support near recent lows, "
+    f"while momentum indicators remain neutral." for i in range(6))
+
+
+class RecordingEngine(FakeTTSEngine):
+    """
+    Fake engine that records the text of each synthesis
+    """
+    def __init__(self, **kwargs):
+        super().__init__(latency=0.0, seconds_per_char=0.0, **kwargs)
+        self.texts = []
+        self._lock = threading.Lock()
+
+    def synthesize(self, text, path, lang='en', tld='com', slow=False):
+        with self._lock:
+            self.texts.append(text)
+        super().synthesize(text, path, lang, tld, slow)
+
+
+@pytest.fixture
+def engine():
+    return RecordingEngine()
+
+
+@pytest.fixture
+def voice(tmp_path, engine):
+    return VoiceInteractionService(audio_store=ArtifactStore(str(tmp_path / 'audio')),
+                                   recognizer=OfflineSpeechRecognizer(), tts_engine=engine)
+
+
+def test_tts_key_ignores_whitespace_but_not_voice_options():
+    key = tts_key("Buy  the\ndip.")
+
+    assert key == tts_key("Buy the dip.")
+    assert key != tts_key("Buy the dip.", lang='fr')
+    assert key != tts_key("Buy the dip.", tld='co.uk')
+    assert key != tts_key("Buy the dip.", slow=True)
+    assert key != tts_key("Buy the dip.", engine='fake')
+
+
+def test_speech_is_reused_across_services_sharing_a_store(tmp_path, engine):
+    first = VoiceInteractionService(audio_store=ArtifactStore(str(tmp_path / 'audio')),
+                                    tts_engine=engine)
+    path = first.text_to_speech("The market closed higher.")
+    second = VoiceInteractionService(audio_store=ArtifactStore(str(tmp_path / 'audio')),
+                                     tts_engine=engine)
+
+    assert second.text_to_speech("The market  closed higher.") == path
+    assert engine.texts == ["The market closed higher."]
+    assert second.tts_stats()['hits'] == 1
+
+
+def test_concurrent_identical_requests_synthesize_once(tmp_path):
+    engine = RecordingEngine()
+    engine.latency = 0.2
+    voice = VoiceInteractionService(audio_store=ArtifactStore(str(tmp_path / 'audio')),
+                                    tts_engine=engine)
+    barrier = threading.Barrier(8)
+    paths = []
+
+    def speak():
+        barrier.wait()
+        paths.append(voice.text_to_speech("Volatility is rising."))
+
+    threads = [threading.Thread(target=speak) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(set(paths)) == 1 and paths[0]
+    assert engine.texts == ["Volatility is rising."]
+    assert voice.tts_stats()['syntheses'] == 1
+
+
+def test_split_sentences_bounds_segment_length():
+    text = "Short. " + "word " * 200 + ". Tiny. Another short one."
+    segments = split_sentences(text)
+
+    assert all(len(segment) <= 250 for segment in segments)
+    assert ' '.join(segments).split() == text.split()
+
+
+def test_split_sentences_joins_short_sentences():
+    assert split_sentences("Hi. Yes. This is a longer sentence about the outlook. Next one here.") == \
+        ["Hi. Yes. This is a longer sentence about the outlook.", "Next one here."]
+
+
+def test_stream_is_the_segments_in_reading_order(voice, engine):
+    audio = b''.join(voice.stream_speech(REPORT))
+    segments = split_sentences(REPORT)
+
+    expected = b''.join(open(voice.text_to_speech(segment), 'rb').read() for segment in segments)
+    assert audio == expected
+    assert sorted(engine.texts) == sorted(segments)
+
+
+def test_streamed_segments_are_cached(voice, engine):
+    b''.join(voice.stream_speech(REPORT))
+    b''.join(voice.stream_speech(REPORT))
+
+    assert len(engine.texts) == len(split_sentences(REPORT))
+    assert voice.tts_stats()['streams'] == 2
+
+
+def test_stopping_early_cancels_pending_syntheses(tmp_path):
+    engine = FakeTTSEngine(latency=0.05, seconds_per_char=0.0)
+    voice = VoiceInteractionService(audio_store=ArtifactStore(str(tmp_path / 'audio')),
+                                    tts_engine=engine, tts_workers=1)
+    long_report = ' '.join([REPORT] * 5)
+
+    stream = voice.stream_speech(long_report)
+    next(stream)
+    stream.close()
+    voice._synthesis_pool.shutdown(wait=True)
+
+    assert voice.tts_stats()['syntheses'] < len(split_sentences(long_report))
@@ -0,0 +1,105 @@
+import asyncio
+import time
+
+import pytest
+
+from services.http_client import HttpClient
+from services.web_scraper import HEADLINE_CLASS, WebScraper, parse_headlines
+from .servers import make_fixture_server, serve_in_background
+
+
+@pytest.fixture
+def servers():
+    started = []
+
+    def start(**options):
+        server = make_fixture_server(0, **options)
+        started.append(server)
+        return server, serve_in_background(server)
+
+    yield start
+    for server in started:
+        server.shutdown()
+        server.server_close()
+
+
+def test_parse_headlines_keeps_only_headline_elements():
+    html = (f'<h3 class="other">Markets</h3><div><h3 class="{HEADLINE_CLASS}">First</h3></div>'
+            f'<p>text</p><h3 class="{HEADLINE_CLASS}">Second</h3>'
+            f'<h3 class="{HEADLINE_CLASS}">Third</h3>')
+
+    assert parse_headlines(html) == ['First', 'Second', 'Third']
+    assert parse_headlines(html, limit=2) == ['First', 'Second']
+    assert parse_headlines('<html></html>') == []
+
+
+def test_scrapes_reuse_kept_alive_connections(servers):
+    server, base_url = servers(latency=0.0)
+    scraper = WebScraper(HttpClient(), base_url)
+    try:
+        news = [scraper.scrape_financial_news(f'SYM{i}') for i in range(10)]
+    finally:
+        scraper.close()
+
+    assert news[3] == [f'SYM3 headline {i}' for i in range(5)]
+    assert server.connections == 1
+
+
+def test_scrape_many_returns_headlines_per_unique_symbol(servers):
+    _, base_url = servers(latency=0.05)
+    scraper = WebScraper(HttpClient(), base_url, max_headlines=3)
+
+    async def scrape():
+        try:
+            return await scraper.scrape_many(['AAPL', 'MSFT', 'AAPL'])
+        finally:
+            await scraper.aclose()
+
+    started = time.perf_counter()
+    news = asyncio.run(scrape())
+    elapsed = time.perf_counter() - started
+    scraper.close()
+
+    assert news == {symbol: [f'{symbol} headline {i}' for i in range(3)]
+                    for symbol in ('AAPL', 'MSFT')}
+    # Fetched concurrently rather than one after the other
+    assert elapsed < 0.2
+
+
+def test_stalled_site_times_out_instead_of_hanging(servers):
+    _, base_url = servers(latency=2.0)
+    scraper = WebScraper(HttpClient(read_timeout=0.2, max_retries=0), base_url)
+
+    started = time.perf_counter()
+    try:
+        assert scraper.scrape_financial_news('SYM0') == []
+    finally:
+        scraper.close()
+
+    assert time.perf_counter() - started < 1.5
+
+
+def test_transient_errors_are_retried(servers):
+    _, base_url = servers(latency=0.0, error_rate=0.3)
+    client = HttpClient(max_retries=8, backoff_base=0.01, backoff_max=0.05)
+    scraper = WebScraper(client, base_url)
+    symbols = [f'SYM{i}' for i in range(10)]
+
+    try:
+        news = [scraper.scrape_financial_news(s) for s in symbols]
+        async_news = asyncio.run(scraper.scrape_many(symbols))
+    finally:
+        scraper.close()
+
+    assert all(news) and all(async_news.values())
+    assert client.stats()['retries'] > 0
+
+
+def test_failed_scrape_returns_no_headlines(servers):
+    _, base_url = servers(latency=0.0, error_rate=1.0)
+    scraper = WebScraper(HttpClient(max_retries=1, backoff_base=0.01), base_url)
+    try:
+        assert scraper.scrape_financial_news('SYM0') == []
+        assert asyncio.run(scraper.scrape_many(['SYM0'])) == {'SYM0': []}
+    finally:
+        scraper.close()